@@ -0,0 +1,111 @@
+# 서버 프로세스 시작부터 첫 페이지 응답까지 걸리는 시간 측정
+# python bench/cold_start.py --server gunicorn --runs 5
+# python bench/cold_start.py --server dev  (디버거와 리로더를 켠 예전 방식)
+import argparse
+import http.client
+import os
+import shutil
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.join(BENCH_DIR, '..')
+PAGE_REQUESTS = ['/', '/_dash-layout', '/_dash-dependencies']
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def fake_kubectl_env(bin_dir, port, cache_dir):
+    wrapper = os.path.join(bin_dir, 'kubectl')
+    with open(wrapper, 'w') as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.join(BENCH_DIR, "fake_kubectl.py")}" "$@"\n')
+    os.chmod(wrapper, os.stat(wrapper).st_mode | stat.S_IEXEC)
+    env = dict(os.environ, PATH=bin_dir + os.pathsep + os.environ['PATH'], K8SHELPER_PORT=str(port),
+               K8SHELPER_CACHE_DIR=cache_dir, K8SHELPER_INFORMER_KINDS='')
+    env.setdefault('FAKE_KUBECTL_LATENCY', '0.05')
+    return env
+
+
+def server_command(server):
+    if server == 'dev':
+        return [sys.executable, 'k8shelper.py']
+    return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:application']
+
+
+def get(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        conn.request('GET', path)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def measure(server, env, port, timeout):
+    started = time.perf_counter()
+    env = dict(env, K8SHELPER_DEBUG='1' if server == 'dev' else '')
+    process = subprocess.Popen(server_command(server), cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        while True:
+            if time.perf_counter() - started > timeout:
+                raise RuntimeError(f'{server}: {timeout}초 안에 응답하지 않음')
+            try:
+                if get(port, '/') == 200:
+                    break
+            except OSError:
+                time.sleep(0.02)
+        first_response = time.perf_counter() - started
+        for path in PAGE_REQUESTS[1:]:
+            get(port, path)
+        return first_response, time.perf_counter() - started
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='k8shelper cold start benchmark')
+    parser.add_argument('--server', choices=['gunicorn', 'dev'], default='gunicorn')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--warm-cache', action='store_true', help='도움말 캐시를 미리 채운 상태에서 측정 (이미지 빌드 시와 같음)')
+    args = parser.parse_args()
+
+    bin_dir = tempfile.mkdtemp(prefix='k8shelper-cold-')
+    try:
+        cache_dir = os.path.join(bin_dir, 'cache')
+        env = fake_kubectl_env(bin_dir, free_port(), cache_dir)
+        if args.warm_cache:
+            subprocess.run([sys.executable, '-c', 'import k8shelper; from help_cache import help_cache; '
+                            'help_cache.warm([c for g in k8shelper.commands.values() for c in g])'],
+                           cwd=ROOT_DIR, env=env, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        results = []
+        for _ in range(args.runs):
+            if not args.warm_cache:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            env['K8SHELPER_PORT'] = str(free_port())
+            results.append(measure(args.server, env, int(env['K8SHELPER_PORT']), args.timeout))
+    finally:
+        shutil.rmtree(bin_dir, ignore_errors=True)
+
+    first = sorted(r[0] for r in results)
+    page = sorted(r[1] for r in results)
+    print(f'{args.server}: 첫 응답 중앙값 {first[len(first) // 2] * 1000:.0f} ms '
+          f'(최소 {first[0] * 1000:.0f}, 최대 {first[-1] * 1000:.0f}), '
+          f'페이지 로드 완료 중앙값 {page[len(page) // 2] * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# kubectl 서브프로세스 경로와 API 백엔드 경로의 지연 시간 비교
+# python bench/compare_backends.py --iterations 50 --pods 8000
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from stub_apiserver import make_server  # noqa: E402
+
+COMMANDS = ['kubectl get nodes', 'kubectl get svc -A', 'kubectl get ns', 'kubectl get pods -n ns-1',
+            'kubectl top nodes', 'kubectl api-resources']
+
+
+def measure(fn, command, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = fn(command)
+        samples.append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            raise SystemExit(f'{command} 실패: {result.output}')
+    samples.sort()
+    return statistics.mean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare kubectl subprocess and API backend latency')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--pods', type=int, default=1000)
+    args = parser.parse_args()
+
+    server = make_server(0, args.latency, pods=args.pods)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_port}'
+    os.environ['K8SHELPER_API_SERVER'] = url
+
+    from executor import run_command
+    from k8s_api import api_backend
+
+    backends = [('api', api_backend.run)]
+    if shutil.which('kubectl'):
+        backends.append(('kubectl', lambda command: run_command(command.replace(
+            'kubectl ', f'kubectl --server={url} --insecure-skip-tls-verify ', 1))))
+    else:
+        print('kubectl 이 PATH 에 없어 API 백엔드만 측정합니다.')
+
+    print(f"{'command':<28}{'backend':<10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for command in COMMANDS:
+        for name, fn in backends:
+            mean, p50, p95 = measure(fn, command, args.iterations)
+            print(f'{command:<28}{name:<10}{mean:>10.2f}{p50:>10.2f}{p95:>10.2f}')
+    print(f'API 백엔드가 연 연결 수: {api_backend.client.pool.connections_opened}, 스텁 서버 요청 수: {server.requests}')
+
+
+if __name__ == '__main__':
+    main()
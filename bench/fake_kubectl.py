@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# 벤치마크용 가짜 kubectl (환경 변수로 지연 시간, 출력 크기, 종료 코드 조정)
+#   FAKE_KUBECTL_LATENCY    지연 시간 (초), '0.05-0.2' 처럼 범위도 가능
+#   FAKE_KUBECTL_LINES      get 출력 행 수
+#   FAKE_KUBECTL_EXIT_CODE  종료 코드 (0 이 아니면 stderr 로 오류 출력)
+#   FAKE_KUBECTL_FAIL_RATE  0~1 사이 확률로 실패
+import os
+import random
+import sys
+import time
+
+VERBS = ['create', 'get', 'describe', 'delete', 'logs', 'rollout', 'scale', 'top', 'apply']
+
+
+def latency():
+    value = os.environ.get('FAKE_KUBECTL_LATENCY', '0.05')
+    if '-' in value:
+        low, high = value.split('-', 1)
+        return random.uniform(float(low), float(high))
+    return float(value)
+
+
+def main(args):
+    time.sleep(latency())
+
+    exit_code = int(os.environ.get('FAKE_KUBECTL_EXIT_CODE', '0'))
+    if random.random() < float(os.environ.get('FAKE_KUBECTL_FAIL_RATE', '0')):
+        exit_code = 1
+    if exit_code:
+        sys.stderr.write('Error from server (InternalError): fake kubectl failure\n')
+        return exit_code
+
+    if args == ['--help']:
+        sys.stdout.write('kubectl controls the Kubernetes cluster manager.\n\nBasic Commands (Beginner):\n')
+        sys.stdout.write(''.join(f'  {verb:<14}fake {verb} command\n' for verb in VERBS))
+        sys.stdout.write('\nUsage:\n  kubectl [flags] [options]\n')
+        return 0
+    if '--help' in args:
+        verb = args[0]
+        sys.stdout.write(f'{verb} - fake help text\n\n')
+        if verb == 'rollout':
+            sys.stdout.write('Available Commands:\n  history       View rollout history\n'
+                             '  restart       Restart a resource\n  status        Show the status of the rollout\n\n')
+        sys.stdout.write('Options:\n    -A, --all-namespaces=false:\n\tfake option\n\n')
+        sys.stdout.write(''.join(f'    --option-{i}=\'\':\n\tfake option {i}\n\n' for i in range(40)))
+        sys.stdout.write(f'Usage:\n  kubectl {verb} [flags] [options]\n')
+        return 0
+    if args[:1] == ['options']:
+        sys.stdout.write('The following options can be passed to any command:\n\n'
+                         '    --context=\'\':\n\tfake\n\n    -n, --namespace=\'\':\n\tfake\n')
+        return 0
+    if args[:1] == ['api-resources']:
+        sys.stdout.write('NAME          SHORTNAMES   APIVERSION   NAMESPACED   KIND\n'
+                         'namespaces    ns           v1           false        Namespace\n'
+                         'nodes         no           v1           false        Node\n'
+                         'pods          po           v1           true         Pod\n'
+                         'services      svc          v1           true         Service\n'
+                         'deployments   deploy       apps/v1      true         Deployment\n')
+        return 0
+    if args[:1] == ['version']:
+        sys.stdout.write('{"clientVersion": {"gitVersion": "v0.0.0-fake"}}\n')
+        return 0
+    if args[:1] == ['config']:
+        sys.stderr.write('error: fake kubectl has no kubeconfig\n')
+        return 1
+
+    lines = int(os.environ.get('FAKE_KUBECTL_LINES', '20'))
+    out = ['NAMESPACE     NAME                          READY   STATUS    RESTARTS   AGE']
+    out += [f'ns-{i % 20:<10}  app-{i % 50}-{i:08d}{" " * 8}1/1     Running   0          10d' for i in range(lines)]
+    sys.stdout.write('\n'.join(out) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
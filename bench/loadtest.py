@@ -0,0 +1,230 @@
+# 가짜 kubectl 로 Dash 콜백에 동시 사용자 부하를 걸고 지연 시간, 처리량, 메모리를 측정
+# python bench/loadtest.py --users 20 --iterations 10 --latency 0.1 --lines 2000
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+QUICK_COMMANDS = ['get-nodes-button', 'get-svc-button', 'get-ns-button']
+
+
+def install_fake_kubectl(args):
+    # 가짜 kubectl 을 PATH 맨 앞에 두고, 캐시 디렉터리와 watch 캐시는 벤치마크용으로 분리
+    bin_dir = tempfile.mkdtemp(prefix='k8shelper-bench-')
+    wrapper = os.path.join(bin_dir, 'kubectl')
+    with open(wrapper, 'w') as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.join(BENCH_DIR, "fake_kubectl.py")}" "$@"\n')
+    os.chmod(wrapper, os.stat(wrapper).st_mode | stat.S_IEXEC)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+    os.environ['K8SHELPER_CACHE_DIR'] = os.path.join(bin_dir, 'cache')
+    os.environ.setdefault('K8SHELPER_INFORMER_KINDS', '')
+    os.environ['FAKE_KUBECTL_LATENCY'] = args.latency
+    os.environ['FAKE_KUBECTL_LINES'] = str(args.lines)
+    os.environ['FAKE_KUBECTL_EXIT_CODE'] = str(args.exit_code)
+    os.environ['FAKE_KUBECTL_FAIL_RATE'] = str(args.fail_rate)
+    return bin_dir
+
+
+class DashClient:
+    # 브라우저 대신 /_dash-update-component 로 콜백을 호출
+    def __init__(self, app, user):
+        self.client = app.server.test_client()
+        self.headers = {'X-Forwarded-For': user}
+        self.callback_map = app.callback_map
+
+    def _find(self, output):
+        for key in self.callback_map:
+            if key == output or key.startswith(f'..{output}...') or key.startswith(f'..{output}..'):
+                return key
+        raise KeyError(output)
+
+    def call(self, output, values, triggered):
+        key = self._find(output)
+        spec = self.callback_map[key]
+
+        def props(items):
+            return [{'id': item['id'], 'property': item['property'],
+                     'value': values.get(f"{item['id']}.{item['property']}")} for item in items]
+
+        if key.startswith('..'):
+            outputs = [dict(zip(('id', 'property'), part.rsplit('.', 1))) for part in key.strip('.').split('...')]
+        else:
+            outputs = dict(zip(('id', 'property'), key.rsplit('.', 1)))
+        body = {'output': key, 'outputs': outputs, 'inputs': props(spec['inputs']), 'state': props(spec['state']),
+                'changedPropIds': [triggered]}
+        response = self.client.post('/_dash-update-component', json=body, headers=self.headers)
+        if response.status_code == 204:
+            return {}, 0
+        if response.status_code != 200:
+            raise RuntimeError(f'{output}: HTTP {response.status_code}')
+        return response.get_json()['response'], len(response.data)
+
+
+class Stats:
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.render = []  # (초, 응답 바이트)
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def error(self, name):
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def add_render(self, seconds, size):
+        with self._lock:
+            self.render.append((seconds, size))
+
+
+def percentile(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def run_execute(client, stats, args, user_index, iteration):
+    values = {'backend-select.value': args.backend, 'table-mode.value': ['table'] if args.table else []}
+    if random.random() < 0.5:
+        trigger = random.choice(QUICK_COMMANDS)
+        values[f'{trigger}.n_clicks'] = 1
+        name = 'execute:quick'
+    else:
+        trigger = 'execute-button'
+        values['execute-button.n_clicks'] = 1
+        suffix = f' -l run={user_index}-{iteration}' if args.unique else ''
+        values['user-command-input.value'] = f'kubectl get pods -A{suffix}'
+        name = 'execute:input'
+
+    started = time.perf_counter()
+    response, _ = client.call('command-job-store.data', values, f'{trigger}.n_clicks')
+    job_data = response.get('command-job-store', {}).get('data')
+    if not job_data or 'error' in job_data:
+        stats.error(name)
+        return
+
+    poll_values = {'command-job-store.data': job_data, 'command-poll-interval.n_intervals': 0}
+    triggered = 'command-job-store.data'
+    while True:
+        poll_started = time.perf_counter()
+        response, size = client.call('user-command-result.children', poll_values, triggered)
+        if response.get('command-poll-interval', {}).get('disabled'):
+            stats.add_render(time.perf_counter() - poll_started, size)
+            break
+        triggered = 'command-poll-interval.n_intervals'
+        poll_values['command-poll-interval.n_intervals'] += 1
+        time.sleep(args.poll_interval)
+    stats.add(name, time.perf_counter() - started)
+
+
+def run_help(client, stats, commands):
+    group = random.choice(list(commands))
+    command = random.choice(list(commands[group]))
+    started = time.perf_counter()
+    client.call('help-result.children', {'command-dropdown.value': command}, 'command-dropdown.value')
+    stats.add('help', time.perf_counter() - started)
+
+
+def user_loop(app, commands, stats, args, user_index, barrier):
+    client = DashClient(app, f'10.0.{user_index // 250}.{user_index % 250}')
+    barrier.wait()
+    for iteration in range(args.iterations):
+        # 명령어 목록 드롭다운은 브라우저에서 처리되므로 서버 부하 시나리오에 없음
+        scenario = args.scenario if args.scenario != 'mixed' else random.choice(['execute', 'execute', 'help'])
+        try:
+            if scenario == 'execute':
+                run_execute(client, stats, args, user_index, iteration)
+            else:
+                run_help(client, stats, commands)
+        except (KeyError, RuntimeError) as e:
+            stats.error(f'{scenario}: {e}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='k8shelper load test with a fake kubectl')
+    parser.add_argument('--users', type=int, default=20, help='동시 사용자 수')
+    parser.add_argument('--iterations', type=int, default=10, help='사용자당 요청 수')
+    parser.add_argument('--scenario', choices=['mixed', 'execute', 'help'], default='mixed')
+    parser.add_argument('--latency', default='0.05', help="가짜 kubectl 지연 시간 (초, '0.05-0.2' 범위 가능)")
+    parser.add_argument('--lines', type=int, default=200, help='가짜 kubectl get 출력 행 수')
+    parser.add_argument('--exit-code', type=int, default=0)
+    parser.add_argument('--fail-rate', type=float, default=0.0)
+    parser.add_argument('--backend', choices=['kubectl', 'api'], default='kubectl')
+    parser.add_argument('--table', action='store_true', help='표 보기로 결과 요청')
+    parser.add_argument('--unique', action='store_true', help='입력 명령어마다 다른 인자를 붙여 결과 캐시 우회')
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='결과 폴링 간격 (초)')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON 으로 출력 (회귀 비교용)')
+    args = parser.parse_args()
+
+    bin_dir = install_fake_kubectl(args)
+    try:
+        import k8shelper
+        k8shelper.start_background_tasks()
+
+        stats = Stats()
+        barrier = threading.Barrier(args.users + 1)
+        threads = [threading.Thread(target=user_loop, args=(k8shelper.app, k8shelper.commands, stats, args, i,
+                                                            barrier))
+                   for i in range(args.users)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        shutil.rmtree(bin_dir, ignore_errors=True)
+
+    report = {'users': args.users, 'elapsed_seconds': elapsed, 'operations': {},
+              'errors': stats.errors,
+              'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              'peak_child_rss_kb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss}
+    total = 0
+    for name, samples in sorted(stats.samples.items()):
+        samples.sort()
+        total += len(samples)
+        report['operations'][name] = {
+            'count': len(samples),
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p95_ms': percentile(samples, 0.95) * 1000,
+            'p99_ms': percentile(samples, 0.99) * 1000,
+        }
+    report['throughput_per_second'] = total / elapsed if elapsed else 0
+    if stats.render:
+        render_times = sorted(seconds for seconds, _ in stats.render)
+        report['render'] = {'p50_ms': percentile(render_times, 0.5) * 1000,
+                            'p95_ms': percentile(render_times, 0.95) * 1000,
+                            'mean_response_bytes': sum(size for _, size in stats.render) / len(stats.render)}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'operation':<16}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, op in report['operations'].items():
+        print(f"{name:<16}{op['count']:>7}{op['p50_ms']:>10.1f}{op['p95_ms']:>10.1f}{op['p99_ms']:>10.1f}")
+    print(f"처리량: {report['throughput_per_second']:.1f} req/s ({elapsed:.2f}s 동안 {total}건)")
+    if 'render' in report:
+        render = report['render']
+        print(f"결과 렌더링: p50 {render['p50_ms']:.1f} ms, p95 {render['p95_ms']:.1f} ms, "
+              f"평균 응답 {render['mean_response_bytes'] / 1024:.1f} KiB")
+    print(f"최대 RSS: 서버 {report['peak_rss_kb'] / 1024:.1f} MiB, "
+          f"자식 프로세스 {report['peak_child_rss_kb'] / 1024:.1f} MiB (fork 직후 복사된 페이지 포함)")
+    if stats.errors:
+        print(f'오류: {stats.errors}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+# 벤치마크용 Kubernetes API 스텁 서버
+# python bench/stub_apiserver.py --port 18080 --pods 8000
+# K8SHELPER_API_SERVER=http://127.0.0.1:18080 로 API 백엔드를 이 서버에 연결
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CORE_RESOURCES = [
+    {'name': 'pods', 'singularName': 'pod', 'namespaced': True, 'kind': 'Pod', 'shortNames': ['po']},
+    {'name': 'pods/log', 'singularName': '', 'namespaced': True, 'kind': 'Pod'},
+    {'name': 'services', 'singularName': 'service', 'namespaced': True, 'kind': 'Service', 'shortNames': ['svc']},
+    {'name': 'namespaces', 'singularName': 'namespace', 'namespaced': False, 'kind': 'Namespace',
+     'shortNames': ['ns']},
+    {'name': 'nodes', 'singularName': 'node', 'namespaced': False, 'kind': 'Node', 'shortNames': ['no']},
+    {'name': 'events', 'singularName': 'event', 'namespaced': True, 'kind': 'Event', 'shortNames': ['ev']},
+]
+APPS_RESOURCES = [
+    {'name': 'deployments', 'singularName': 'deployment', 'namespaced': True, 'kind': 'Deployment',
+     'shortNames': ['deploy']},
+]
+METRICS_RESOURCES = [
+    {'name': 'nodes', 'singularName': '', 'namespaced': False, 'kind': 'NodeMetrics'},
+    {'name': 'pods', 'singularName': '', 'namespaced': True, 'kind': 'PodMetrics'},
+]
+
+COLUMNS = {
+    'pods': ['Name', 'Ready', 'Status', 'Restarts', 'Age'],
+    'services': ['Name', 'Type', 'Cluster-IP', 'External-IP', 'Port(s)', 'Age'],
+    'namespaces': ['Name', 'Status', 'Age'],
+    'nodes': ['Name', 'Status', 'Roles', 'Age', 'Version'],
+    'events': ['Last Seen', 'Type', 'Reason', 'Object', 'Message'],
+    'deployments': ['Name', 'Ready', 'Up-to-date', 'Available', 'Age'],
+}
+
+
+def build_objects(args):
+    created = (datetime.now(timezone.utc) - timedelta(days=10)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    namespaces = [f'ns-{i}' for i in range(args.namespaces)]
+
+    def meta(name, namespace=None, labels=None):
+        metadata = {'name': name, 'creationTimestamp': created, 'resourceVersion': '1',
+                    'labels': labels or {}, 'uid': f'{namespace or ""}-{name}'}
+        if namespace:
+            metadata['namespace'] = namespace
+        return metadata
+
+    objects = {
+        'namespaces': [{'metadata': meta(ns), 'status': {'phase': 'Active'}} for ns in namespaces],
+        'nodes': [{'metadata': meta(f'node-{i}'), 'status': {'allocatable': {'cpu': '8', 'memory': '32Gi'}}}
+                  for i in range(args.nodes)],
+        'pods': [], 'services': [], 'deployments': [], 'events': [],
+    }
+    for i in range(args.pods):
+        ns = namespaces[i % len(namespaces)]
+        app = f'app-{i % 50}'
+        objects['pods'].append({'metadata': meta(f'{app}-{i:06d}', ns, {'app': app}),
+                                'spec': {'nodeName': f'node-{i % args.nodes}',
+                                         'containers': [{'name': 'main', 'image': f'registry/{app}:1.0'}]},
+                                'status': {'phase': 'Running'}})
+    for i in range(args.services):
+        ns = namespaces[i % len(namespaces)]
+        objects['services'].append({'metadata': meta(f'svc-{i:05d}', ns, {'app': f'app-{i % 50}'}),
+                                    'spec': {'type': 'ClusterIP', 'clusterIP': f'10.0.{i // 250}.{i % 250}',
+                                             'ports': [{'port': 80, 'protocol': 'TCP'}]}})
+    for i in range(50):
+        ns = namespaces[i % len(namespaces)]
+        objects['deployments'].append({'metadata': meta(f'app-{i}', ns, {'app': f'app-{i}'}),
+                                       'spec': {'replicas': 3}, 'status': {'readyReplicas': 3}})
+    for i in range(args.events):
+        ns = namespaces[i % len(namespaces)]
+        objects['events'].append({'metadata': meta(f'event-{i:06d}', ns),
+                                  'type': 'Warning' if i % 7 == 0 else 'Normal', 'reason': 'Pulled',
+                                  'involvedObject': {'kind': 'Pod', 'name': f'app-{i % 50}-{i:06d}'},
+                                  'message': 'Container image already present on machine', 'count': 1})
+    return objects
+
+
+def table_cells(resource, obj):
+    name = obj['metadata']['name']
+    if resource == 'pods':
+        return [name, '1/1', obj['status']['phase'], 0, '10d']
+    if resource == 'services':
+        return [name, obj['spec']['type'], obj['spec']['clusterIP'], '<none>', '80/TCP', '10d']
+    if resource == 'namespaces':
+        return [name, 'Active', '10d']
+    if resource == 'nodes':
+        return [name, 'Ready', '<none>', '10d', 'v1.29.0']
+    if resource == 'events':
+        return ['1m', obj['type'], obj['reason'], f"pod/{obj['involvedObject']['name']}", obj['message']]
+    return [name, '3/3', 3, 3, '10d']
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive 지원
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, content_type='application/json'):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self, message):
+        self._send(404, {'kind': 'Status', 'status': 'Failure', 'reason': 'NotFound', 'message': message,
+                         'code': 404})
+
+    def _watch(self, items, timeout):
+        # 연결을 닫을 때까지 watch 이벤트를 한 줄씩 보냄 (--churn 초마다 MODIFIED 이벤트)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline:
+                if not self.server.churn or not items:
+                    time.sleep(min(1.0, deadline - time.monotonic()))
+                    continue
+                time.sleep(self.server.churn)
+                self.server.resource_version += 1
+                obj = random.choice(items)
+                obj['metadata']['resourceVersion'] = str(self.server.resource_version)
+                self.wfile.write(json.dumps({'type': 'MODIFIED', 'object': obj}).encode() + b'\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        parts = [part for part in url.path.split('/') if part]
+        self.server.requests += 1
+
+        if parts == ['api']:
+            return self._send(200, {'kind': 'APIVersions', 'versions': ['v1']})
+        if parts == ['apis']:
+            return self._send(200, {'kind': 'APIGroupList', 'groups': [
+                {'name': 'apps', 'versions': [{'groupVersion': 'apps/v1', 'version': 'v1'}],
+                 'preferredVersion': {'groupVersion': 'apps/v1', 'version': 'v1'}},
+                {'name': 'metrics.k8s.io', 'versions': [{'groupVersion': 'metrics.k8s.io/v1beta1',
+                                                         'version': 'v1beta1'}],
+                 'preferredVersion': {'groupVersion': 'metrics.k8s.io/v1beta1', 'version': 'v1beta1'}},
+            ]})
+        if parts == ['api', 'v1']:
+            return self._send(200, {'kind': 'APIResourceList', 'groupVersion': 'v1', 'resources': CORE_RESOURCES})
+        if parts == ['apis', 'apps', 'v1']:
+            return self._send(200, {'kind': 'APIResourceList', 'groupVersion': 'apps/v1',
+                                    'resources': APPS_RESOURCES})
+        if parts == ['apis', 'metrics.k8s.io', 'v1beta1']:
+            return self._send(200, {'kind': 'APIResourceList', 'groupVersion': 'metrics.k8s.io/v1beta1',
+                                    'resources': METRICS_RESOURCES})
+
+        metrics = parts[:3] == ['apis', 'metrics.k8s.io', 'v1beta1']
+        if parts[:2] == ['api', 'v1']:
+            rest = parts[2:]
+        elif parts[:3] in (['apis', 'apps', 'v1'], ['apis', 'metrics.k8s.io', 'v1beta1']):
+            rest = parts[3:]
+        else:
+            return self._not_found(f'the server could not find the requested resource ({url.path})')
+
+        namespace = None
+        if len(rest) >= 2 and rest[0] == 'namespaces' and len(rest) != 2:
+            namespace, rest = rest[1], rest[2:]
+        resource, name, sub = rest[0], (rest[1] if len(rest) > 1 else None), (rest[2] if len(rest) > 2 else None)
+
+        if sub == 'log':
+            lines = ''.join(f'2024-01-01T00:00:{i % 60:02d}Z log line {i} from {name}\n'
+                            for i in range(int(query.get('tailLines', ['100'])[0])))
+            return self._send(200, lines.encode(), 'text/plain')
+
+        items = self.server.objects.get(resource)
+        if items is None:
+            return self._not_found(f'the server could not find the requested resource ({resource})')
+        if namespace:
+            items = [item for item in items if item['metadata'].get('namespace') == namespace]
+        if query.get('watch', ['0'])[0] in ('1', 'true'):
+            return self._watch(items, float(query.get('timeoutSeconds', ['60'])[0]))
+        if name:
+            items = [item for item in items if item['metadata']['name'] == name]
+            if not items:
+                return self._not_found(f'{resource} "{name}" not found')
+
+        if metrics:
+            kind = 'NodeMetrics' if resource == 'nodes' else 'PodMetrics'
+            usage = {'cpu': '250000000n', 'memory': '524288Ki'}
+            items = [{'metadata': item['metadata'], 'usage': usage, 'containers': [{'name': 'main', 'usage': usage}]}
+                     if resource == 'pods' else {'metadata': item['metadata'], 'usage': usage} for item in items]
+            return self._send(200, {'kind': f'{kind}List', 'items': items})
+
+        if 'as=Table' in self.headers.get('Accept', ''):
+            return self._send(200, {
+                'kind': 'Table', 'apiVersion': 'meta.k8s.io/v1',
+                'columnDefinitions': [{'name': column, 'type': 'string', 'priority': 0}
+                                      for column in COLUMNS[resource]],
+                'rows': [{'cells': table_cells(resource, item),
+                          'object': {'kind': 'PartialObjectMetadata', 'metadata': item['metadata']}}
+                         for item in items],
+            })
+        if name:
+            return self._send(200, items[0])
+        return self._send(200, {'kind': 'List', 'metadata': {'resourceVersion': '1'}, 'items': items})
+
+
+def make_server(port=0, latency=0.0, churn=0.0, **sizes):
+    args = argparse.Namespace(namespaces=20, nodes=10, pods=1000, services=200, events=500)
+    vars(args).update(sizes)
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.objects = build_objects(args)
+    server.latency = latency
+    server.churn = churn
+    server.resource_version = 1
+    server.requests = 0
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Kubernetes API stub server')
+    parser.add_argument('--port', type=int, default=18080)
+    parser.add_argument('--latency', type=float, default=0.0, help='응답마다 추가할 지연 (초)')
+    parser.add_argument('--churn', type=float, default=0.0, help='watch 연결마다 MODIFIED 이벤트를 보낼 간격 (초)')
+    parser.add_argument('--namespaces', type=int, default=20)
+    parser.add_argument('--nodes', type=int, default=10)
+    parser.add_argument('--pods', type=int, default=1000)
+    parser.add_argument('--services', type=int, default=200)
+    parser.add_argument('--events', type=int, default=500)
+    args = parser.parse_args()
+    server = make_server(args.port, args.latency, args.churn, namespaces=args.namespaces, nodes=args.nodes, pods=args.pods,
+                         services=args.services, events=args.events)
+    print(f'stub API server listening on http://127.0.0.1:{server.server_port}')
+    server.serve_forever()
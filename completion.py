@@ -0,0 +1,262 @@
+import bisect
+import hashlib
+import json
+import os
+import re
+import shlex
+import tempfile
+import threading
+import time
+
+from executor import run_command
+from help_cache import CACHE_DIR, help_cache, kubectl_client_version, kubectl_fingerprint
+from informer import informers
+from table_view import parse_columns
+
+MAX_SUGGESTIONS = 20
+# api-resources 는 CRD 설치로 바뀌므로 이 시간이 지나면 백그라운드에서 다시 조회 (초)
+RESOURCES_TTL_SECONDS = int(os.environ.get('K8SHELPER_COMPLETION_RESOURCES_TTL', '86400'))
+# watch 하지 않는 리소스(파드 등)의 이름은 필요할 때 kubectl 로 받아서 이 시간 동안 사용 (초)
+NAMES_TTL_SECONDS = int(os.environ.get('K8SHELPER_COMPLETION_NAMES_TTL', '30'))
+MAX_FETCHED_NAME_LISTS = 64
+
+# kubectl --help 의 "  create        Create a resource ..." 형태 줄
+COMMAND_LINE = re.compile(r'^  ([a-z][\w-]*)\s{2,}\S')
+# 옵션 목록의 "  -A, --all-namespaces=false:" 형태 줄
+FLAG_LINE = re.compile(r'^\s+(?:(-[A-Za-z0-9]), )?(--[A-Za-z0-9][\w-]*)')
+# 리소스 종류와 이름을 받는 명령어
+RESOURCE_VERBS = frozenset(['get', 'describe', 'delete', 'edit', 'label', 'annotate', 'patch', 'explain', 'scale',
+                            'autoscale', 'expose', 'set', 'rollout', 'wait', 'top', 'logs', 'exec', 'port-forward',
+                            'cordon', 'uncordon', 'drain', 'taint'])
+NAMESPACE_FLAGS = ('-n', '--namespace')
+
+
+def parse_commands(help_text):
+    # 명령어 목록 (최상위 --help 또는 하위 명령어가 있는 명령어의 --help)
+    names, in_commands = [], False
+    for line in help_text.splitlines():
+        if line and not line[0].isspace():
+            in_commands = line.rstrip().endswith(':') and 'Usage' not in line and 'Options' not in line \
+                and 'Examples' not in line
+            continue
+        match = COMMAND_LINE.match(line) if in_commands else None
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+def parse_flags(help_text):
+    flags, in_options = [], False
+    for line in help_text.splitlines():
+        if line and not line[0].isspace():
+            # "Options:", "Flags:", kubectl options 의 "... can be passed to any command:" 등
+            header = line.rstrip().lower()
+            in_options = header.endswith(':') and ('option' in header or 'flags' in header)
+            continue
+        match = FLAG_LINE.match(line) if in_options else None
+        if match:
+            flags += [flag for flag in match.groups() if flag]
+    return flags
+
+
+def parse_api_resources(output):
+    table = parse_columns(output)
+    if table is None:
+        return []
+    resources = []
+    for row in table[1]:
+        resources.append({'name': row.get('NAME', ''), 'kind': row.get('KIND', ''),
+                          'short_names': [name for name in row.get('SHORTNAMES', '').split(',') if name],
+                          'namespaced': row.get('NAMESPACED') == 'true'})
+    return resources
+
+
+class PrefixIndex:
+    # 정렬된 키 목록에서 이진 탐색으로 접두어가 같은 범위를 찾음
+    def __init__(self, keys=()):
+        self._keys = sorted(set(keys))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, prefix, limit=MAX_SUGGESTIONS):
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + '\uffff', start)
+        return self._keys[start:min(end, start + limit)]
+
+
+class CompletionIndex:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.ready = False
+        self._data = {}
+        self._lock = threading.Lock()
+        self._verbs = PrefixIndex()
+        self._flags = {}  # 명령어 -> PrefixIndex (전역 옵션 포함)
+        self._subcommands = {}  # 명령어 -> PrefixIndex
+        self._resources = PrefixIndex()
+        self._aliases = {}  # 이름/약어/종류 -> 리소스 이름
+        self._live = {}  # (리소스, 네임스페이스) -> (resourceVersion, PrefixIndex)
+        self._fetched = {}  # (리소스, 네임스페이스) -> (조회 시각, PrefixIndex)
+        self._fetching = set()
+
+    def _path(self):
+        fingerprint = kubectl_fingerprint()
+        if fingerprint is None:
+            return None
+        digest = hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f'completion-{kubectl_client_version()}-{digest}.json')
+
+    def load_or_build(self):
+        # 디스크에 저장된 인덱스가 있으면 바로 쓰고, 없으면 도움말을 파싱해서 만든 뒤 저장
+        path = self._path()
+        if path is None:
+            return
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+        if data is None:
+            data = self._build()
+            self._save(path, data)
+        self._install(data)
+        if time.time() - data.get('resources_at', 0) > RESOURCES_TTL_SECONDS:
+            resources = self._fetch_resources()
+            if resources:
+                data = dict(data, resources=resources, resources_at=time.time())
+                self._save(path, data)
+                self._install(data)
+
+    def _build(self):
+        verbs = parse_commands(run_command('kubectl --help').output)
+        global_flags = parse_flags(run_command('kubectl options').output)
+        flags, subcommands = {}, {}
+        for verb in verbs:
+            help_text = help_cache.get(verb)
+            flags[verb] = parse_flags(help_text)
+            children = parse_commands(help_text)
+            if children:
+                subcommands[verb] = children
+        resources = self._fetch_resources()
+        return {'verbs': verbs, 'global_flags': global_flags, 'flags': flags, 'subcommands': subcommands,
+                'resources': resources, 'resources_at': time.time() if resources else 0}
+
+    @staticmethod
+    def _fetch_resources():
+        result = run_command('kubectl api-resources', timeout=30)
+        return parse_api_resources(result.output) if result.returncode == 0 else []
+
+    def _save(self, path, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _install(self, data):
+        global_flags = data.get('global_flags', [])
+        aliases = {}
+        for resource in data.get('resources', []):
+            for alias in [resource['name'], resource['kind'].lower()] + resource['short_names']:
+                aliases.setdefault(alias, resource['name'])
+        with self._lock:
+            self._data = data
+            self._verbs = PrefixIndex(data.get('verbs', []))
+            self._flags = {verb: PrefixIndex(flags + global_flags) for verb, flags in data.get('flags', {}).items()}
+            self._subcommands = {verb: PrefixIndex(children) for verb, children in data.get('subcommands', {}).items()}
+            self._resources = PrefixIndex(aliases)
+            self._aliases = aliases
+            self.ready = True
+
+    def _live_names(self, alias, namespace):
+        # watch 로 메모리에 있는 리소스의 이름, 없으면 kubectl 로 받은 이름
+        name = self._aliases.get(alias, alias)
+        informer = informers.get(name)
+        if informer is None:
+            return self._fetched_names(name, namespace) if alias in self._aliases else PrefixIndex()
+        # 바뀐 것이 없으면 키 입력마다 다시 정렬하지 않음
+        cached = self._live.get((name, namespace))
+        if cached is not None and cached[0] == informer.resource_version:
+            return cached[1]
+        index = PrefixIndex(obj['metadata']['name'] for obj in informer.list(namespace))
+        self._live[(name, namespace)] = (informer.resource_version, index)
+        return index
+
+    def _fetched_names(self, name, namespace):
+        # 키 입력을 막지 않도록 조회는 백그라운드에서 하고, 끝나기 전에는 이전 목록(없으면 빈 목록)을 사용
+        key = (name, namespace)
+        with self._lock:
+            cached = self._fetched.get(key)
+            if (cached is None or time.monotonic() - cached[0] > NAMES_TTL_SECONDS) and key not in self._fetching:
+                self._fetching.add(key)
+                threading.Thread(target=self._fetch_names, args=key, name='completion-names', daemon=True).start()
+        return cached[1] if cached is not None else PrefixIndex()
+
+    def _fetch_names(self, name, namespace):
+        command = f'kubectl get {shlex.quote(name)} -o name'
+        if namespace:
+            command += f' -n {shlex.quote(namespace)}'
+        try:
+            result = run_command(command, timeout=10)
+            names = []
+            if result.returncode == 0:
+                names = [line.rsplit('/', 1)[-1] for line in result.full_output().splitlines() if line.strip()]
+            with self._lock:
+                self._fetched[(name, namespace)] = (time.monotonic(), PrefixIndex(names))
+                while len(self._fetched) > MAX_FETCHED_NAME_LISTS:
+                    del self._fetched[next(iter(self._fetched))]
+        finally:
+            with self._lock:
+                self._fetching.discard((name, namespace))
+
+    def complete(self, text, limit=MAX_SUGGESTIONS):
+        # 입력 중인 마지막 단어의 후보를 찾아 전체 명령어 형태로 반환
+        if not self.ready or not text:
+            return []
+        try:
+            tokens = shlex.split(text)
+        except ValueError:
+            return []
+        if text[-1].isspace():
+            tokens.append('')
+        head, current = text[:len(text) - len(tokens[-1])], tokens[-1]
+        if len(tokens) == 1:
+            return ['kubectl '] if 'kubectl'.startswith(current) and current != 'kubectl' else []
+        if tokens[0] != 'kubectl':
+            return []
+
+        args = tokens[1:-1]
+        positional = [token for i, token in enumerate(args)
+                      if not token.startswith('-') and not (i > 0 and args[i - 1] in NAMESPACE_FLAGS)]
+        namespace = next((args[i + 1] for i, token in enumerate(args[:-1]) if token in NAMESPACE_FLAGS), None)
+        verb = positional[0] if positional else None
+
+        if args and args[-1] in NAMESPACE_FLAGS:
+            candidates = self._live_names('namespaces', None).search(current, limit)
+        elif current.startswith('-'):
+            index = self._flags.get(verb) or PrefixIndex(self._data.get('global_flags', []))
+            candidates = index.search(current, limit)
+        elif verb is None:
+            candidates = self._verbs.search(current, limit)
+        elif verb in self._subcommands and len(positional) == 1:
+            candidates = self._subcommands[verb].search(current, limit)
+        elif verb in RESOURCE_VERBS:
+            resource_args = positional[2:] if verb in self._subcommands else positional[1:]
+            if '/' in current:
+                kind, name = current.split('/', 1)
+                candidates = [f'{kind}/{match}' for match in self._live_names(kind, namespace).search(name, limit)]
+            elif not resource_args and verb not in ('logs', 'exec', 'port-forward'):
+                candidates = self._resources.search(current, limit)
+            else:
+                kind = resource_args[0] if resource_args else 'pods'
+                candidates = self._live_names(kind, namespace).search(current, limit)
+        else:
+            candidates = []
+        return [head + candidate for candidate in candidates if candidate != current]
+
+
+completion_index = CompletionIndex()
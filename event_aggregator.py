@@ -0,0 +1,208 @@
+import heapq
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from executor import ProcessLimitReached, processes
+from informer import Informer, human_duration
+from k8s_api import ApiError, ApiUnsupported, api_backend
+
+# 이벤트 요약 설정 (환경 변수로 조정, 0 이면 수집 안 함)
+MAX_EVENT_GROUPS = int(os.environ.get('K8SHELPER_MAX_EVENT_GROUPS', '5000'))  # 메모리에 유지할 (객체, 사유, 메시지) 묶음 수
+MAX_EVENT_UIDS = MAX_EVENT_GROUPS * 4  # count 증가분 계산용으로 기억하는 이벤트 수
+MAX_BACKOFF_SECONDS = 60
+READ_CHUNK_BYTES = 65536
+
+logger = logging.getLogger(__name__)
+
+
+def event_time(obj):
+    # core/v1 과 events.k8s.io 의 시각 필드 중 가장 최근 발생 시각
+    metadata = obj.get('metadata') or {}
+    value = (obj.get('lastTimestamp') or (obj.get('series') or {}).get('lastObservedTime') or obj.get('eventTime')
+             or metadata.get('creationTimestamp'))
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return time.time()
+
+
+class EventAggregator:
+    # 같은 객체/사유/메시지의 이벤트를 한 묶음으로 합치고 발생 횟수와 마지막 시각만 유지
+    def __init__(self, max_groups=MAX_EVENT_GROUPS):
+        self.max_groups = max_groups
+        self.source = None  # 'api' 또는 'kubectl'
+        self.last_error = None
+        self._groups = OrderedDict()  # (네임스페이스, 종류, 이름, 사유, 메시지) -> 묶음, 최근 갱신 순
+        self._event_counts = OrderedDict()  # 이벤트 uid -> 이미 반영한 count
+        self._namespace_counts = Counter()
+        self._lock = threading.Lock()
+        self._started = False
+
+    def add(self, obj):
+        metadata = obj.get('metadata') or {}
+        involved = obj.get('involvedObject') or obj.get('regarding') or {}
+        namespace = metadata.get('namespace') or involved.get('namespace') or ''
+        key = (namespace, involved.get('kind', ''), involved.get('name', ''), obj.get('reason') or '',
+               obj.get('message') or obj.get('note') or '')
+        count = obj.get('count') or (obj.get('series') or {}).get('count') or 1
+        uid = metadata.get('uid') or metadata.get('name')
+        seen_at = event_time(obj)
+        with self._lock:
+            # 같은 이벤트의 count 가 늘어난 만큼만 더함 (다시 list 해도 중복으로 세지 않음)
+            previous = self._event_counts.pop(uid, 0)
+            self._event_counts[uid] = max(previous, count)
+            if len(self._event_counts) > MAX_EVENT_UIDS:
+                self._event_counts.popitem(last=False)
+            delta = count - previous
+            if delta <= 0:
+                return
+            group = self._groups.pop(key, None)
+            if group is None:
+                group = {'namespace': key[0], 'kind': key[1], 'name': key[2], 'reason': key[3], 'message': key[4],
+                         'type': obj.get('type') or 'Normal', 'count': 0, 'first_seen': seen_at,
+                         'last_seen': seen_at}
+            group['count'] += delta
+            group['last_seen'] = max(group['last_seen'], seen_at)
+            group['first_seen'] = min(group['first_seen'], seen_at)
+            self._groups[key] = group
+            self._namespace_counts[namespace] += delta
+            # 오래 갱신되지 않은 묶음부터 버려서 메모리 사용량을 제한
+            while len(self._groups) > self.max_groups:
+                _, old = self._groups.popitem(last=False)
+                self._namespace_counts[old['namespace']] -= old['count']
+                if self._namespace_counts[old['namespace']] <= 0:
+                    del self._namespace_counts[old['namespace']]
+
+    def __len__(self):
+        return len(self._groups)
+
+    def top_warnings(self, limit=20):
+        with self._lock:
+            groups = [group for group in self._groups.values() if group['type'] == 'Warning']
+            return heapq.nlargest(limit, groups, key=lambda group: group['count'])
+
+    def noisy_namespaces(self, limit=20):
+        with self._lock:
+            return self._namespace_counts.most_common(limit)
+
+    def recent_failures(self, limit=20):
+        # 최근에 경고가 난 객체 순서, 객체마다 한 줄로 사유를 모아서 보여줌
+        with self._lock:
+            groups = sorted((group for group in self._groups.values() if group['type'] == 'Warning'),
+                            key=lambda group: group['last_seen'], reverse=True)
+            objects = OrderedDict()
+            for group in groups:
+                object_key = (group['namespace'], group['kind'], group['name'])
+                entry = objects.get(object_key)
+                if entry is None:
+                    if len(objects) >= limit:
+                        continue
+                    entry = objects[object_key] = dict(group, reasons=[])
+                    entry['count'] = 0
+                if group['reason'] not in entry['reasons']:
+                    entry['reasons'].append(group['reason'])
+                entry['count'] += group['count']
+            return list(objects.values())
+
+    def rows(self, view, limit=20):
+        # 화면의 표 형식 (열 이름 목록, 행 목록)
+        now = time.time()
+        if view == 'namespaces':
+            return ['NAMESPACE', 'COUNT'], [{'NAMESPACE': namespace or '<cluster>', 'COUNT': count}
+                                            for namespace, count in self.noisy_namespaces(limit)]
+        if view == 'failures':
+            return ['LAST SEEN', 'NAMESPACE', 'OBJECT', 'REASONS', 'COUNT'], [
+                {'LAST SEEN': human_duration(now - entry['last_seen']), 'NAMESPACE': entry['namespace'],
+                 'OBJECT': f"{entry['kind'].lower()}/{entry['name']}", 'REASONS': ', '.join(entry['reasons']),
+                 'COUNT': entry['count']} for entry in self.recent_failures(limit)]
+        return ['COUNT', 'LAST SEEN', 'NAMESPACE', 'OBJECT', 'REASON', 'MESSAGE'], [
+            {'COUNT': group['count'], 'LAST SEEN': human_duration(now - group['last_seen']),
+             'NAMESPACE': group['namespace'], 'OBJECT': f"{group['kind'].lower()}/{group['name']}",
+             'REASON': group['reason'], 'MESSAGE': group['message']} for group in self.top_warnings(limit)]
+
+    def start(self):
+        if self.max_groups <= 0 or self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._start, name='event-aggregator', daemon=True).start()
+
+    def _start(self):
+        # API 서버에 직접 연결할 수 있으면 watch, 아니면 kubectl get events -w 출력을 읽음
+        backoff = 1
+        while True:
+            try:
+                resource = api_backend.client.resolve('events')
+                EventInformer(resource, self).start()
+                self.source = 'api'
+                return
+            except ApiUnsupported:
+                break
+            except (ApiError, OSError, ValueError) as e:
+                self.last_error = str(e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+        self.source = 'kubectl'
+        backoff = 1
+        while True:
+            started = time.monotonic()
+            try:
+                self._watch_kubectl()
+            except ProcessLimitReached as e:
+                self.last_error = str(e)
+            if time.monotonic() - started > MAX_BACKOFF_SECONDS:
+                backoff = 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    def _watch_kubectl(self):
+        # -o json 은 객체를 여러 줄로 이어서 출력하므로 버퍼에서 객체 단위로 잘라서 읽음
+        process = processes.spawn('kubectl get events -A --watch -o json', stdout=subprocess.PIPE,
+                                  stderr=subprocess.PIPE)
+        decoder, buffer = json.JSONDecoder(), ''
+        try:
+            while True:
+                data = process.stdout.read1(READ_CHUNK_BYTES)
+                if not data:
+                    break
+                buffer += data.decode('utf-8', errors='replace')
+                while True:
+                    buffer = buffer.lstrip()
+                    try:
+                        obj, end = decoder.raw_decode(buffer)
+                    except ValueError:
+                        break
+                    buffer = buffer[end:]
+                    self.add(obj)
+            error = process.stderr.read().decode('utf-8', errors='replace').strip()
+            if process.wait() != 0 and error:
+                self.last_error = error
+                logger.warning('kubectl get events -w 종료: %s', error)
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+            process.wait()
+            processes.release(process)
+
+
+class EventInformer(Informer):
+    # 이벤트 객체는 저장하지 않고 받는 대로 요약에만 반영
+    def __init__(self, resource, aggregator):
+        super().__init__(resource)
+        self.aggregator = aggregator
+
+    def _replace(self, objects):
+        for obj in objects:
+            self.aggregator.add(obj)
+
+    def _apply(self, event_type, obj):
+        if event_type in ('ADDED', 'MODIFIED'):
+            self.aggregator.add(obj)
+
+
+event_aggregator = EventAggregator()
@@ -0,0 +1,320 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from metrics import CommandTimer, command_verb
+from spool import PREVIEW_LINES, SPOOL_THRESHOLD_BYTES, open_spool_file, spools
+
+# 동시 실행 제한 (환경 변수로 조정)
+MAX_WORKERS = int(os.environ.get('K8SHELPER_MAX_WORKERS', '8'))  # 전체 동시 실행 수
+MAX_JOBS_PER_USER = int(os.environ.get('K8SHELPER_MAX_JOBS_PER_USER', '2'))  # 접속 주소별 동시 실행 수 (여러 탭 합계)
+MAX_QUEUED_JOBS = int(os.environ.get('K8SHELPER_MAX_QUEUED_JOBS', '64'))  # 대기 + 실행 중 작업 상한
+JOB_RETENTION_SECONDS = 600  # 완료된 작업 결과 보관 시간
+MAX_PROCESSES = int(os.environ.get('K8SHELPER_MAX_PROCESSES', '32'))  # 동시에 살아 있는 kubectl 프로세스 상한
+SPAWN_WAIT_SECONDS = 10  # 프로세스 상한에 걸렸을 때 자리가 나기를 기다리는 시간
+
+# 명령어별 제한 시간 (초), K8SHELPER_COMMAND_TIMEOUTS='exec=10,proxy=5' 형식으로 덮어씀
+DEFAULT_COMMAND_TIMEOUT = float(os.environ.get('K8SHELPER_COMMAND_TIMEOUT', '60'))
+COMMAND_TIMEOUTS = {
+    # 스스로 끝나지 않는 대화형 명령어는 짧게
+    'exec': 30, 'attach': 30, 'port-forward': 30, 'proxy': 30, 'run': 60,
+    # 완료를 기다리는 명령어는 길게
+    'wait': 300, 'drain': 300,
+}
+for _item in os.environ.get('K8SHELPER_COMMAND_TIMEOUTS', '').split(','):
+    if '=' in _item:
+        _verb, _seconds = _item.split('=', 1)
+        COMMAND_TIMEOUTS[_verb.strip()] = float(_seconds)
+
+# 시간 초과로 종료된 명령어의 종료 코드
+TIMEOUT_RETURNCODE = 124
+CANCELLED_RETURNCODE = 130
+CANCELLED_MESSAGE = 'error: 새 명령어가 실행되어 이전 명령어를 취소했습니다.'
+
+
+class JobRejected(Exception):
+    pass
+
+
+class CommandResult:
+    def __init__(self, output, returncode, duration, spool=None):
+        self.output = output
+        self.returncode = returncode
+        self.duration = duration
+        self.spool = spool  # 출력이 커서 파일로 보관한 경우 spool.Spool, output 에는 앞부분만
+        self.fetched_at = time.time()
+
+    def full_output(self):
+        # 출력을 파싱하는 곳은 앞부분이 아니라 spool 파일의 전체 출력을 사용
+        if self.spool is None:
+            return self.output
+        try:
+            return self.spool.read_all().decode('utf-8', errors='replace').strip()
+        except (OSError, ValueError):  # 보관 기간이 지나 임시 파일이 정리됨
+            return self.output
+
+
+class ProcessLimitReached(Exception):
+    pass
+
+
+class ProcessCancelled(Exception):
+    pass
+
+
+def command_timeout(command):
+    return COMMAND_TIMEOUTS.get(command_verb(command), DEFAULT_COMMAND_TIMEOUT)
+
+
+def kill_process_group(process):
+    # 셸과 그 아래 kubectl 까지 함께 종료
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+_owner = threading.local()
+
+
+@contextmanager
+def process_owner(owner):
+    # 이 블록 안에서 실행한 프로세스를 owner(작업 id 등) 로 묶어서 함께 취소
+    previous = getattr(_owner, 'value', None)
+    _owner.value = owner
+    try:
+        yield
+    finally:
+        _owner.value = previous
+
+
+class ProcessTable:
+    # 살아 있는 kubectl 프로세스 목록, 전체 개수 제한과 작업 취소에 사용
+    def __init__(self, max_processes=MAX_PROCESSES):
+        self.max_processes = max_processes
+        self.cancelled = set()  # 취소로 종료한 pid
+        self._cancelled_owners = deque(maxlen=1024)  # 프로세스를 만들기 전에 취소된 작업
+        self._slots = threading.BoundedSemaphore(max_processes)
+        self._processes = {}  # pid -> (process, owner)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._processes)
+
+    def spawn(self, command, wait=SPAWN_WAIT_SECONDS, **popen_args):
+        owner = getattr(_owner, 'value', None)
+        if owner is not None and owner in self._cancelled_owners:
+            raise ProcessCancelled()
+        if not self._slots.acquire(timeout=wait):
+            raise ProcessLimitReached(f'실행 중인 kubectl 프로세스가 {self.max_processes}개로 가득 찼습니다. '
+                                      f'잠시 후 다시 실행해주세요.')
+        try:
+            # 셸과 kubectl 을 함께 종료할 수 있도록 별도 프로세스 그룹으로 실행
+            process = subprocess.Popen(command, shell=True, start_new_session=True, **popen_args)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._processes[process.pid] = (process, owner)
+        return process
+
+    def release(self, process):
+        with self._lock:
+            entry = self._processes.pop(process.pid, None)
+            self.cancelled.discard(process.pid)
+        if entry is not None:
+            self._slots.release()
+
+    def kill_owner(self, owner):
+        with self._lock:
+            self._cancelled_owners.append(owner)
+            targets = [process for process, process_owner in self._processes.values() if process_owner == owner]
+            self.cancelled.update(process.pid for process in targets)
+        for process in targets:
+            kill_process_group(process)
+        return len(targets)
+
+
+processes = ProcessTable()
+
+
+def run_command(command, timeout=None):
+    # timeout 을 주지 않으면 명령어별 기본 제한 시간 적용
+    if timeout is None:
+        timeout = command_timeout(command)
+    started = time.monotonic()
+    # stdout 은 메모리 대신 임시 파일로 받고, 작으면 읽어 들이고 크면 파일째 보관
+    spool_file = open_spool_file()
+    with CommandTimer(command) as timer:
+        try:
+            process = processes.spawn(command, stdout=spool_file, stderr=subprocess.PIPE)
+        except (ProcessLimitReached, ProcessCancelled) as e:
+            spool_file.close()
+            os.unlink(spool_file.name)
+            cancelled = isinstance(e, ProcessCancelled)
+            returncode = CANCELLED_RETURNCODE if cancelled else 1
+            timer.finish(returncode, 0)
+            return CommandResult(CANCELLED_MESSAGE if cancelled else f'error: {e}', returncode,
+                                 time.monotonic() - started)
+        timer.spawned()
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+            returncode = process.returncode
+            if process.pid in processes.cancelled:
+                stderr += f'\n{CANCELLED_MESSAGE}'.encode('utf-8')
+                returncode = CANCELLED_RETURNCODE
+        except subprocess.TimeoutExpired:
+            kill_process_group(process)
+            _, stderr = process.communicate()
+            stderr += f'\nerror: {timeout:g}초 안에 끝나지 않아 명령어를 종료했습니다.'.encode('utf-8')
+            returncode = TIMEOUT_RETURNCODE
+        finally:
+            processes.release(process)
+        stdout_bytes = os.fstat(spool_file.fileno()).st_size
+        timer.finish(returncode, stdout_bytes, len(stderr))
+
+    # 실패하면 stderr 의 오류 메시지를 보여주므로 stdout 은 크더라도 보관하지 않음
+    spool = None
+    if returncode == 0 and stdout_bytes > SPOOL_THRESHOLD_BYTES:
+        spool = spools.add(spool_file.name, spool_file)
+        output = '\n'.join(spool.read_lines(0, PREVIEW_LINES))
+    else:
+        if returncode == 0:
+            spool_file.seek(0)
+            output = spool_file.read().decode('utf-8')
+        else:
+            output = stderr.decode('utf-8')
+        spool_file.close()
+        os.unlink(spool_file.name)
+
+    return CommandResult(output.strip(), returncode, time.monotonic() - started, spool)
+
+
+class Job:
+    def __init__(self, user, command, session=None):
+        self.id = uuid.uuid4().hex
+        self.user = user  # 접속 주소, 동시 실행 상한 단위
+        self.session = session  # 브라우저 세션, 이전 명령어를 대체하는 단위
+        self.command = command
+        self.status = 'queued'  # queued -> running -> done / error, 또는 cancelled
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'error', 'cancelled')
+
+
+class JobQueue:
+    def __init__(self, max_workers=MAX_WORKERS, max_jobs_per_user=MAX_JOBS_PER_USER,
+                 max_queued=MAX_QUEUED_JOBS):
+        self.max_jobs_per_user = max_jobs_per_user
+        self.max_queued = max_queued
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='kubectl')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _active_jobs(self, user=None, session=None):
+        return [job for job in self._jobs.values()
+                if not job.finished and (user is None or job.user == user)
+                and (session is None or job.session == session)]
+
+    def _prune(self):
+        deadline = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job.id for job in self._jobs.values()
+                       if job.finished and job.finished_at < deadline]:
+            del self._jobs[job_id]
+
+    def submit(self, user, command, fn=None, *args, session=None, on_done=None):
+        # fn 이 없으면 command 를 셸에서 그대로 실행, on_done(job) 은 작업이 끝난(상한에서 빠진) 뒤 호출
+        if fn is None:
+            fn, args = run_command, (command,)
+
+        with self._lock:
+            self._prune()
+            # 같은 브라우저 세션의 이전 명령어는 새 명령어로 대체되므로 취소
+            # (같은 NAT/프록시 뒤의 다른 사용자 명령어는 건드리지 않음)
+            if session is not None:
+                for job in self._active_jobs(session=session):
+                    self._cancel(job)
+            # 한 접속 주소에서 여러 탭/세션으로 워커를 독차지하지 않도록 제한
+            if len(self._active_jobs(user)) >= self.max_jobs_per_user:
+                raise JobRejected(f'이미 실행 중인 명령어가 {self.max_jobs_per_user}개 있습니다. 완료 후 다시 실행해주세요.')
+            if len(self._active_jobs()) >= self.max_queued:
+                raise JobRejected('서버가 혼잡합니다. 잠시 후 다시 실행해주세요.')
+            job = Job(user, command, session)
+            self._jobs[job.id] = job
+
+        self._pool.submit(self._run, job, fn, args, on_done)
+        return job.id
+
+    def add_result(self, user, command, result, session=None):
+        # 메모리 캐시 등에서 바로 만든 결과를 완료된 작업으로 등록
+        job = Job(user, command, session)
+        job.result = result
+        job.status = 'done'
+        job.finished_at = time.time()
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        return job.id
+
+    def _cancel(self, job):
+        job.status = 'cancelled'
+        job.finished_at = time.time()
+        processes.kill_owner(job.id)
+
+    def cancel_session(self, session):
+        with self._lock:
+            jobs = self._active_jobs(session=session)
+            for job in jobs:
+                self._cancel(job)
+        return len(jobs)
+
+    def _run(self, job, fn, args, on_done=None):
+        try:
+            self._execute(job, fn, args)
+        finally:
+            if on_done is not None:
+                on_done(job)
+
+    def _execute(self, job, fn, args):
+        with self._lock:
+            if job.status == 'cancelled':
+                return
+            job.status = 'running'
+        try:
+            with process_owner(job.id):
+                result = fn(*args)
+        except Exception as e:
+            error, result = str(e), None
+        else:
+            error = None
+        # 취소(_cancel)와 동시에 끝나도 cancelled 를 덮어쓰지 않도록 잠금 안에서 확인 후 기록
+        with self._lock:
+            if job.status != 'cancelled':
+                job.result, job.error = result, error
+                job.status = 'error' if error is not None else 'done'
+            if job.finished_at is None:
+                job.finished_at = time.time()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def pop(self, job_id):
+        # 결과를 바로 가져가는 작업(자동 새로고침 등)은 보관 기간을 기다리지 않고 정리
+        with self._lock:
+            return self._jobs.pop(job_id, None)
+
+
+job_queue = JobQueue()
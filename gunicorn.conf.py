@@ -0,0 +1,19 @@
+# gunicorn -c gunicorn.conf.py wsgi:application
+import os
+
+bind = f"0.0.0.0:{os.environ.get('K8SHELPER_PORT', '8050')}"
+# 작업, 스트림, 표는 프로세스 메모리에 있어서 폴링 요청이 같은 프로세스로 가야 함
+# 워커를 늘리려면 사용자별로 고정되는 로드 밸런서가 필요하므로 기본은 워커 1개에 스레드로 처리
+workers = int(os.environ.get('K8SHELPER_WORKERS', '1'))
+threads = int(os.environ.get('K8SHELPER_THREADS', '16'))
+worker_class = 'gthread'
+# 마스터에서 앱을 한 번 만들고 워커는 fork 로 레이아웃과 명령어 목록을 공유
+preload_app = True
+timeout = 120
+keepalive = 5
+accesslog = os.environ.get('K8SHELPER_ACCESS_LOG') or None
+
+
+def post_fork(server, worker):
+    import k8shelper
+    k8shelper.start_background_tasks()
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from executor import run_command
+
+# 캐시 디렉터리 (환경 변수로 조정)
+CACHE_DIR = os.environ.get('K8SHELPER_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'k8shelper'))
+WARM_WORKERS = int(os.environ.get('K8SHELPER_HELP_WARM_WORKERS', '8'))
+
+
+# kubectl 바이너리 경로와 파일 정보로 만든 지문 (바이너리가 바뀌면 값이 달라짐)
+# inode 는 이미지 레이어를 풀 때마다 달라지므로 빼서 빌드 시 채운 캐시를 그대로 씀
+def kubectl_fingerprint(kubectl='kubectl'):
+    path = shutil.which(kubectl)
+    if path is None:
+        return None
+    st = os.stat(path)
+    return f'{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}'
+
+
+def kubectl_client_version():
+    result = run_command('kubectl version --client -o json')
+    if result.returncode != 0:
+        return 'unknown'
+    try:
+        return json.loads(result.output)['clientVersion']['gitVersion']
+    except (ValueError, KeyError):
+        return 'unknown'
+
+
+class HelpCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._fingerprint = None
+        self._version = None
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self):
+        digest = hashlib.sha1(self._fingerprint.encode()).hexdigest()[:12]
+        return os.path.join(self.cache_dir, f'help-{self._version}-{digest}.json')
+
+    def _check_binary(self):
+        # 바이너리가 바뀌었으면 해당 버전의 캐시 파일로 교체
+        fingerprint = kubectl_fingerprint()
+        if fingerprint == self._fingerprint:
+            return fingerprint is not None
+        with self._lock:
+            self._fingerprint = fingerprint
+            self._entries = {}
+            if fingerprint is None:
+                return False
+            self._version = kubectl_client_version()
+            try:
+                with open(self._path(), encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                pass
+        return True
+
+    def _save(self):
+        # 임시 파일에 쓴 뒤 교체해서 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 함
+        with self._lock:
+            entries = dict(self._entries)
+            path = self._path()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+    def _fetch(self, command):
+        result = run_command(f'kubectl {command} --help')
+        if result.returncode == 0:
+            with self._lock:
+                self._entries[command] = result.output
+        return result.output
+
+    def get(self, command):
+        if not self._check_binary():
+            return run_command(f'kubectl {command} --help').output
+        output = self._entries.get(command)
+        if output is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            output = self._fetch(command)
+            self._save()
+        return output
+
+    def warm(self, command_names, max_workers=WARM_WORKERS):
+        # 캐시에 없는 명령어의 도움말을 병렬로 미리 가져와 디스크에 저장
+        if not self._check_binary():
+            return
+        missing = [command for command in command_names if command not in self._entries]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='help-warm') as pool:
+            list(pool.map(self._fetch, missing))
+        self._save()
+
+
+help_cache = HelpCache()
@@ -0,0 +1,275 @@
+import hashlib
+import logging
+import os
+import queue
+import re
+import shlex
+import sqlite3
+import threading
+import time
+import zlib
+
+from executor import CommandResult
+from help_cache import CACHE_DIR
+from multicluster import current_context
+from spool import PREVIEW_LINES, SPOOL_THRESHOLD_BYTES, open_spool_file, spools
+
+# 명령어 기록 설정 (환경 변수로 조정, 용량이 0 이면 기록 안 함)
+HISTORY_DB = os.environ.get('K8SHELPER_HISTORY_DB') or os.path.join(CACHE_DIR, 'history.db')
+HISTORY_MAX_BYTES = int(float(os.environ.get('K8SHELPER_HISTORY_MAX_MB', '256')) * 1024 * 1024)  # 압축된 출력 합계 상한
+HISTORY_RETENTION_SECONDS = float(os.environ.get('K8SHELPER_HISTORY_DAYS', '30')) * 86400
+HISTORY_MAX_OUTPUT_BYTES = 8 * 1024 * 1024  # 이보다 큰 출력은 앞부분만 보관
+HISTORY_INDEX_BYTES = 1024 * 1024  # 출력 검색 색인에는 앞부분만 넣음
+EVICT_INTERVAL_SECONDS = 60
+EVICT_BATCH = 200
+MAX_HISTORY_RESULTS = 100
+MAX_PENDING_RECORDS = 1000
+# 시크릿 값이 디스크에 남지 않도록 시크릿 조회 출력은 기록하지 않음
+SENSITIVE_COMMAND = re.compile(r'\bsecrets?\b')
+SECRET_PLACEHOLDER = '(시크릿 조회 출력은 기록하지 않습니다)'
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    stored INTEGER NOT NULL,
+    truncated INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    context TEXT NOT NULL,
+    command TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    returncode INTEGER NOT NULL,
+    blob_id INTEGER NOT NULL REFERENCES blobs(id)
+);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS runs_blob_id ON runs(blob_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5(command, content='runs', content_rowid='id');
+CREATE VIRTUAL TABLE IF NOT EXISTS outputs_fts USING fts5(output, content='');
+CREATE TRIGGER IF NOT EXISTS runs_fts_insert AFTER INSERT ON runs BEGIN
+    INSERT INTO runs_fts(rowid, command) VALUES (new.id, new.command);
+END;
+CREATE TRIGGER IF NOT EXISTS runs_fts_delete AFTER DELETE ON runs BEGIN
+    INSERT INTO runs_fts(runs_fts, rowid, command) VALUES ('delete', old.id, old.command);
+END;
+"""
+
+
+def command_context(command, default):
+    # 명령어에 --context 가 있으면 그 컨텍스트, 아니면 현재 컨텍스트
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return default
+    for i, token in enumerate(tokens):
+        if token.startswith('--context='):
+            return token.split('=', 1)[1]
+        if token == '--context' and i + 1 < len(tokens):
+            return tokens[i + 1]
+    return default
+
+
+def match_query(query):
+    # 검색어마다 접두어 검색 (kube-system 처럼 구분자가 있으면 구절로), 모두 들어 있어야 함
+    terms = []
+    for word in query.split():
+        word = word.replace('"', '""')
+        terms.append(f'"{word}"*')
+    return ' AND '.join(terms)
+
+
+def index_text(data):
+    return data[:HISTORY_INDEX_BYTES].decode('utf-8', errors='ignore')
+
+
+class HistoryStore:
+    # 실행 결과는 큐에 넣고 백그라운드에서 압축/중복 제거해서 SQLite 에 기록
+    def __init__(self, path=HISTORY_DB, max_bytes=HISTORY_MAX_BYTES, retention=HISTORY_RETENTION_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.retention = retention
+        self.last_error = None
+        self.dropped = 0
+        self._queue = queue.Queue(MAX_PENDING_RECORDS)
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._last_evict = 0.0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute('PRAGMA journal_mode=WAL')
+        return db
+
+    def record(self, user, command, result, context=None):
+        # 실행 경로를 막지 않도록 기록은 큐에만 넣음 (가득 차면 버림)
+        if not self.enabled or result is None:
+            return
+        self._start()
+        try:
+            self._queue.put_nowait((user or '', context, command, time.time() - result.duration, result))
+        except queue.Full:
+            self.dropped += 1
+
+    def run(self, user, context, command, fn, *args):
+        # 작업 큐에서 fn(*args) 를 실행하고 결과를 기록
+        result = fn(*args)
+        self.record(user, command, result, context)
+        return result
+
+    def _start(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._write_loop, name='history-writer', daemon=True).start()
+
+    def _write_loop(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = self._connect()
+            db.executescript(SCHEMA)
+        except (OSError, sqlite3.Error) as e:
+            self.last_error = str(e)
+            logger.warning('명령어 기록 DB 를 열지 못했습니다: %s', e)
+            return
+        while True:
+            records = [self._queue.get()]
+            while len(records) < 100:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with db:
+                    for record in records:
+                        self._write(db, *record)
+                if time.time() - self._last_evict > EVICT_INTERVAL_SECONDS:
+                    self._last_evict = time.time()
+                    self.evict(db)
+                self.last_error = None
+            except sqlite3.Error as e:
+                self.last_error = str(e)
+                logger.warning('명령어 기록 실패: %s', e)
+
+    @staticmethod
+    def _output_bytes(command, result):
+        if SENSITIVE_COMMAND.search(command):
+            return SECRET_PLACEHOLDER.encode('utf-8'), False
+        if result.spool is not None:
+            try:
+                data = result.spool.read_all(HISTORY_MAX_OUTPUT_BYTES)
+                return data, len(data) < result.spool.size
+            except (OSError, ValueError):
+                pass  # 기록하기 전에 임시 파일이 정리됨, 미리보기만 보관
+        data = result.output.encode('utf-8')
+        return data[:HISTORY_MAX_OUTPUT_BYTES], len(data) > HISTORY_MAX_OUTPUT_BYTES
+
+    def _write(self, db, user, context, command, started_at, result):
+        # 같은 출력은 해시로 한 번만 압축해서 보관하고 실행 기록만 추가
+        if context is None:
+            context = command_context(command, current_context())
+        data, truncated = self._output_bytes(command, result)
+        digest = hashlib.sha256(data).hexdigest()
+        row = db.execute('SELECT id FROM blobs WHERE hash = ?', (digest,)).fetchone()
+        if row is None:
+            compressed = zlib.compress(data, 6)
+            blob_id = db.execute('INSERT INTO blobs (hash, size, stored, truncated, data) VALUES (?, ?, ?, ?, ?)',
+                                 (digest, len(data), len(compressed), int(truncated), compressed)).lastrowid
+            db.execute('INSERT INTO outputs_fts (rowid, output) VALUES (?, ?)', (blob_id, index_text(data)))
+        else:
+            blob_id = row[0]
+        db.execute('INSERT INTO runs (user, context, command, started_at, duration, returncode, blob_id) '
+                   'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                   (user, context, command, started_at, result.duration, result.returncode, blob_id))
+
+    def evict(self, db):
+        # 보관 기간이 지난 기록을 지우고, 압축된 출력 합계가 상한을 넘으면 오래된 기록부터 지움
+        with db:
+            db.execute('DELETE FROM runs WHERE started_at < ?', (time.time() - self.retention,))
+            self._delete_orphans(db)
+        while True:
+            total = db.execute('SELECT COALESCE(SUM(stored), 0) FROM blobs').fetchone()[0]
+            if total <= self.max_bytes:
+                break
+            with db:
+                deleted = db.execute('DELETE FROM runs WHERE id IN (SELECT id FROM runs ORDER BY started_at LIMIT ?)',
+                                     (EVICT_BATCH,)).rowcount
+                self._delete_orphans(db)
+            if not deleted:
+                break
+
+    @staticmethod
+    def _delete_orphans(db):
+        # 색인에 내용을 두지 않는 (content='') 출력 색인은 지울 때 원래 텍스트를 넘겨야 함
+        orphans = db.execute('SELECT id, data FROM blobs WHERE id NOT IN (SELECT blob_id FROM runs)').fetchall()
+        for blob_id, data in orphans:
+            db.execute("INSERT INTO outputs_fts (outputs_fts, rowid, output) VALUES ('delete', ?, ?)",
+                       (blob_id, index_text(zlib.decompress(data))))
+            db.execute('DELETE FROM blobs WHERE id = ?', (blob_id,))
+
+    def search(self, query='', limit=MAX_HISTORY_RESULTS):
+        # 명령어 또는 출력에 검색어가 모두 들어 있는 실행 기록, 최근 순
+        if not self.enabled or not os.path.exists(self.path):
+            return []
+        columns = 'runs.id, user, context, command, started_at, duration, returncode, size, truncated'
+        sql = f'SELECT {columns} FROM runs JOIN blobs ON blobs.id = runs.blob_id'
+        params = []
+        if query.strip():
+            sql += ' WHERE runs.id IN (SELECT rowid FROM runs_fts WHERE runs_fts MATCH ?) ' \
+                   'OR runs.blob_id IN (SELECT rowid FROM outputs_fts WHERE outputs_fts MATCH ?)'
+            params = [match_query(query)] * 2
+        sql += ' ORDER BY started_at DESC LIMIT ?'
+        db = self._connect()
+        try:
+            rows = db.execute(sql, params + [limit]).fetchall()
+        except sqlite3.Error as e:  # 처음 기록하기 전 (테이블 없음) 등
+            self.last_error = str(e)
+            return []
+        finally:
+            db.close()
+        return [dict(zip(('id', 'user', 'context', 'command', 'started_at', 'duration', 'returncode', 'size',
+                          'truncated'), row)) for row in rows]
+
+    def open(self, run_id):
+        # 저장한 출력으로 결과를 다시 만듦 (큰 출력은 실행할 때와 같이 임시 파일 뷰어로)
+        db = self._connect()
+        try:
+            row = db.execute('SELECT user, context, command, started_at, duration, returncode, truncated, data '
+                             'FROM runs JOIN blobs ON blobs.id = runs.blob_id WHERE runs.id = ?',
+                             (run_id,)).fetchone()
+        finally:
+            db.close()
+        if row is None:
+            return None, None
+        user, context, command, started_at, duration, returncode, truncated, data = row
+        data = zlib.decompress(data)
+        spool = None
+        if len(data) > SPOOL_THRESHOLD_BYTES:
+            spool_file = open_spool_file()
+            spool_file.write(data)
+            spool_file.flush()
+            spool = spools.add(spool_file.name, spool_file)
+            output = '\n'.join(spool.read_lines(0, PREVIEW_LINES))
+        else:
+            output = data.decode('utf-8', errors='replace')
+        result = CommandResult(output, returncode, duration, spool)
+        result.fetched_at = started_at + duration
+        run = {'user': user, 'context': context, 'command': command, 'started_at': started_at,
+               'truncated': bool(truncated)}
+        return result, run
+
+
+history = HistoryStore()
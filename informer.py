@@ -0,0 +1,409 @@
+import json
+import logging
+import os
+import shlex
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+
+from executor import ProcessLimitReached, processes, run_command
+from k8s_api import ApiError, ApiUnsupported, ResourceType, UnknownResource, api_backend, format_columns, parse_args
+from table_view import parse_columns
+
+# watch 로 메모리에 유지할 리소스 종류 (환경 변수로 조정, 빈 값이면 사용 안 함)
+INFORMER_KINDS = [kind.strip() for kind in
+                  os.environ.get('K8SHELPER_INFORMER_KINDS', 'nodes,services,namespaces').split(',') if kind.strip()]
+WATCH_TIMEOUT_SECONDS = 300  # 서버 측 watch 만료 시간, 만료되면 같은 resourceVersion 부터 다시 watch
+MAX_BACKOFF_SECONDS = 60
+READ_CHUNK_BYTES = 65536
+
+logger = logging.getLogger(__name__)
+
+
+def parse_timestamp(value):
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+
+def human_duration(seconds):
+    # kubectl 의 AGE 표기와 같은 규칙
+    seconds = max(0, int(seconds))
+    minutes, hours, days = seconds // 60, seconds // 3600, seconds // 86400
+    if seconds < 120:
+        return f'{seconds}s'
+    if minutes < 10:
+        return f'{minutes}m{seconds % 60}s' if seconds % 60 else f'{minutes}m'
+    if minutes < 180:
+        return f'{minutes}m'
+    if hours < 8:
+        return f'{hours}h{minutes % 60}m' if minutes % 60 else f'{hours}h'
+    if hours < 48:
+        return f'{hours}h'
+    if hours < 24 * 8:
+        return f'{days}d{hours % 24}h' if hours % 24 else f'{days}d'
+    if days < 365 * 2:
+        return f'{days}d'
+    return f'{days // 365}y'
+
+
+def age(obj, now):
+    created = (obj.get('metadata') or {}).get('creationTimestamp')
+    return human_duration(now - parse_timestamp(created).timestamp()) if created else '<unknown>'
+
+
+def node_row(obj, now):
+    conditions = {c['type']: c['status'] for c in (obj.get('status') or {}).get('conditions', [])}
+    status = 'Ready' if conditions.get('Ready') == 'True' else 'NotReady' if 'Ready' in conditions else 'Unknown'
+    if (obj.get('spec') or {}).get('unschedulable'):
+        status += ',SchedulingDisabled'
+    labels = obj['metadata'].get('labels') or {}
+    roles = sorted(key.split('/', 1)[1] for key in labels
+                   if key.startswith('node-role.kubernetes.io/') and '/' in key)
+    version = ((obj.get('status') or {}).get('nodeInfo') or {}).get('kubeletVersion', '')
+    return [obj['metadata']['name'], status, ','.join(roles) or '<none>', age(obj, now), version]
+
+
+def service_row(obj, now):
+    spec = obj.get('spec') or {}
+    ingress = ((obj.get('status') or {}).get('loadBalancer') or {}).get('ingress') or []
+    external = [entry.get('ip') or entry.get('hostname') for entry in ingress] + spec.get('externalIPs', [])
+    if spec.get('type') == 'ExternalName':
+        external = [spec.get('externalName')]
+    elif not external and spec.get('type') == 'LoadBalancer':
+        external = ['<pending>']
+    ports = []
+    for port in spec.get('ports', []):
+        node_port = f":{port['nodePort']}" if port.get('nodePort') else ''
+        ports.append(f"{port['port']}{node_port}/{port.get('protocol', 'TCP')}")
+    return [obj['metadata']['name'], spec.get('type', ''), spec.get('clusterIP') or '<none>',
+            ','.join(filter(None, external)) or '<none>', ','.join(ports) or '<none>', age(obj, now)]
+
+
+def namespace_row(obj, now):
+    return [obj['metadata']['name'], (obj.get('status') or {}).get('phase', ''), age(obj, now)]
+
+
+def pod_row(obj, now):
+    spec, status = obj.get('spec') or {}, obj.get('status') or {}
+    statuses = status.get('containerStatuses') or []
+    ready = sum(1 for c in statuses if c.get('ready'))
+    restarts = sum(c.get('restartCount', 0) for c in statuses)
+    reason = status.get('reason') or status.get('phase', '')
+    for container in statuses:
+        state = container.get('state') or {}
+        if state.get('waiting', {}).get('reason'):
+            reason = state['waiting']['reason']
+        elif state.get('terminated', {}).get('reason'):
+            reason = state['terminated']['reason']
+    if obj['metadata'].get('deletionTimestamp'):
+        reason = 'Terminating'
+    return [obj['metadata']['name'], f"{ready}/{len(spec.get('containers', []))}", reason, str(restarts),
+            age(obj, now)]
+
+
+def generic_row(obj, now):
+    return [obj['metadata']['name'], age(obj, now)]
+
+
+def kubectl_resources():
+    # kubectl api-resources -o wide 로 확인한 리소스 종류 (API 백엔드를 쓸 수 없을 때)
+    result = run_command('kubectl api-resources --verbs=list -o wide', timeout=60)
+    if result.returncode != 0:
+        raise ValueError(result.output.strip())
+    table = parse_columns(result.full_output())
+    if table is None:
+        raise ValueError('kubectl api-resources 출력을 해석하지 못했습니다.')
+    resources = []
+    for row in table[1]:
+        group, _, version = row.get('APIVERSION', '').rpartition('/')
+        verbs = row.get('VERBS', '').strip('[]').replace(',', ' ').split()  # [create delete get list ...]
+        resources.append(ResourceType(group, version, row['NAME'], row.get('KIND', ''),
+                                      row.get('NAMESPACED') == 'true',
+                                      [name for name in row.get('SHORTNAMES', '').split(',') if name], verbs or None))
+    return resources
+
+
+def resource_aliases(resources):
+    # 이름, 종류, 별칭(po, svc 등) -> ResourceType, 이름이 겹치면 core 그룹이 우선
+    aliases = {}
+    for resource in sorted(resources, key=lambda resource: resource.group != ''):
+        for alias in filter(None, [resource.name, resource.kind.lower()] + resource.short_names):
+            aliases.setdefault(alias, resource)
+            if resource.group:
+                aliases.setdefault(f'{alias}.{resource.group}', resource)
+    return aliases
+
+
+# 리소스별 kubectl get 기본 출력 열
+PRINTERS = {
+    'nodes': (['NAME', 'STATUS', 'ROLES', 'AGE', 'VERSION'], node_row),
+    'services': (['NAME', 'TYPE', 'CLUSTER-IP', 'EXTERNAL-IP', 'PORT(S)', 'AGE'], service_row),
+    'namespaces': (['NAME', 'STATUS', 'AGE'], namespace_row),
+    'pods': (['NAME', 'READY', 'STATUS', 'RESTARTS', 'AGE'], pod_row),
+}
+
+
+class Informer:
+    def __init__(self, resource):
+        self.resource = resource  # k8s_api.ResourceType
+        self.resource_version = None
+        self.synced = threading.Event()
+        self.last_sync = None
+        self._objects = {}  # (namespace, name) -> object
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name=f'informer-{self.resource.name}', daemon=True).start()
+
+    def stop(self):
+        self._stopped.set()
+
+    @staticmethod
+    def _key(obj):
+        metadata = obj['metadata']
+        return metadata.get('namespace', ''), metadata['name']
+
+    def _run(self):
+        backoff = 1
+        while not self._stopped.is_set():
+            try:
+                self._list()
+                # 서버 측 만료로 끝나면 같은 resourceVersion 부터 다시 watch, 410 이면 다시 list
+                while not self._stopped.is_set() and self._watch():
+                    pass
+                backoff = 1
+            except (ApiError, OSError, ValueError) as e:
+                self.synced.clear()
+                logger.warning('informer %s: %s; %s초 후 다시 시도', self.resource.name, e, backoff)
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    def _list(self):
+        payload = api_backend.client.request_json(self.resource.path())
+        with self._lock:
+            self._replace(payload.get('items', []))
+            self.resource_version = payload['metadata'].get('resourceVersion')
+        self.last_sync = time.time()
+        self.synced.set()
+
+    def _watch(self):
+        params = {'watch': '1', 'resourceVersion': self.resource_version, 'allowWatchBookmarks': 'true',
+                  'timeoutSeconds': str(WATCH_TIMEOUT_SECONDS)}
+        for event in api_backend.client.watch(self.resource.path(), params, timeout=WATCH_TIMEOUT_SECONDS + 30):
+            obj = event.get('object') or {}
+            if event.get('type') == 'ERROR':
+                if obj.get('code') == 410:
+                    return False  # resourceVersion 만료: 다시 list
+                raise ApiError(obj.get('code', 500), obj.get('reason', 'Unknown'), obj.get('message', ''))
+            with self._lock:
+                self._apply(event['type'], obj)
+                self.resource_version = obj['metadata'].get('resourceVersion', self.resource_version)
+            if self._stopped.is_set():
+                return False
+        return True
+
+    # list 결과와 watch 이벤트를 반영하는 부분 (하위 클래스에서 저장 방식을 바꿀 수 있음)
+    def _replace(self, objects):
+        self._objects = {self._key(obj): obj for obj in objects}
+
+    def _apply(self, event_type, obj):
+        if event_type in ('ADDED', 'MODIFIED'):
+            self._objects[self._key(obj)] = obj
+        elif event_type == 'DELETED':
+            self._objects.pop(self._key(obj), None)
+
+    def list(self, namespace=None):
+        with self._lock:
+            objects = list(self._objects.values())
+        if namespace is not None:
+            objects = [obj for obj in objects if obj['metadata'].get('namespace') == namespace]
+        return sorted(objects, key=self._key)
+
+
+class KubectlInformer(Informer):
+    # exec/auth-provider 인증(EKS, GKE 등)처럼 API 서버에 직접 연결할 수 없으면 kubectl 로 list/watch
+    def __init__(self, resource):
+        super().__init__(resource)
+        self._process = None
+
+    def stop(self):
+        super().stop()
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def _list(self):
+        result = run_command(f'kubectl get {self.resource.name} -A -o json', timeout=WATCH_TIMEOUT_SECONDS)
+        if result.returncode != 0:
+            raise ValueError(result.output)
+        payload = json.loads(result.full_output())
+        with self._lock:
+            self._replace(payload.get('items', []))
+            self.resource_version = (payload.get('metadata') or {}).get('resourceVersion')
+        self.last_sync = time.time()
+        self.synced.set()
+
+    def _watch(self):
+        # kubectl 은 resourceVersion 을 이어받을 수 없으므로 list 직후부터 변경만 받고, 끝나면 다시 list
+        # -o json 은 이벤트를 여러 줄로 이어서 출력하므로 버퍼에서 객체 단위로 잘라서 읽음
+        try:
+            self._process = processes.spawn(
+                f'kubectl get {self.resource.name} -A --watch-only --output-watch-events -o json',
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except ProcessLimitReached as e:
+            raise ValueError(str(e))
+        process, decoder, buffer = self._process, json.JSONDecoder(), ''
+        try:
+            while not self._stopped.is_set():
+                data = process.stdout.read1(READ_CHUNK_BYTES)
+                if not data:
+                    break
+                buffer += data.decode('utf-8', errors='replace')
+                while True:
+                    buffer = buffer.lstrip()
+                    try:
+                        event, end = decoder.raw_decode(buffer)
+                    except ValueError:
+                        break
+                    buffer = buffer[end:]
+                    obj = event.get('object') or {}
+                    if 'metadata' not in obj:
+                        continue
+                    with self._lock:
+                        self._apply(event.get('type'), obj)
+                        self.resource_version = obj['metadata'].get('resourceVersion', self.resource_version)
+            error = process.stderr.read().decode('utf-8', errors='replace').strip()
+            if process.wait() != 0 and error and not self._stopped.is_set():
+                raise ValueError(error)
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+            process.wait()
+            processes.release(process)
+            self._process = None
+        return False
+
+
+class InformerCache:
+    def __init__(self, kinds=INFORMER_KINDS):
+        self.kinds = kinds
+        self.hits = 0
+        self.source = None  # 'api' 또는 'kubectl'
+        self.last_error = None
+        self._informers = {}  # 리소스 이름 -> Informer
+        self._aliases = {}  # kubectl 로 감시할 때 종류 이름 확인용
+        self._namespace = 'default'  # kubectl 로 감시할 때 현재 컨텍스트의 기본 네임스페이스
+
+    def start(self):
+        # 리소스 이름 확인에 API 서버가 필요하므로 백그라운드에서 시작
+        threading.Thread(target=self._start, name='informer-start', daemon=True).start()
+
+    def _start(self):
+        if not self.kinds:
+            return
+        backoff = 1
+        while True:
+            try:
+                self._start_informers(api_backend.client.resolve, Informer)
+                self.source = 'api'
+                return
+            except ApiUnsupported as e:
+                # API 서버에 직접 연결할 수 없으면 kubectl 출력으로 watch
+                logger.warning('informer: API 백엔드를 쓸 수 없어 kubectl watch 로 대체합니다: %s', e)
+                break
+            except (ApiError, OSError, ValueError) as e:
+                self.last_error = str(e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+        backoff = 1
+        while True:
+            try:
+                self._aliases = resource_aliases(kubectl_resources())
+                namespace = run_command("kubectl config view --minify -o 'jsonpath={..namespace}'", timeout=10)
+                self._namespace = namespace.output.strip() if namespace.returncode == 0 else ''
+                self._namespace = self._namespace or 'default'
+                self._start_informers(self._resolve_alias, KubectlInformer)
+                self.source = 'kubectl'
+                return
+            except ValueError as e:
+                self.last_error = str(e)
+                logger.warning('informer: kubectl 로 리소스 종류를 확인하지 못했습니다: %s; %s초 후 다시 시도', e, backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    def _start_informers(self, resolve, informer_class):
+        for kind in self.kinds:
+            try:
+                resource = resolve(kind)
+            except UnknownResource:
+                logger.warning('감시할 리소스를 찾지 못했습니다: %s', kind)
+                continue
+            if not resource.supports('list', 'watch'):
+                logger.warning('watch 할 수 없는 리소스입니다: %s', kind)
+                continue
+            if resource.name not in self._informers:
+                informer = informer_class(resource)
+                informer.start()
+                self._informers[resource.name] = informer
+
+    def _resolve_alias(self, name):
+        resource = self._aliases.get(name.lower())
+        if resource is None:
+            raise UnknownResource(f'the server doesn\'t have a resource type "{name}"')
+        return resource
+
+    def _resolve(self, name):
+        if self.source == 'kubectl':
+            return self._resolve_alias(name)
+        return api_backend.client.resolve(name)
+
+    def _default_namespace(self):
+        if self.source == 'kubectl':
+            return self._namespace
+        return api_backend.client.config.namespace
+
+    def get(self, resource_name):
+        informer = self._informers.get(resource_name)
+        return informer if informer is not None and informer.synced.is_set() else None
+
+    def serve(self, command):
+        # kubectl get <종류> [-n ns | -A] 형태이고 동기화된 종류면 메모리에서 바로 출력을 만듦
+        if not self._informers or not api_backend.supports(command):
+            return None
+        try:
+            tokens = shlex.split(command)
+            positional, flags = parse_args(tokens[2:])
+        except (ValueError, ApiUnsupported):
+            return None
+        if tokens[1] != 'get' or len(positional) != 1 or '/' in positional[0] or ',' in positional[0]:
+            return None
+        if set(flags) - {'namespace', 'all-namespaces'}:
+            return None
+        try:
+            resource = self._resolve(positional[0])
+        except (ApiError, ApiUnsupported, OSError):
+            return None
+        informer = self.get(resource.name)
+        if informer is None:
+            return None
+
+        namespace = None
+        if resource.namespaced and not flags.get('all-namespaces'):
+            namespace = flags.get('namespace') or self._default_namespace()
+        objects = informer.list(namespace)
+        self.hits += 1
+        if not objects:
+            return f'No resources found in {namespace} namespace.' if namespace else 'No resources found'
+
+        now = time.time()
+        headers, row = PRINTERS.get(resource.name, (['NAME', 'AGE'], generic_row))
+        headers, rows = list(headers), [row(obj, now) for obj in objects]
+        if resource.namespaced and namespace is None:
+            headers.insert(0, 'NAMESPACE')
+            for line, obj in zip(rows, objects):
+                line.insert(0, obj['metadata'].get('namespace', ''))
+        return format_columns(headers, rows)
+
+
+informers = InformerCache()
@@ -0,0 +1,624 @@
+import base64
+import http.client
+import json
+import os
+import queue
+import shlex
+import ssl
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from executor import CommandResult, run_command
+from metrics import CommandTimer
+
+# API 백엔드 설정 (환경 변수로 조정)
+API_SERVER = os.environ.get('K8SHELPER_API_SERVER')  # 지정하면 kubeconfig 대신 이 주소로 직접 접속 (스텁 서버 테스트용)
+API_TOKEN = os.environ.get('K8SHELPER_API_TOKEN')
+API_POOL_SIZE = int(os.environ.get('K8SHELPER_API_POOL_SIZE', '8'))
+API_TIMEOUT_SECONDS = float(os.environ.get('K8SHELPER_API_TIMEOUT', '30'))
+
+TABLE_ACCEPT = 'application/json;as=Table;v=v1;g=meta.k8s.io, application/json'
+SHELL_METACHARACTERS = set(';|&<>$`\\\n')
+
+# API 백엔드가 직접 처리하는 명령어 (나머지는 kubectl 로 실행)
+# describe 는 kubectl 이 종류마다 관련 객체와 이벤트를 모아 만드는 출력이라 그대로 kubectl 로 실행
+API_VERBS = ('get', 'logs', 'top', 'events', 'api-resources')
+# kubeconfig 를 읽지 못했을 때 다시 시도하기까지 기다리는 시간 (실패할 때마다 두 배, 최대값까지)
+CONFIG_RETRY_SECONDS = 5
+MAX_CONFIG_RETRY_SECONDS = 300
+
+SHORT_FLAGS = {'-n': 'namespace', '-A': 'all-namespaces', '-l': 'selector', '-o': 'output',
+               '-c': 'container', '-p': 'previous'}
+BOOL_FLAGS = {'all-namespaces', 'timestamps', 'previous', 'no-headers', 'namespaced'}
+VALUE_FLAGS = {'namespace', 'selector', 'output', 'container', 'tail', 'since', 'field-selector'}
+
+
+class ApiUnsupported(Exception):
+    pass
+
+
+class UnknownResource(ApiUnsupported):
+    # all, CRD 카테고리 등 discovery 에 없는 이름은 kubectl 이 처리하도록 넘김
+    pass
+
+
+class ApiError(Exception):
+    def __init__(self, status, reason, message):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.message = message
+
+
+class ClusterConfig:
+    def __init__(self, server, namespace='default', token=None, basic_auth=None, ssl_context=None):
+        self.server = server
+        self.namespace = namespace
+        self.token = token
+        self.basic_auth = basic_auth
+        self.ssl_context = ssl_context
+
+
+def _write_temp(data):
+    fd, path = tempfile.mkstemp(prefix='k8shelper-', suffix='.pem')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def _read_data(entry, key):
+    # kubeconfig 의 <key>-data (base64) 또는 <key> (파일 경로) 값을 읽음
+    if entry.get(f'{key}-data'):
+        return base64.b64decode(entry[f'{key}-data'])
+    if entry.get(key):
+        with open(os.path.expanduser(entry[key]), 'rb') as f:
+            return f.read()
+    return None
+
+
+def load_cluster_config():
+    if API_SERVER:
+        return ClusterConfig(API_SERVER, token=API_TOKEN, ssl_context=ssl._create_unverified_context())
+
+    # kubeconfig 는 YAML 이므로 kubectl 로 현재 컨텍스트만 JSON 으로 한 번 변환해서 읽음
+    result = run_command('kubectl config view --raw --minify -o json')
+    if result.returncode != 0:
+        raise ApiUnsupported(result.output)
+    config = json.loads(result.output)
+    try:
+        cluster = config['clusters'][0]['cluster']
+        user = config['users'][0].get('user') or {}
+        context = config['contexts'][0].get('context') or {}
+    except (KeyError, IndexError):
+        raise ApiUnsupported('kubeconfig 에 현재 컨텍스트가 없습니다.')
+
+    if user.get('exec') or user.get('auth-provider'):
+        raise ApiUnsupported('exec/auth-provider 인증은 kubectl 로 실행합니다.')
+
+    ssl_context = ssl.create_default_context()
+    if cluster.get('insecure-skip-tls-verify'):
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+    else:
+        ca_data = _read_data(cluster, 'certificate-authority')
+        if ca_data:
+            ssl_context.load_verify_locations(cadata=ca_data.decode('utf-8'))
+
+    cert_data = _read_data(user, 'client-certificate')
+    key_data = _read_data(user, 'client-key')
+    if cert_data and key_data:
+        # ssl 모듈은 파일 경로만 받으므로 잠시 임시 파일로 쓴 뒤 삭제
+        cert_path, key_path = _write_temp(cert_data), _write_temp(key_data)
+        try:
+            ssl_context.load_cert_chain(cert_path, key_path)
+        finally:
+            os.unlink(cert_path)
+            os.unlink(key_path)
+
+    token = user.get('token')
+    if not token and user.get('tokenFile'):
+        with open(user['tokenFile'], encoding='utf-8') as f:
+            token = f.read().strip()
+    basic_auth = None
+    if user.get('username') and user.get('password'):
+        basic_auth = base64.b64encode(f"{user['username']}:{user['password']}".encode()).decode()
+
+    return ClusterConfig(cluster['server'], namespace=context.get('namespace') or 'default',
+                         token=token, basic_auth=basic_auth, ssl_context=ssl_context)
+
+
+class ConnectionPool:
+    def __init__(self, server, ssl_context=None, maxsize=API_POOL_SIZE, timeout=API_TIMEOUT_SECONDS):
+        url = urlsplit(server)
+        self.scheme = url.scheme
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == 'https' else 80)
+        self.base_path = url.path.rstrip('/')
+        self.ssl_context = ssl_context
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._idle = queue.LifoQueue(maxsize=maxsize)
+
+    def _new_connection(self):
+        self.connections_opened += 1
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _get(self):
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _put(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method, path, headers):
+        conn, reused = self._get()
+        try:
+            conn.request(method, self.base_path + path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            # 서버가 닫은 keep-alive 연결이면 새 연결로 한 번 재시도
+            conn = self._new_connection()
+            conn.request(method, self.base_path + path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+        if response.will_close:
+            conn.close()
+        else:
+            self._put(conn)
+        return response.status, body
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class ResourceType:
+    def __init__(self, group, version, name, kind, namespaced, short_names=(), verbs=None):
+        self.group = group
+        self.version = version
+        self.name = name
+        self.kind = kind
+        self.namespaced = namespaced
+        self.short_names = list(short_names)
+        self.verbs = verbs  # 지원하는 동작 (list, watch 등), 모르면 None
+
+    def supports(self, *verbs):
+        return self.verbs is None or all(verb in self.verbs for verb in verbs)
+
+    @property
+    def api_version(self):
+        return f'{self.group}/{self.version}' if self.group else self.version
+
+    @property
+    def qualified_kind(self):
+        return f'{self.kind.lower()}.{self.group}' if self.group else self.kind.lower()
+
+    def path(self, namespace=None, name=None):
+        prefix = f'/apis/{self.group}/{self.version}' if self.group else f'/api/{self.version}'
+        if self.namespaced and namespace:
+            prefix += f'/namespaces/{namespace}'
+        prefix += f'/{self.name}'
+        return f'{prefix}/{name}' if name else prefix
+
+
+class ApiClient:
+    def __init__(self, config):
+        self.config = config
+        self.pool = ConnectionPool(config.server, config.ssl_context)
+        self._resources = None  # 별칭 -> ResourceType
+        self._resource_list = None
+        self._lock = threading.Lock()
+
+    def _headers(self, accept='application/json'):
+        headers = {'Accept': accept, 'User-Agent': 'k8shelper'}
+        if self.config.token:
+            headers['Authorization'] = f'Bearer {self.config.token}'
+        elif self.config.basic_auth:
+            headers['Authorization'] = f'Basic {self.config.basic_auth}'
+        return headers
+
+    def request(self, path, params=None, accept='application/json'):
+        if params:
+            path += '?' + urlencode({k: v for k, v in params.items() if v is not None})
+        status, body = self.pool.request('GET', path, self._headers(accept))
+        if status >= 400:
+            try:
+                payload = json.loads(body)
+                raise ApiError(status, payload.get('reason') or 'Unknown', payload.get('message') or body.decode())
+            except ValueError:
+                raise ApiError(status, 'Unknown', body.decode('utf-8', errors='replace'))
+        return body
+
+    def request_json(self, path, params=None, accept='application/json'):
+        return json.loads(self.request(path, params, accept))
+
+    def watch(self, path, params=None, timeout=None):
+        # watch 요청은 오래 열려 있으므로 풀과 별도의 연결로 이벤트를 한 줄씩 읽음
+        if params:
+            path += '?' + urlencode({k: v for k, v in params.items() if v is not None})
+        conn = self.pool._new_connection()
+        conn.timeout = timeout
+        try:
+            conn.request('GET', self.pool.base_path + path, headers=self._headers())
+            response = conn.getresponse()
+            if response.status >= 400:
+                body = response.read()
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    payload = {'message': body.decode('utf-8', errors='replace')}
+                raise ApiError(response.status, payload.get('reason') or 'Unknown', payload.get('message') or '')
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
+
+    def _discover(self):
+        # 리소스 목록은 처음 한 번만 조회해서 별칭(po, svc, deploy 등)과 함께 보관
+        with self._lock:
+            if self._resources is not None:
+                return
+            group_versions = [('', 'v1')]
+            for group in self.request_json('/apis').get('groups', []):
+                preferred = group.get('preferredVersion') or group['versions'][0]
+                group_versions.append((group['name'], preferred['version']))
+
+            resources, resource_list = {}, []
+            for group, version in group_versions:
+                path = f'/apis/{group}/{version}' if group else f'/api/{version}'
+                try:
+                    listing = self.request_json(path)
+                except ApiError:
+                    continue
+                for entry in listing.get('resources', []):
+                    if '/' in entry['name']:
+                        continue  # 하위 리소스 (pods/log 등) 제외
+                    resource = ResourceType(group, version, entry['name'], entry['kind'], entry['namespaced'],
+                                            entry.get('shortNames') or [], entry.get('verbs'))
+                    resource_list.append(resource)
+                    aliases = [entry['name'], entry.get('singularName') or '', entry['kind'].lower()]
+                    aliases += resource.short_names
+                    for alias in filter(None, aliases):
+                        resources.setdefault(alias, resource)  # core 그룹이 먼저 등록되어 우선함
+                        if group:
+                            resources.setdefault(f'{alias}.{group}', resource)
+            self._resources, self._resource_list = resources, resource_list
+
+    def resolve(self, name):
+        self._discover()
+        resource = self._resources.get(name.lower())
+        if resource is None:
+            raise UnknownResource(f'the server doesn\'t have a resource type "{name}"')
+        return resource
+
+    def resource_list(self):
+        self._discover()
+        return self._resource_list
+
+
+def parse_args(tokens):
+    positional, flags = [], {}
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token.startswith('--'):
+            name, has_value, value = token[2:].partition('=')
+        elif token.startswith('-') and len(token) > 1:
+            short, has_value, value = token.partition('=')
+            if short not in SHORT_FLAGS:
+                raise ApiUnsupported(f'지원하지 않는 옵션: {token}')
+            name = SHORT_FLAGS[short]
+        else:
+            positional.append(token)
+            i += 1
+            continue
+
+        if name in BOOL_FLAGS:
+            flags[name] = value.lower() != 'false' if has_value else True
+        elif name in VALUE_FLAGS:
+            if not has_value:
+                i += 1
+                if i >= len(tokens):
+                    raise ApiUnsupported(f'옵션 값이 없습니다: {token}')
+                value = tokens[i]
+            flags[name] = value
+        else:
+            raise ApiUnsupported(f'지원하지 않는 옵션: {token}')
+        i += 1
+    return positional, flags
+
+
+def format_columns(headers, rows, no_headers=False):
+    # kubectl 과 같이 열 사이를 공백 3칸으로 맞춰 출력
+    lines = rows if no_headers else [headers] + rows
+    if not lines:
+        return ''
+    widths = [max(len(line[i]) for line in lines) for i in range(len(headers))]
+    return '\n'.join('   '.join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip()
+                     for line in lines)
+
+
+def format_cell(value):
+    if value is None or value == '':
+        return '<none>'
+    return str(value)
+
+
+def parse_quantity(value):
+    suffixes = {'n': 1e-9, 'u': 1e-6, 'm': 1e-3, 'k': 1e3, 'M': 1e6, 'G': 1e9, 'T': 1e12,
+                'Ki': 2 ** 10, 'Mi': 2 ** 20, 'Gi': 2 ** 30, 'Ti': 2 ** 40}
+    for suffix in sorted(suffixes, key=len, reverse=True):
+        if value.endswith(suffix):
+            return float(value[:-len(suffix)]) * suffixes[suffix]
+    return float(value)
+
+
+def parse_duration(value):
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+class ApiBackend:
+    def __init__(self):
+        self._client = None
+        self._config_error = None
+        self._retry_at = 0.0
+        self._retry_seconds = CONFIG_RETRY_SECONDS
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        # kubeconfig 는 성공할 때까지 읽고, 실패하면 다시 시도할 때까지 kubectl 로 실행
+        # (일시적인 kubectl config view 실패로 API 백엔드가 계속 꺼져 있지 않도록 점점 길게 기다렸다 재시도)
+        with self._lock:
+            if self._client is None:
+                if self._config_error is not None and time.monotonic() < self._retry_at:
+                    raise self._config_error
+                try:
+                    self._client = ApiClient(load_cluster_config())
+                except (ApiUnsupported, OSError, ValueError, ssl.SSLError) as e:
+                    self._config_error = ApiUnsupported(str(e))
+                    self._retry_at = time.monotonic() + self._retry_seconds
+                    self._retry_seconds = min(self._retry_seconds * 2, MAX_CONFIG_RETRY_SECONDS)
+                    raise self._config_error
+                self._config_error = None
+            return self._client
+
+    def supports(self, command):
+        if SHELL_METACHARACTERS & set(command):
+            return False
+        try:
+            tokens = shlex.split(command)
+        except ValueError:
+            return False
+        return len(tokens) >= 2 and tokens[0] == 'kubectl' and tokens[1] in API_VERBS
+
+    def run(self, command):
+        # API 로 처리할 수 없는 명령어나 인증 방식이면 kubectl 로 실행
+        started = time.monotonic()
+        with CommandTimer(command, 'api') as timer:
+            try:
+                output = self.execute(command)
+                returncode = 0
+            except ApiUnsupported:
+                output = None
+            except ApiError as e:
+                output = f'Error from server ({e.reason}): {e.message}'
+                returncode = 1
+            except (OSError, http.client.HTTPException) as e:
+                output = f'Unable to connect to the server: {e}'
+                returncode = 1
+            if output is not None:
+                timer.finish(returncode, len(output.encode('utf-8')))
+        if output is None:
+            return run_command(command)
+        return CommandResult(output.strip(), returncode, time.monotonic() - started)
+
+    def get_raw(self, path, params=None):
+        # API 서버에 직접 연결할 수 있으면 바로 받고, 아니면 kubectl get --raw (exec 인증도 가능)
+        try:
+            return self.client.request(path, params)
+        except ApiUnsupported:
+            pass
+        if params:
+            path += '?' + urlencode({k: v for k, v in params.items() if v is not None})
+        result = run_command(f'kubectl get --raw {shlex.quote(path)}', timeout=60)
+        if result.returncode != 0:
+            raise ApiError(500, 'Unknown', result.output.strip())
+        # 큰 문서는 앞부분만 output 에 있으므로 spool 파일에서 전부 읽음
+        return result.spool.read_all() if result.spool is not None else result.output.encode('utf-8')
+
+    def execute(self, command):
+        if not self.supports(command):
+            raise ApiUnsupported(command)
+        tokens = shlex.split(command)
+        positional, flags = parse_args(tokens[2:])
+        verb = tokens[1]
+        if verb == 'events':
+            return self._get(['events'] + positional, flags)
+        return getattr(self, '_' + verb.replace('-', '_'))(positional, flags)
+
+    def _namespace(self, flags):
+        if flags.get('all-namespaces'):
+            return None
+        return flags.get('namespace') or self.client.config.namespace
+
+    def _get(self, positional, flags):
+        if not positional:
+            raise ApiUnsupported('리소스 타입이 필요합니다.')
+        output = flags.get('output', '')
+        if output not in ('', 'wide', 'json', 'name'):
+            raise ApiUnsupported(f'지원하지 않는 출력 형식: {output}')
+        namespace = self._namespace(flags)
+
+        # kubectl get pod/nginx 형태와 kubectl get pods nginx 형태 모두 지원
+        targets = []
+        if '/' in positional[0]:
+            for arg in positional:
+                kind, _, name = arg.partition('/')
+                targets.append((self.client.resolve(kind), name))
+        else:
+            for kind in positional[0].split(','):
+                resource = self.client.resolve(kind)
+                targets += [(resource, name) for name in positional[1:]] or [(resource, None)]
+
+        params = {'labelSelector': flags.get('selector'), 'fieldSelector': flags.get('field-selector')}
+        if output == 'json':
+            return self._get_json(targets, namespace, params)
+
+        sections = []
+        for resource, name in targets:
+            path = resource.path(namespace, name)
+            if output == 'name':
+                items = self.client.request_json(path, params)
+                items = [items] if name else items.get('items', [])
+                sections.append('\n'.join(f"{resource.qualified_kind}/{item['metadata']['name']}" for item in items))
+                continue
+            table = self.client.request_json(path, params, accept=TABLE_ACCEPT)
+            sections.append(self._format_table(table, resource, namespace, output == 'wide', flags))
+        return '\n\n'.join(section for section in sections if section)
+
+    def _get_json(self, targets, namespace, params):
+        items = []
+        for resource, name in targets:
+            payload = self.client.request_json(resource.path(namespace, name), params)
+            if name and len(targets) == 1:
+                return json.dumps(payload, indent=4, ensure_ascii=False)
+            if name:
+                items.append(payload)
+            else:
+                kind = payload.get('kind', '').replace('List', '')
+                for item in payload.get('items', []):
+                    item.setdefault('apiVersion', resource.api_version)
+                    item.setdefault('kind', kind or resource.kind)
+                    items.append(item)
+        return json.dumps({'apiVersion': 'v1', 'items': items, 'kind': 'List', 'metadata': {'resourceVersion': ''}},
+                          indent=4, ensure_ascii=False)
+
+    def _format_table(self, table, resource, namespace, wide, flags):
+        rows = table.get('rows') or []
+        if not rows:
+            if resource.namespaced and namespace:
+                return f'No resources found in {namespace} namespace.'
+            return 'No resources found'
+        columns = [(i, column) for i, column in enumerate(table['columnDefinitions'])
+                   if wide or column.get('priority', 0) == 0]
+        headers = [column['name'].upper() for _, column in columns]
+        lines = [[format_cell(row['cells'][i]) for i, _ in columns] for row in rows]
+        if resource.namespaced and namespace is None:
+            headers.insert(0, 'NAMESPACE')
+            for line, row in zip(lines, rows):
+                line.insert(0, ((row.get('object') or {}).get('metadata') or {}).get('namespace', ''))
+        return format_columns(headers, lines, flags.get('no-headers'))
+
+    def _logs(self, positional, flags):
+        if len(positional) != 1:
+            raise ApiUnsupported('파드 이름 하나가 필요합니다.')
+        pod = positional[0]
+        if '/' in pod:
+            kind, _, pod = pod.partition('/')
+            if kind not in ('pod', 'pods', 'po'):
+                raise ApiUnsupported('파드 로그만 API 로 조회합니다.')
+        params = {
+            'container': flags.get('container'),
+            'tailLines': flags.get('tail') if flags.get('tail') not in (None, '-1') else None,
+            'timestamps': 'true' if flags.get('timestamps') else None,
+            'previous': 'true' if flags.get('previous') else None,
+            'sinceSeconds': parse_duration(flags['since']) if flags.get('since') else None,
+        }
+        path = f'/api/v1/namespaces/{self._namespace(flags) or "default"}/pods/{pod}/log'
+        return self.client.request(path, params, accept='*/*').decode('utf-8', errors='replace')
+
+    def _top(self, positional, flags):
+        if not positional or positional[0] not in ('node', 'nodes', 'no', 'pod', 'pods', 'po'):
+            raise ApiUnsupported('top nodes / top pods 만 API 로 조회합니다.')
+        try:
+            if positional[0] in ('node', 'nodes', 'no'):
+                return self._top_nodes(positional[1:], flags)
+            return self._top_pods(positional[1:], flags)
+        except ApiError as e:
+            if e.status == 404:
+                raise ApiError(e.status, 'NotFound', 'Metrics API not available')
+            raise
+
+    def _top_nodes(self, names, flags):
+        params = {'labelSelector': flags.get('selector')}
+        metrics = self.client.request_json('/apis/metrics.k8s.io/v1beta1/nodes', params)['items']
+        nodes = self.client.request_json('/api/v1/nodes', params)['items']
+        allocatable = {node['metadata']['name']: node['status'].get('allocatable', {}) for node in nodes}
+        rows = []
+        for item in sorted(metrics, key=lambda m: m['metadata']['name']):
+            name = item['metadata']['name']
+            if names and name not in names:
+                continue
+            cpu = parse_quantity(item['usage']['cpu'])
+            memory = parse_quantity(item['usage']['memory'])
+            capacity = allocatable.get(name, {})
+            cpu_total = parse_quantity(capacity.get('cpu', '0')) or None
+            memory_total = parse_quantity(capacity.get('memory', '0')) or None
+            rows.append([
+                name,
+                f'{int(cpu * 1000)}m',
+                f'{int(cpu / cpu_total * 100)}%' if cpu_total else '<unknown>',
+                f'{int(memory / 2 ** 20)}Mi',
+                f'{int(memory / memory_total * 100)}%' if memory_total else '<unknown>',
+            ])
+        return format_columns(['NAME', 'CPU(cores)', 'CPU%', 'MEMORY(bytes)', 'MEMORY%'], rows,
+                              flags.get('no-headers'))
+
+    def _top_pods(self, names, flags):
+        namespace = self._namespace(flags)
+        path = f'/apis/metrics.k8s.io/v1beta1/namespaces/{namespace}/pods' if namespace \
+            else '/apis/metrics.k8s.io/v1beta1/pods'
+        metrics = self.client.request_json(path, {'labelSelector': flags.get('selector')})['items']
+        rows = []
+        for item in sorted(metrics, key=lambda m: (m['metadata']['namespace'], m['metadata']['name'])):
+            name = item['metadata']['name']
+            if names and name not in names:
+                continue
+            cpu = sum(parse_quantity(c['usage']['cpu']) for c in item.get('containers', []))
+            memory = sum(parse_quantity(c['usage']['memory']) for c in item.get('containers', []))
+            row = [name, f'{int(cpu * 1000)}m', f'{int(memory / 2 ** 20)}Mi']
+            if namespace is None:
+                row.insert(0, item['metadata']['namespace'])
+            rows.append(row)
+        if not rows:
+            return f'No resources found in {namespace} namespace.' if namespace else 'No resources found'
+        headers = ['NAME', 'CPU(cores)', 'MEMORY(bytes)']
+        if namespace is None:
+            headers.insert(0, 'NAMESPACE')
+        return format_columns(headers, rows, flags.get('no-headers'))
+
+    def _api_resources(self, positional, flags):
+        if positional or set(flags) - {'namespaced', 'no-headers'}:
+            raise ApiUnsupported('api-resources 옵션은 --namespaced 만 지원합니다.')
+        rows = []
+        for resource in sorted(self.client.resource_list(), key=lambda r: (r.group, r.name)):
+            if 'namespaced' in flags and resource.namespaced != flags['namespaced']:
+                continue
+            rows.append([resource.name, ','.join(resource.short_names), resource.api_version,
+                         str(resource.namespaced).lower(), resource.kind])
+        return format_columns(['NAME', 'SHORTNAMES', 'APIVERSION', 'NAMESPACED', 'KIND'], rows,
+                              flags.get('no-headers'))
+
+
+api_backend = ApiBackend()
@@ -1,12 +1,44 @@
 import dash
 from dash import dcc
 from dash import html
+from dash import dash_table
 from dash.dependencies import Input, Output, State
 import dash_bootstrap_components as dbc
-import subprocess
+from flask import Response, abort, jsonify, request, send_file
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+from event_aggregator import event_aggregator
+from executor import CommandResult, JobRejected, job_queue, processes, run_command
+from completion import completion_index
+from help_cache import help_cache
+from history import history
+from informer import informers
+from multicluster import fanouts, format_merged, is_fanout_command, list_contexts
+from metrics import cache_requests, live_processes, registry, timed_callback, timed_render
+from k8s_api import api_backend
+from logmerge import MergedLogSession, is_merged_logs_command
+from refresh import REFRESH_POLL_SECONDS, REFRESH_SECONDS, refreshes
+from result_cache import is_cacheable_command, result_cache
+from runbook import RunbookError, parse_runbook, runbooks
+from schema import SchemaUnavailable, schemas
+from search_index import search_index
+from snapshot import SNAPSHOT_VERBS, snapshots
+from spool import spools
+from streaming import is_streaming_command, streams
+from table_view import is_table_command, parse_output, table_store
+from top_sampler import TOP_SAMPLE_SECONDS, top_sampler
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])  # bootstrap 적용
 
+SPOOL_PAGE_LINES = 500  # 큰 출력 뷰어 한 페이지 줄 수
+
+# 기본 실행 백엔드 (kubectl: 서브프로세스, api: API 서버 직접 호출)
+DEFAULT_BACKEND = os.environ.get('K8SHELPER_BACKEND', 'kubectl')
+
 # 명령어 그룹 정의
 commands = {
     'Basic Commands (Beginner)': {
@@ -69,16 +101,19 @@ commands = {
     }
 }
 
-def run_kubectl_command(command):
-    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True)
-    stdout, stderr = process.communicate()
+# 사용자 식별 (프록시 뒤에서는 X-Forwarded-For 사용)
+def get_user_id():
+    forwarded = request.headers.get('X-Forwarded-For')
+    if forwarded:
+        return forwarded.split(',')[0].strip()
+    return request.remote_addr or 'anonymous'
 
-    if process.returncode == 0:
-        output = stdout.decode('utf-8')
-    else:
-        output = stderr.decode('utf-8')
 
-    return output.strip()
+def render_output(output):
+    return dcc.Markdown(
+        f'```\n{output}\n```',
+        style={'white-space': 'pre-wrap', 'background-color': 'black', 'color': 'white', 'padding': '10px'}
+    )
 
 app.layout = dbc.Container([
 
@@ -102,11 +137,19 @@ app.layout = dbc.Container([
     # command-input, execute-button, reset-button
     dbc.Row([
         dbc.Input(id='user-command-input', type='text', placeholder='kubectl 명령어를 입력하세요.', className="mb-2",
+                  list='command-suggestions', autoComplete='off',
                   style={'width': '50%', 'marginLeft': '10px', 'marginRight': '10px', 'fontSize': '1rem', 'padding': '10px'}),
+        # 자동 완성 후보 (입력을 멈추면 서버에서 조회)
+        html.Datalist(id='command-suggestions'),
+        dcc.Store(id='completion-query'),
         dbc.Button('명령어 실행', id='execute-button', color='primary',
                    style={'width': '10%', 'fontSize': '1rem', 'padding': '10px', 'borderRadius': '5px',
                           'marginRight': '10px'}),
         dbc.Button('초기화', id='reset-button', color='secondary',
+                   style={'width': '10%', 'fontSize': '1rem',  'padding': '10px', 'borderRadius': '5px',
+                          'marginRight': '10px'}),
+        # logs -f, get -w, rollout status 등 스트리밍 명령어 중지
+        dbc.Button('스트리밍 중지', id='stream-stop-button', color='danger', outline=True,
                    style={'width': '10%', 'fontSize': '1rem',  'padding': '10px', 'borderRadius': '5px'}),
         html.Br(), html.Br(),  # 두 줄 띄우기
         # 노드 조회 버튼 추가
@@ -150,14 +193,232 @@ app.layout = dbc.Container([
             style={'display': 'inline-block'}  # 버튼을 인라인으로 표시
         ),
         html.Br(),  # 한 줄 띄우기
+        # 실행 백엔드 선택 (API 직접 호출은 get/logs/top/events/api-resources 만, 나머지는 kubectl 로 실행)
+        dbc.RadioItems(
+            id='backend-select',
+            options=[
+                {'label': 'kubectl 실행', 'value': 'kubectl'},
+                {'label': 'API 서버 직접 호출', 'value': 'api'},
+            ],
+            value=DEFAULT_BACKEND,
+            inline=True,
+            className='mb-2',
+            style={'marginLeft': '10px'}
+        ),
+        # get 결과를 서버 측 페이지/정렬/필터 표로 보기
+        dbc.Checklist(
+            id='table-mode',
+            options=[{'label': '표로 보기 (get / top / events)', 'value': 'table'}],
+            value=[],
+            switch=True,
+            inline=True,
+            className='mb-2',
+            style={'marginLeft': '10px'}
+        ),
+        # 같은 명령어를 주기적으로 다시 실행하고 바뀐 행만 받아서 강조
+        dbc.Checklist(
+            id='auto-refresh',
+            options=[{'label': f'자동 새로고침 ({REFRESH_SECONDS:g}초마다, 바뀐 행만 강조)', 'value': 'on'}],
+            value=[],
+            switch=True,
+            inline=True,
+            className='mb-2',
+            style={'marginLeft': '10px'}
+        ),
+        # 런북: 한 줄에 한 명령어, "이름 (after 다른이름): 명령어" 로 순서를 정하면 나머지는 동시에 실행
+        dbc.Collapse(
+            html.Div([
+                dbc.Textarea(id='runbook-input', rows=8, className='mb-2',
+                             placeholder='# 예시\n'
+                                         'nodes: kubectl get nodes\n'
+                                         'pods: kubectl get pods -A\n'
+                                         'describe (after nodes): kubectl describe nodes\n'
+                                         'kubectl get events -A',
+                             style={'fontFamily': 'monospace', 'fontSize': '0.9rem'}),
+                dbc.Button('런북 실행', id='runbook-run-button', color='primary', size='sm'),
+            ], style={'marginLeft': '10px', 'width': '70%'}),
+            id='runbook-collapse', is_open=False,
+        ),
+        dbc.Button('런북 일괄 실행', id='runbook-toggle', color='link', size='sm',
+                   style={'marginLeft': '0', 'textAlign': 'left'}, className='mb-2'),
+        # 여러 클러스터(kubeconfig 컨텍스트)에 동시에 실행
+        html.Div([
+            dcc.Dropdown(id='context-select', multi=True, placeholder='클러스터 선택 (비워두면 현재 컨텍스트)',
+                         style={'width': '60%', 'display': 'inline-block', 'verticalAlign': 'middle'}),
+            dbc.Button('컨텍스트 새로고침', id='context-refresh-button', color='light', size='sm',
+                       style={'marginLeft': '10px'}),
+        ], className='mb-2', style={'marginLeft': '10px'}),
+        # 저장해 둔 클러스터 스냅샷을 고르면 조회 명령어를 클러스터 대신 스냅샷에서 실행
+        html.Div([
+            dcc.Dropdown(id='snapshot-select', placeholder='라이브 클러스터 (스냅샷을 고르면 스냅샷에서 조회)',
+                         style={'width': '60%', 'display': 'inline-block', 'verticalAlign': 'middle'}),
+            dbc.Button('스냅샷 만들기', id='snapshot-create-button', color='light', size='sm',
+                       style={'marginLeft': '10px'}),
+            html.Span(id='snapshot-status', style={'marginLeft': '10px', 'color': 'gray', 'fontSize': '0.85rem'}),
+            dcc.Interval(id='snapshot-interval', interval=2000, disabled=True),
+        ], className='mb-2', style={'marginLeft': '10px'}),
         # CardBody : user-command-result
         html.Div([
-            dbc.Card(dbc.CardBody(id='user-command-result'),
-                     style={'width': '100%', 'borderRadius': '5px'}),
+            dbc.Card([
+                dbc.CardBody(id='user-command-result'),
+                # 스트리밍 출력 (새 청크는 브라우저에서 이어 붙임)
+                html.Pre(id='stream-output', style={'display': 'none'}),
+                # 표 보기 (현재 페이지만 서버에서 받아옴)
+                html.Div(
+                    dash_table.DataTable(
+                        id='result-table',
+                        page_current=0,
+                        page_size=100,
+                        page_action='custom',
+                        sort_action='custom',
+                        sort_mode='multi',
+                        filter_action='custom',
+                        filter_query='',
+                        fixed_rows={'headers': True},
+                        style_table={'height': '60vh', 'overflowY': 'auto'},
+                        style_cell={'textAlign': 'left', 'fontFamily': 'monospace', 'fontSize': '0.85rem',
+                                    'minWidth': '80px'},
+                    ),
+                    id='result-table-container',
+                    style={'display': 'none'}
+                ),
+                # 큰 출력 뷰어 (필요한 줄 범위만 /spool 에서 받아옴)
+                html.Div([
+                    html.Small(id='spool-info', className='text-muted'),
+                    dbc.InputGroup([
+                        dbc.Button('이전', id='spool-prev', color='secondary', outline=True),
+                        dbc.Input(id='spool-start', type='number', min=1, value=1, debounce=True,
+                                  style={'maxWidth': '140px'}),
+                        dbc.Button('다음', id='spool-next', color='secondary', outline=True),
+                        dbc.Input(id='spool-search', placeholder='출력에서 검색 (/정규식/ 가능)'),
+                        dbc.Button('검색', id='spool-search-button', color='primary'),
+                    ], size='sm', className='my-2'),
+                    html.Pre(id='spool-search-result', style={'maxHeight': '20vh', 'overflowY': 'auto'}),
+                    html.Pre(id='spool-view', style={'white-space': 'pre', 'background-color': 'black',
+                                                     'color': 'white', 'padding': '10px', 'maxHeight': '60vh',
+                                                     'overflowY': 'auto'}),
+                    html.A('전체 다운로드', id='spool-download', href='', target='_blank'),
+                ], id='spool-container', style={'display': 'none', 'padding': '0 1.25rem 1.25rem'}),
+                # 자동 새로고침 (변경분만 받아서 브라우저에서 표에 반영)
+                html.Small(id='refresh-status', className='text-muted', style={'marginLeft': '1.25rem'}),
+                html.Pre(id='refresh-output', style={'display': 'none'}),
+                html.Div(
+                    dash_table.DataTable(
+                        id='refresh-table',
+                        page_size=100,
+                        page_action='native',
+                        sort_action='native',
+                        filter_action='native',
+                        hidden_columns=['_key', '_state', '_changed'],
+                        css=[{'selector': '.show-hide', 'rule': 'display: none'}],
+                        style_table={'height': '60vh', 'overflowY': 'auto'},
+                        style_cell={'textAlign': 'left', 'fontFamily': 'monospace', 'fontSize': '0.85rem',
+                                    'minWidth': '80px'},
+                    ),
+                    id='refresh-table-container',
+                    style={'display': 'none'}
+                ),
+            ], style={'width': '100%', 'borderRadius': '5px'}),
         ]),
+        dcc.Store(id='result-table-id'),
+        # 브라우저 세션 id (페이지를 열 때 만듦), 이전 명령어 취소는 같은 세션에서만
+        dcc.Store(id='session-id'),
+        # 백그라운드 실행 중인 작업 핸들과 결과 폴링 타이머
+        dcc.Store(id='command-job-store'),
+        dcc.Interval(id='command-poll-interval', interval=500, disabled=True),
+        dcc.Store(id='spool-store'),
+        # 자동 새로고침 변경분과 타이머
+        dcc.Store(id='refresh-delta-store'),
+        dcc.Interval(id='refresh-interval', interval=REFRESH_POLL_SECONDS * 1000, disabled=True),
+        # 스트리밍 명령어의 새 출력 청크와 폴링 타이머
+        dcc.Store(id='stream-chunk-store'),
+        dcc.Interval(id='stream-poll-interval', interval=1000, disabled=True),
 
 
     ]),
+    # 백그라운드에서 수집한 kubectl top 값의 추이 (서버에서 점 수를 줄여서 전달)
+    html.Div([
+        html.H4('리소스 사용량 추이', className='mt-4'),
+        html.Div([
+            dbc.RadioItems(
+                id='top-kind',
+                options=[{'label': '노드', 'value': 'nodes'}, {'label': '파드', 'value': 'pods'}],
+                value='nodes',
+                inline=True,
+            ),
+            dbc.RadioItems(
+                id='top-metric',
+                options=[{'label': 'CPU (m)', 'value': 'cpu'}, {'label': '메모리 (MiB)', 'value': 'memory'}],
+                value='cpu',
+                inline=True,
+                style={'marginLeft': '20px'}
+            ),
+            dcc.Dropdown(
+                id='top-window',
+                options=[{'label': '최근 1시간', 'value': 3600}, {'label': '최근 6시간', 'value': 6 * 3600},
+                         {'label': '최근 24시간', 'value': 24 * 3600}],
+                value=3600,
+                clearable=False,
+                style={'width': '150px', 'marginLeft': '20px'}
+            ),
+        ], style={'display': 'flex', 'alignItems': 'center'}),
+        dcc.Graph(id='top-chart', config={'displaylogo': False}),
+        dcc.Interval(id='top-interval', interval=max(TOP_SAMPLE_SECONDS, 5) * 1000,
+                     disabled=TOP_SAMPLE_SECONDS <= 0),
+    ], style={'marginLeft': '10px'}),
+    # 모든 리소스의 이름/네임스페이스/레이블/어노테이션/이미지 역색인 검색 (kubectl get -A -l 을 여러 번 돌리지 않음)
+    html.Div([
+        html.H4('클러스터 검색', className='mt-4'),
+        dcc.Input(id='search-query', type='text', debounce=0.3,
+                  placeholder='예: app=payments image:nginx -ns:kube-system kind:deploy name:pay',
+                  style={'width': '100%'}),
+        html.Div(id='search-status', style={'color': 'gray', 'fontSize': '0.85rem'}),
+        dash_table.DataTable(
+            id='search-table',
+            columns=[{'name': column, 'id': column} for column in ('KIND', 'NAMESPACE', 'NAME', 'LABELS', 'IMAGES')],
+            style_table={'maxHeight': '50vh', 'overflowY': 'auto'},
+            style_cell={'textAlign': 'left', 'fontFamily': 'monospace', 'fontSize': '0.85rem',
+                        'whiteSpace': 'normal', 'maxWidth': '400px'},
+        ),
+    ], style={'marginLeft': '10px'}),
+    # 실행한 명령어와 출력 기록 (행을 클릭하면 kubectl 을 다시 실행하지 않고 저장된 결과를 엶)
+    html.Div([
+        html.H4('명령어 기록', className='mt-4'),
+        dcc.Input(id='history-search', type='text', debounce=0.3, placeholder='명령어나 출력 내용으로 검색',
+                  style={'width': '100%'}),
+        html.Div(id='history-status', style={'color': 'gray', 'fontSize': '0.85rem'}),
+        dash_table.DataTable(
+            id='history-table',
+            columns=[{'name': column, 'id': column}
+                     for column in ('TIME', 'USER', 'CONTEXT', 'COMMAND', 'EXIT', 'DURATION', 'SIZE')],
+            style_table={'maxHeight': '50vh', 'overflowY': 'auto'},
+            style_cell={'textAlign': 'left', 'fontFamily': 'monospace', 'fontSize': '0.85rem',
+                        'whiteSpace': 'normal', 'maxWidth': '500px', 'cursor': 'pointer'},
+        ),
+        dcc.Interval(id='history-interval', interval=5000),
+        # 클릭한 기록의 실행 번호 (명령어 실행 콜백이 받아서 저장된 결과를 엶)
+        dcc.Store(id='history-open-store'),
+    ], style={'marginLeft': '10px'}),
+    # watch 로 받은 이벤트를 객체/사유/메시지별로 합친 요약 (클릭할 때마다 다시 조회하지 않음)
+    html.Div([
+        html.H4('이벤트 요약', className='mt-4'),
+        dbc.RadioItems(
+            id='event-view',
+            options=[{'label': '자주 발생한 경고', 'value': 'warnings'},
+                     {'label': '이벤트가 많은 네임스페이스', 'value': 'namespaces'},
+                     {'label': '최근 실패한 객체', 'value': 'failures'}],
+            value='warnings',
+            inline=True,
+        ),
+        html.Div(id='event-status', style={'color': 'gray', 'fontSize': '0.85rem'}),
+        dash_table.DataTable(
+            id='event-table',
+            style_table={'maxHeight': '50vh', 'overflowY': 'auto'},
+            style_cell={'textAlign': 'left', 'fontFamily': 'monospace', 'fontSize': '0.85rem',
+                        'whiteSpace': 'normal', 'maxWidth': '600px'},
+        ),
+        dcc.Interval(id='event-interval', interval=5000),
+    ], style={'marginLeft': '10px'}),
     dbc.Row([
             dbc.Col(
                 html.H4("Top 20 kubectl 명령어", className="text-center mt-4"),
@@ -261,6 +522,11 @@ app.layout = dbc.Container([
             options=[{'label': group, 'value': group} for group in commands.keys()],
             value=list(commands.keys())[0],
         ),
+        # 입력하면 그룹과 상관없이 전체 명령어와 설명에서 검색
+        dbc.Input(id='command-search', type='search', placeholder='명령어 검색 (예: rollout, logs)',
+                  debounce=False, style={'marginTop': '1rem'}),
+        # 명령어 목록은 페이지를 열 때 한 번만 받아서 브라우저에서 조회
+        dcc.Store(id='command-catalog', data=commands),
         # Add other sidebar elements here
 
     ], style={
@@ -279,9 +545,30 @@ app.layout = dbc.Container([
         html.H4('명령어 상세'),
         dcc.Dropdown(id='command-dropdown', style={'marginBottom': '1rem'},),
         html.Div(['Description: ']),
-        html.Div(id='command-description'),
+        html.P(id='command-description'),
         html.Div(['Help Result: ']),
-        html.Div(id='help-result')
+        html.Div(id='help-result'),
+        # 리소스 스키마를 한 번만 받아서 필드 트리로 탐색 (클릭할 때마다 kubectl explain 을 실행하지 않음)
+        html.H4('리소스 스키마', className='mt-4'),
+        html.Div([
+            dcc.Input(id='schema-resource', type='text', debounce=True,
+                      placeholder='리소스 (예: deployments, certificates.cert-manager.io)',
+                      style={'width': '45%', 'marginRight': '10px'}),
+            dcc.Input(id='schema-search', type='text', debounce=0.3, placeholder='필드 경로/설명 검색',
+                      style={'width': '35%', 'marginRight': '10px'}),
+            dbc.Button('상위로', id='schema-up', color='light', size='sm'),
+        ], className='mb-2'),
+        html.Div(id='schema-status', style={'color': 'gray', 'fontSize': '0.85rem'}),
+        dash_table.DataTable(
+            id='schema-table',
+            columns=[{'name': 'FIELD', 'id': 'FIELD'}, {'name': 'TYPE', 'id': 'TYPE'},
+                     {'name': 'DESCRIPTION', 'id': 'DESCRIPTION'}],
+            style_table={'maxHeight': '60vh', 'overflowY': 'auto'},
+            style_cell={'textAlign': 'left', 'fontFamily': 'monospace', 'fontSize': '0.85rem',
+                        'whiteSpace': 'normal', 'maxWidth': '500px'},
+        ),
+        dcc.Markdown(id='schema-detail', className='mt-2'),
+        dcc.Store(id='schema-path', data=''),
     ], style={
         'width': '70%',
         'float': 'left',
@@ -293,6 +580,182 @@ app.layout = dbc.Container([
 
 ], fluid=True)
 
+@app.callback(
+    Output('top-chart', 'figure'),
+    [Input('top-kind', 'value'),
+     Input('top-metric', 'value'),
+     Input('top-window', 'value'),
+     Input('top-interval', 'n_intervals')]
+)
+@timed_callback('render_top_chart')
+def render_top_chart(kind, metric, window, n_intervals):
+    # 구간 안에서 가장 많이 쓴 시계열만, 선마다 최대 300개 점으로 줄여서 그림
+    series = top_sampler.series(kind, metric, window)
+    traces = [{'type': 'scattergl', 'mode': 'lines', 'name': s['name'],
+               'x': [datetime.fromtimestamp(t).isoformat(timespec='seconds') for t in s['times']],
+               'y': [round(v, 1) for v in s['values']]} for s in series]
+    title = ''
+    if not traces:
+        title = top_sampler.last_error or ('수집된 데이터가 없습니다.' if TOP_SAMPLE_SECONDS > 0
+                                          else 'K8SHELPER_TOP_SAMPLE_SECONDS 가 0 이라 수집하지 않습니다.')
+    return {'data': traces,
+            'layout': {'title': {'text': title, 'font': {'size': 13}}, 'height': 360,
+                       'margin': {'l': 50, 'r': 20, 't': 40, 'b': 40}, 'uirevision': f'{kind}-{metric}',
+                       'yaxis': {'title': {'text': 'CPU (m)' if metric == 'cpu' else 'MiB'}, 'rangemode': 'tozero'},
+                       'legend': {'orientation': 'h'}}}
+
+
+@app.callback(
+    [Output('search-table', 'data'),
+     Output('search-status', 'children')],
+    [Input('search-query', 'value')]
+)
+@timed_callback('search_cluster')
+def search_cluster(query):
+    if search_index.source is None:
+        status = search_index.last_error or '검색 색인을 만드는 중입니다.'
+    else:
+        status = f'{len(search_index)}개 객체 색인 ({search_index.source})'
+        if search_index.dropped:
+            status += f' - 상한을 넘어 {search_index.dropped}개는 색인하지 못함'
+    if not query or not query.strip():
+        return [], status
+    total, rows = search_index.rows(query)
+    shown = f', 앞의 {len(rows)}개만 표시' if total > len(rows) else ''
+    return rows, f'"{query}" 검색 결과 {total}개{shown} - {status}'
+
+
+def format_size(size):
+    return f'{size / 1024 / 1024:.1f}M' if size >= 1024 * 1024 else f'{size / 1024:.1f}K' if size >= 1024 else str(size)
+
+
+@app.callback(
+    [Output('history-table', 'data'),
+     Output('history-status', 'children')],
+    [Input('history-search', 'value'),
+     Input('history-interval', 'n_intervals'),
+     Input('command-job-store', 'data')]
+)
+@timed_callback('list_history')
+def list_history(query, n_intervals, job_data):
+    if not history.enabled:
+        return [], 'K8SHELPER_HISTORY_MAX_MB 가 0 이라 기록하지 않습니다.'
+    runs = history.search(query or '')
+    rows = [{'TIME': time.strftime('%m-%d %H:%M:%S', time.localtime(run['started_at'])), 'USER': run['user'],
+             'CONTEXT': run['context'], 'COMMAND': run['command'], 'EXIT': run['returncode'],
+             'DURATION': f"{run['duration']:.1f}s", 'SIZE': format_size(run['size']), 'id': run['id']}
+            for run in runs]
+    status = f'"{query}" 검색 결과 {len(rows)}개' if query else f'최근 {len(rows)}개'
+    if history.last_error:
+        status += f' - {history.last_error}'
+    return rows, status
+
+
+@app.callback(
+    [Output('history-open-store', 'data'),
+     Output('history-table', 'active_cell')],
+    Input('history-table', 'active_cell'),
+    prevent_initial_call=True
+)
+def open_history(active_cell):
+    # 행 번호는 목록이 갱신되면 바뀌므로 행 id(실행 번호)로 열고, 같은 행을 다시 누를 수 있게 선택을 풂
+    if not active_cell or active_cell.get('row_id') is None:
+        return dash.no_update, dash.no_update
+    return {'run_id': active_cell['row_id'], 'at': time.time()}, None
+
+
+@app.callback(
+    [Output('event-table', 'columns'),
+     Output('event-table', 'data'),
+     Output('event-status', 'children')],
+    [Input('event-view', 'value'),
+     Input('event-interval', 'n_intervals')]
+)
+@timed_callback('render_event_summary')
+def render_event_summary(view, n_intervals):
+    columns, rows = event_aggregator.rows(view)
+    if event_aggregator.source is None:
+        status = event_aggregator.last_error or '이벤트 watch 를 시작하는 중입니다.'
+    else:
+        status = f'{len(event_aggregator)}개 묶음 ({event_aggregator.source} watch)'
+        if event_aggregator.last_error:
+            status += f' - {event_aggregator.last_error}'
+    return [{'name': column, 'id': column} for column in columns], rows, status
+
+
+@app.callback(
+    [Output('snapshot-select', 'options'),
+     Output('snapshot-status', 'children'),
+     Output('snapshot-interval', 'disabled')],
+    [Input('snapshot-create-button', 'n_clicks'),
+     Input('snapshot-interval', 'n_intervals')]
+)
+@timed_callback('manage_snapshots')
+def manage_snapshots(create_clicks, n_intervals):
+    # 수집은 백그라운드에서 한 번에 하나만, 진행 중에는 2초마다 상태 갱신
+    if create_clicks and dash.callback_context.triggered_id == 'snapshot-create-button':
+        snapshots.capture()
+    return snapshots.options(), snapshots.status(), not snapshots.capturing
+
+
+def schema_rows(fields, full_path=False):
+    # 펼칠 수 있는 필드는 ▸ 표시, 설명은 첫 문장만 (전체 설명은 클릭하면 아래에 표시)
+    rows = []
+    for field in fields:
+        name = field['path'] if full_path else field['path'].rpartition('.')[2]
+        description = field['description'].split('. ', 1)[0]
+        rows.append({'FIELD': ('▸ ' if field['expandable'] else '  ') + name + (' *' if field['required'] else ''),
+                     'TYPE': field['type'], 'DESCRIPTION': description[:200], '_path': field['path']})
+    return rows
+
+
+@app.callback(
+    [Output('schema-path', 'data'),
+     Output('schema-table', 'data'),
+     Output('schema-table', 'active_cell'),
+     Output('schema-status', 'children'),
+     Output('schema-detail', 'children')],
+    [Input('schema-resource', 'value'),
+     Input('schema-search', 'value'),
+     Input('schema-table', 'active_cell'),
+     Input('schema-up', 'n_clicks')],
+    [State('schema-path', 'data'),
+     State('schema-table', 'data')],
+    prevent_initial_call=True
+)
+@timed_callback('browse_schema')
+def browse_schema(resource, query, active_cell, up_clicks, path, rows):
+    if not resource:
+        return '', [], None, '', ''
+    try:
+        tree = schemas.get(resource)  # 처음 한 번만 받아오고 이후는 메모리/디스크 캐시
+    except SchemaUnavailable as e:
+        return '', [], None, f'스키마를 가져오지 못했습니다: {e}', ''
+
+    trigger_id = dash.callback_context.triggered[0]['prop_id'].split('.')[0]
+    detail = ''
+    if trigger_id == 'schema-resource':
+        path = ''
+    elif trigger_id == 'schema-up':
+        path = path.rpartition('.')[0]
+    elif trigger_id == 'schema-table' and active_cell and rows and active_cell['row'] < len(rows):
+        field = tree.fields.get(rows[active_cell['row']]['_path'])
+        if field is None:
+            return [dash.no_update] * 5
+        detail = f"**{field['path']}** `<{field['type']}>`{' (필수)' if field['required'] else ''}\n\n" \
+                 f"{field['description']}"
+        if field['path'] not in tree.children:
+            return dash.no_update, dash.no_update, None, dash.no_update, detail
+        path = field['path']
+    elif trigger_id == 'schema-search' and query:
+        matches = tree.search(query)
+        return path, schema_rows(matches, full_path=True), None, f'"{query}" 검색 결과 {len(matches)}개', ''
+
+    group_version = f'{tree.group}/{tree.version}' if tree.group else tree.version
+    status = f"{tree.kind} ({group_version}, {len(tree.fields)}개 필드, {tree.source}) - {path or '최상위'}"
+    return path, schema_rows(tree.list(path)), None, status, detail
+
+
 # Clientside callback for reloading the page
 app.clientside_callback(
     """
@@ -306,79 +769,892 @@ app.clientside_callback(
     Input('reset-button', 'n_clicks'),
 )
 
+app.clientside_callback(
+    """
+    function(id) {
+        if (window.crypto && window.crypto.randomUUID) {
+            return window.crypto.randomUUID();
+        }
+        return Date.now().toString(36) + Math.random().toString(36).slice(2);
+    }
+    """,
+    Output('session-id', 'data'),
+    Input('session-id', 'id'),
+)
+
+
+def cancel_previous_commands(session):
+    job_queue.cancel_session(session)
+    fanouts.cancel_user(session)
+    runbooks.cancel_user(session)
+    streams.stop_user(session)
+    refreshes.stop_user(session)
+
+
+def run_step(command, backend):
+    # 단일 명령어와 같은 경로: watch 메모리 캐시, 선택한 백엔드 (API 로 못 하는 명령어는 kubectl)
+    started = time.monotonic()
+    output = informers.serve(command)
+    if output is not None:
+        return CommandResult(output, 0, time.monotonic() - started)
+    runner = api_backend.run if backend == 'api' and api_backend.supports(command) else run_command
+    return runner(command)
+
+
+def start_runbook(session, steps, backend, snapshot):
+    for step in steps:
+        if is_streaming_command(step.command) or is_merged_logs_command(step.command):
+            return {'error': f'{step.name}: 끝나지 않는 명령어는 런북에서 실행할 수 없습니다. (`{step.command}`)'}
+    if snapshot:
+        for step in steps:
+            tokens = step.command.split()
+            if len(tokens) < 2 or tokens[0] != 'kubectl' or tokens[1] not in SNAPSHOT_VERBS:
+                return {'error': f"{step.name}: 스냅샷에서는 {', '.join(SNAPSHOT_VERBS)} 명령어만 실행할 수 있습니다."}
+        # 스냅샷 결과는 라이브 조회와 섞이지 않게 결과 캐시를 거치지 않음
+        runbook_id = runbooks.start(session, steps, lambda command: snapshots.run(snapshot, command), cache=False,
+                                    on_result=record_result(get_user_id(), f'snapshot:{snapshot}'),
+                                    client=get_user_id())
+    else:
+        runbook_id = runbooks.start(session, steps, lambda command: run_step(command, backend),
+                                    on_result=record_result(get_user_id()), backend=backend, client=get_user_id())
+    return {'runbook_id': runbook_id}
+
+
+def record_result(user, context=None):
+    # 여러 결과를 나눠서 받는 실행(클러스터 동시 실행, 런북)의 명령어 기록용
+    return lambda command, result: history.record(user, command, result, context)
+
+
+@app.callback(
+    Output('runbook-collapse', 'is_open'),
+    Input('runbook-toggle', 'n_clicks'),
+    State('runbook-collapse', 'is_open'),
+    prevent_initial_call=True
+)
+def toggle_runbook(n_clicks, is_open):
+    return not is_open
+
+
 # Add your callbacks here
 @app.callback(
-    Output('user-command-result', 'children'),
+    Output('command-job-store', 'data'),
     [Input('execute-button', 'n_clicks'),
      Input('user-command-input', 'n_submit'),
      Input('get-nodes-button', 'n_clicks'),  # 'get-nodes-button' 입력 추가
      Input('get-svc-button', 'n_clicks'),    # 'get-svc-button' 입력 추가
      Input('get-ns-button', 'n_clicks'),     # 'get-ns-button' 입력 추가
+     Input('runbook-run-button', 'n_clicks'),
+     Input('history-open-store', 'data'),
     ],
-    [State('user-command-input', 'value')],
+    [State('user-command-input', 'value'),
+     State('backend-select', 'value'),
+     State('table-mode', 'value'),
+     State('context-select', 'value'),
+     State('auto-refresh', 'value'),
+     State('snapshot-select', 'value'),
+     State('runbook-input', 'value'),
+     State('session-id', 'data')],
         prevent_initial_call=True
 )
-def execute_command(execute_clicks, input_submit, get_nodes_clicks, get_svc_clicks, get_ns_clicks, command):
+@timed_callback('execute_command')
+def execute_command(execute_clicks, input_submit, get_nodes_clicks, get_svc_clicks, get_ns_clicks, runbook_clicks,
+                    history_open, command, backend, table_mode, contexts, auto_refresh, snapshot, runbook_text,
+                    session):
     ctx = dash.callback_context
 
     if not ctx.triggered:
-        return None
+        return dash.no_update
 
     trigger_id = ctx.triggered[0]['prop_id'].split('.')[0]
 
     if trigger_id == 'execute-button' or trigger_id == 'user-command-input':
-        if command:  # 사용자 입력이 있는지 확인
-            output = run_kubectl_command(command)
-        else:
-            return dcc.Markdown(
-                "kubectl 명령어 입력 후 실행해주세요!!!",
-                style={'color': 'red'}
-            )
+        if not command:  # 사용자 입력이 있는지 확인
+            return {'error': "kubectl 명령어 입력 후 실행해주세요!!!"}
     elif trigger_id == 'get-nodes-button':
-        output = run_kubectl_command('kubectl get nodes')  # 'kubectl get nodes' 명령 실행
+        command = 'kubectl get nodes'  # 'kubectl get nodes' 명령 실행
     elif trigger_id == 'get-svc-button':
-        output = run_kubectl_command('kubectl get svc -A')  # 'kubectl get svc -A' 명령 실행
+        command = 'kubectl get svc -A'  # 'kubectl get svc -A' 명령 실행
     elif trigger_id == 'get-ns-button':
-        output = run_kubectl_command('kubectl get ns')  # 'kubectl get ns' 명령 실행
+        command = 'kubectl get ns'  # 'kubectl get ns' 명령 실행
+    elif trigger_id == 'runbook-run-button':
+        try:
+            steps = parse_runbook(runbook_text or '')
+        except RunbookError as e:
+            return {'error': str(e)}
+    elif trigger_id == 'history-open-store':
+        if not history_open:
+            return dash.no_update
     else:
-        return None
+        return dash.no_update
 
-    return dcc.Markdown(
-        f'```\n{output}\n```',
-        style={'white-space': 'pre-wrap', 'background-color': 'black', 'color': 'white', 'padding': '10px'}
-    )
+    # 이전 명령어의 결과는 더 이상 볼 수 없으므로 같은 세션(탭)의 실행 중인 명령어를 모두 취소
+    # (세션 id 를 받기 전이면 접속 주소로 대신함)
+    session = session or get_user_id()
+    cancel_previous_commands(session)
+
+    if trigger_id == 'runbook-run-button':
+        return start_runbook(session, steps, backend, snapshot)
+
+    # 기록에서 고른 결과는 저장된 출력으로 바로 표시
+    if trigger_id == 'history-open-store':
+        result, run = history.open(history_open['run_id'])
+        if result is None:
+            return {'error': '기록이 만료되었습니다.'}
+        job_id = job_queue.add_result(get_user_id(), run['command'], result, session=session)
+        opened = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['started_at']))}, {run['user']}, " \
+                 f"{run['context'] or '-'}"
+        if run['truncated']:
+            opened += ', 출력이 커서 앞부분만 저장됨'
+        return {'job_id': job_id, 'command': run['command'], 'history': opened,
+                'table': 'table' in (table_mode or []) and is_table_command(run['command'])}
+
+    # 스냅샷을 골랐으면 읽기 전용 조회만 스냅샷 파일에서 실행 (클러스터에 접속하지 않음)
+    if snapshot:
+        tokens = command.split()
+        if len(tokens) < 2 or tokens[0] != 'kubectl' or tokens[1] not in SNAPSHOT_VERBS:
+            return {'error': f"스냅샷에서는 {', '.join(SNAPSHOT_VERBS)} 명령어만 실행할 수 있습니다."}
+        try:
+            job_id = job_queue.submit(get_user_id(), command, history.run, get_user_id(), f'snapshot:{snapshot}',
+                                      command, snapshots.run, snapshot, command, session=session)
+        except JobRejected as e:
+            return {'error': str(e)}
+        return {'job_id': job_id, 'command': command,
+                'table': 'table' in (table_mode or []) and is_table_command(command)}
 
+    # 레이블 셀렉터로 고른 여러 파드의 로그는 각각 따라가면서 시각 순으로 합쳐서 스트리밍
+    if is_merged_logs_command(command):
+        stream_id = streams.start(session, command, MergedLogSession)
+        if stream_id is None:
+            return {'error': '동시에 실행 중인 스트리밍 명령어가 너무 많습니다. 잠시 후 다시 실행해주세요.'}
+        return {'stream_id': stream_id, 'command': command}
+
+    # 끝나지 않는 명령어는 스트리밍으로 실행하고 새 출력만 전달
+    if is_streaming_command(command):
+        stream_id = streams.start(session, command)
+        if stream_id is None:
+            return {'error': '동시에 실행 중인 스트리밍 명령어가 너무 많습니다. 잠시 후 다시 실행해주세요.'}
+        return {'stream_id': stream_id, 'command': command}
+
+    table = 'table' in (table_mode or []) and is_table_command(command)
+
+    # 클러스터를 선택했으면 각 컨텍스트에서 동시에 실행하고 끝나는 대로 합쳐서 표시
+    if contexts and is_fanout_command(command):
+        fanout_id = fanouts.start(session, command, contexts, record_result(get_user_id()))
+        return {'fanout_id': fanout_id, 'command': command, 'table': table}
+
+    use_api = backend == 'api' and api_backend.supports(command)
+    runner = api_backend.run if use_api else run_command
+
+    # 자동 새로고침: 처음에는 전체, 이후에는 이전 결과와 달라진 행만 전달
+    if 'on' in (auto_refresh or []):
+        refresh_id = refreshes.start(session, command, runner, get_user_id())
+        if refresh_id is None:
+            return {'error': '자동 새로고침 중인 명령어가 너무 많습니다. 잠시 후 다시 실행해주세요.'}
+        return {'refresh_id': refresh_id, 'command': command}
+
+    # watch 로 메모리에 유지 중인 리소스는 kubectl 을 실행하지 않고 바로 응답
+    started = time.monotonic()
+    output = informers.serve(command)
+    if output is not None:
+        result = CommandResult(output, 0, time.monotonic() - started)
+        history.record(get_user_id(), command, result)
+        job_id = job_queue.add_result(get_user_id(), command, result, session=session)
+        return {'job_id': job_id, 'command': command, 'informer': True, 'table': table}
+
+    # 조회 명령어는 TTL 캐시를 거쳐 같은 명령어의 동시 실행을 하나로 합침
+    cached = is_cacheable_command(command)
+
+    # 명령어는 워커 풀에서 실행하고 작업 핸들만 바로 반환
+    try:
+        # 끝난 결과는 명령어 기록에 남김
+        if cached:
+            job_id = job_queue.submit(get_user_id(), command, history.run, get_user_id(), None, command,
+                                      result_cache.run, command, runner, 'api' if use_api else 'kubectl',
+                                      session=session)
+        else:
+            job_id = job_queue.submit(get_user_id(), command, history.run, get_user_id(), None, command,
+                                      runner, command, session=session)
+    except JobRejected as e:
+        return {'error': str(e)}
+
+    return {'job_id': job_id, 'command': command, 'cached': cached, 'table': table}
 
 
 @app.callback(
-    Output('command-dropdown', 'options'),
-    Input('command-group-dropdown', 'value')
+    [Output('user-command-result', 'children'),
+     Output('command-poll-interval', 'disabled'),
+     Output('result-table-id', 'data'),
+     Output('spool-store', 'data')],
+    [Input('command-job-store', 'data'),
+     Input('command-poll-interval', 'n_intervals')],
+    prevent_initial_call=True
 )
-def update_command_dropdown(selected_group):
-    group_commands = commands[selected_group]
-    return [{'label': cmd, 'value': cmd} for cmd in group_commands]
+@timed_callback('poll_command_result')
+def poll_command_result(job_data, n_intervals):
+    children, disabled, table_id = render_command_result(job_data)
+    # 파일로 보관한 큰 출력은 뷰어가 필요한 범위만 따로 받아감 (표로 보여주면 뷰어는 쓰지 않음)
+    job = job_queue.get(job_data['job_id']) if job_data and 'job_id' in job_data else None
+    spool = job.result.spool if job is not None and job.status == 'done' else None
+    if spool is None or table_id:
+        return children, disabled, table_id, None
+    return children, disabled, table_id, {'id': spool.id, 'lines': spool.lines, 'bytes': spool.size}
+
+
+def render_command_result(job_data):
+    if not job_data:
+        return None, True, None
+
+    if 'error' in job_data:
+        return dcc.Markdown(job_data['error'], style={'color': 'red'}), True, None
+
+    if 'stream_id' in job_data:
+        return html.Div(f"스트리밍: {job_data['command']}", style={'fontWeight': 'bold'}), True, None
+
+    if 'refresh_id' in job_data:
+        return html.Div(f"자동 새로고침: {job_data['command']}", style={'fontWeight': 'bold'}), True, None
+
+    if 'fanout_id' in job_data:
+        return render_fanout(job_data)
+
+    if 'runbook_id' in job_data:
+        return render_runbook(job_data)
+
+    job = job_queue.get(job_data['job_id'])
+    if job is None:
+        return dcc.Markdown("작업 결과가 만료되었습니다. 다시 실행해주세요.", style={'color': 'red'}), True, None
+
+    if not job.finished:
+        return html.Div([
+            dbc.Spinner(size='sm'),
+            f" 실행 중... ({job_data['command']})",
+        ]), False, dash.no_update
+
+    if job.status == 'error':
+        return dcc.Markdown(f"명령어 실행 실패: {job.error}", style={'color': 'red'}), True, None
+
+    if job.status == 'cancelled':
+        return dcc.Markdown("새 명령어가 실행되어 취소되었습니다.", style={'color': 'red'}), True, None
+
+    # 표 보기: 결과는 서버에 보관하고 표에는 현재 페이지만 전달 (큰 출력도 spool 파일의 전체 행으로)
+    table_id = None
+    parsed = None
+    if job_data.get('table') and job.result.returncode == 0:
+        parsed = timed_render('poll_command_result', parse_output, job.result.full_output())
+
+    if not parsed and job.result.spool is not None:
+        spool = job.result.spool
+        return html.Small(f"출력이 커서 ({spool.size / 1024 / 1024:.1f} MiB, {spool.lines:,}줄) 아래 뷰어에서 나눠서 봅니다.",
+                          className='text-muted'), True, None
+
+    if not parsed:
+        body = timed_render('poll_command_result', render_output, job.result.output)
+    else:
+        table_id = table_store.put(*parsed)
+        body = html.Small(f"총 {len(parsed[1])}개 행", className='text-muted')
+
+    if job_data.get('history'):
+        return html.Div([
+            html.Small(f"기록에서 다시 연 결과 ({job_data['history']}) ", className='text-muted'),
+            body,
+        ]), True, table_id
+
+    if job_data.get('informer'):
+        return html.Div([
+            html.Small("watch 로 동기화된 메모리 캐시에서 조회된 결과 ", className='text-muted'),
+            body,
+        ]), True, table_id
+
+    if job_data.get('cached'):
+        age = int(time.time() - job.result.fetched_at)
+        return html.Div([
+            html.Small(f"{age}초 전 조회된 결과 ({time.strftime('%H:%M:%S', time.localtime(job.result.fetched_at))}) ",
+                       className='text-muted'),
+            body,
+        ]), True, table_id
+
+    return body, True, table_id
+
+
+def render_fanout(job_data):
+    fanout = fanouts.get(job_data['fanout_id'])
+    if fanout is None:
+        return dcc.Markdown("작업 결과가 만료되었습니다. 다시 실행해주세요.", style={'color': 'red'}), True, None
+
+    # 완료 현황과 실패/지연 중인 클러스터는 결과 위에 표시
+    status = [html.Small(f"{len(fanout.results)}/{len(fanout.contexts)}개 클러스터 완료", className='text-muted')]
+    pending = fanout.pending()
+    if pending:
+        status += [html.Br(), html.Small(f"대기 중: {', '.join(pending)}", className='text-muted')]
+    for context, result in fanout.failures().items():
+        message = (result.output.splitlines() or [''])[-1]
+        status += [html.Br(), html.Small(f"{context}: 실패 (종료 코드 {result.returncode}) {message}",
+                                         style={'color': 'red'})]
+
+    table_id = None
+    merged = fanout.merged()
+    if merged and merged[1]:
+        if job_data.get('table') and fanout.finished:
+            table_id = table_store.put(*merged)
+            body = html.Small(f"총 {len(merged[1])}개 행", className='text-muted')
+        else:
+            body = timed_render('poll_command_result', render_output, format_merged(*merged))
+    else:
+        sections = []
+        for context, result in fanout.sections():
+            section = [html.H6(context), render_output(result.output)]
+            if result.spool is not None:
+                section.append(html.Small(f"출력이 커서 앞부분만 표시합니다 ({result.spool.lines:,}줄).",
+                                          className='text-muted'))
+            sections.append(html.Div(section))
+        body = html.Div(sections)
+
+    return html.Div([html.Div(status), body]), fanout.finished, table_id
+
+
+RUNBOOK_STEP_ICONS = {'pending': '⏳', 'running': '▶', 'done': '✔', 'failed': '✖', 'skipped': '↷', 'cancelled': '■'}
+
+
+def render_runbook(job_data):
+    runbook = runbooks.get(job_data['runbook_id'])
+    if runbook is None:
+        return dcc.Markdown("작업 결과가 만료되었습니다. 다시 실행해주세요.", style={'color': 'red'}), True, None
+
+    # 단계마다 접을 수 있는 항목 하나, 실패한 단계는 펼쳐서 표시
+    counts = runbook.counts()
+    finished = sum(counts.get(status, 0) for status in ('done', 'failed', 'skipped', 'cancelled'))
+    status = f"{finished}/{len(runbook.steps)}단계 완료"
+    for key, label in (('running', '실행 중'), ('failed', '실패'), ('skipped', '건너뜀'), ('cancelled', '취소')):
+        if counts.get(key):
+            status += f", {label} {counts[key]}"
+    if runbook.finished:
+        status += f" ({runbook.finished_at - runbook.started_at:.1f}초)"
+    items = []
+    for step in runbook.steps:
+        summary = f"{RUNBOOK_STEP_ICONS[step.status]} {step.name}: {step.command}"
+        if step.result is not None:
+            summary += f" ({step.result.duration:.1f}초{', 공유된 조회 결과' if step.cached else ''})"
+        elif step.status == 'pending' and step.after:
+            summary += f" (대기: {', '.join(step.after)})"
+        if step.result is not None:
+            body = render_output(step.result.output)
+            if step.result.spool is not None:
+                body = html.Div([html.Small(f"출력이 커서 앞부분만 표시합니다 ({step.result.spool.lines:,}줄).",
+                                            className='text-muted'), body])
+        elif step.status == 'skipped':
+            body = html.Small('먼저 실행할 단계가 실패해서 건너뛰었습니다.', className='text-muted')
+        else:
+            body = None
+        items.append(html.Details([
+            html.Summary(summary, style={'fontFamily': 'monospace', 'color': 'red' if step.status == 'failed' else None}),
+            body,
+        ], open=step.status == 'failed'))
+    return html.Div([html.Small(status, className='text-muted'), html.Div(items)]), runbook.finished, None
+
+
+@app.callback(
+    Output('context-select', 'options'),
+    Input('context-refresh-button', 'n_clicks')
+)
+def update_context_options(refresh_clicks):
+    return [{'label': context, 'value': context} for context in list_contexts(refresh=bool(refresh_clicks))]
+
 
 @app.callback(
+    [Output('result-table', 'data'),
+     Output('result-table', 'columns'),
+     Output('result-table', 'page_count'),
+     Output('result-table', 'page_current'),
+     Output('result-table-container', 'style')],
+    [Input('result-table-id', 'data'),
+     Input('result-table', 'page_current'),
+     Input('result-table', 'page_size'),
+     Input('result-table', 'sort_by'),
+     Input('result-table', 'filter_query')],
+    prevent_initial_call=True
+)
+@timed_callback('update_result_table')
+def update_result_table(table_id, page_current, page_size, sort_by, filter_query):
+    columns = table_store.columns(table_id) if table_id else None
+    if columns is None:
+        return [], [], 0, 0, {'display': 'none'}
+
+    # 새 결과가 들어오면 첫 페이지부터 표시
+    if dash.callback_context.triggered[0]['prop_id'] == 'result-table-id.data':
+        page_current = 0
+    rows, total = table_store.page(table_id, page_current, page_size, sort_by, filter_query)
+    return (rows, [{'name': column, 'id': column} for column in columns], max(1, -(-total // page_size)),
+            page_current, {'display': 'block'})
+
+
+@app.callback(
+    [Output('stream-chunk-store', 'data'),
+     Output('stream-poll-interval', 'disabled')],
+    [Input('command-job-store', 'data'),
+     Input('stream-poll-interval', 'n_intervals'),
+     Input('stream-stop-button', 'n_clicks')],
+    State('stream-chunk-store', 'data'),
+    prevent_initial_call=True
+)
+@timed_callback('poll_stream')
+def poll_stream(job_data, n_intervals, stop_clicks, chunk_data):
+    if not job_data or 'stream_id' not in job_data:
+        return {'hide': True}, True
+
+    trigger_id = dash.callback_context.triggered[0]['prop_id'].split('.')[0]
+    stream_id = job_data['stream_id']
+
+    if trigger_id == 'stream-stop-button':
+        streams.stop(stream_id)
+        return {'text': '\n[스트리밍 중지]\n'}, True
+
+    # 새 스트림이면 처음부터, 아니면 마지막으로 받은 위치 이후만 읽기
+    reset = trigger_id == 'command-job-store'
+    cursor = 0 if reset or not chunk_data else chunk_data.get('cursor', 0)
+
+    session = streams.get(stream_id)
+    if session is None:
+        return {'text': '\n[스트리밍 종료]\n', 'reset': reset}, True
+
+    finished = session.finished
+    text, cursor, skipped = session.read(cursor)
+    if finished:
+        text += f'\n[종료 코드 {session.returncode}]\n'
+    if not text and not reset:
+        return dash.no_update, False
+
+    return {'text': text, 'cursor': cursor, 'skipped': skipped, 'reset': reset}, finished
+
+
+@app.callback(
+    [Output('refresh-delta-store', 'data'),
+     Output('refresh-interval', 'disabled')],
+    [Input('command-job-store', 'data'),
+     Input('refresh-interval', 'n_intervals')],
+    prevent_initial_call=True
+)
+@timed_callback('poll_refresh')
+def poll_refresh(job_data, n_intervals):
+    if not job_data or 'refresh_id' not in job_data:
+        return {'hide': True}, True
+
+    session = refreshes.get(job_data['refresh_id'])
+    if session is None:
+        return {'error': '자동 새로고침이 종료되었습니다. 다시 실행해주세요.'}, True
+
+    # 새 명령어면 전체 표, 타이머면 변경분만
+    reset = dash.callback_context.triggered[0]['prop_id'].split('.')[0] == 'command-job-store'
+    delta = session.refresh(reset)
+    if delta is None:
+        return dash.no_update, False  # 새로 끝난 실행이 없음
+    return delta, False
+
+
+# 큰 출력 뷰어: 현재 위치부터 SPOOL_PAGE_LINES 줄만 받아서 표시
+app.clientside_callback(
+    """
+    function(spool, start) {
+        var hidden = {'display': 'none'};
+        if (!spool) {
+            return ['', hidden, '', ''];
+        }
+        var line = Math.max(1, Math.min(parseInt(start || 1, 10) || 1, spool.lines));
+        var url = '/spool/' + spool.id;
+        return fetch(url + '/lines?start=' + (line - 1) + '&count=PAGE_LINES')
+            .then(function(response) {
+                if (!response.ok) {
+                    throw new Error('보관 기간이 지난 출력입니다. 다시 실행해주세요.');
+                }
+                return response.json();
+            })
+            .then(function(page) {
+                var last = line + page.lines.length - 1;
+                var info = line.toLocaleString() + '-' + last.toLocaleString() + ' / ' +
+                           spool.lines.toLocaleString() + '줄 (' + (spool.bytes / 1048576).toFixed(1) + ' MiB)';
+                return [page.lines.join('\\n'), {'display': 'block', 'padding': '0 1.25rem 1.25rem'}, info, url];
+            })
+            .catch(function(error) {
+                return ['', {'display': 'block', 'padding': '0 1.25rem 1.25rem'}, error.message, ''];
+            });
+    }
+    """.replace('PAGE_LINES', str(SPOOL_PAGE_LINES)),
+    [Output('spool-view', 'children'),
+     Output('spool-container', 'style'),
+     Output('spool-info', 'children'),
+     Output('spool-download', 'href')],
+    Input('spool-store', 'data'),
+    Input('spool-start', 'value'),
+)
+
+app.clientside_callback(
+    """
+    function(prev_clicks, next_clicks, spool, start) {
+        var triggered = window.dash_clientside.callback_context.triggered.map(function(t) { return t.prop_id; });
+        if (!spool || triggered.indexOf('spool-store.data') >= 0) {
+            return 1;
+        }
+        var line = parseInt(start || 1, 10) || 1;
+        if (triggered.indexOf('spool-next.n_clicks') >= 0) {
+            line += PAGE_LINES;
+        } else {
+            line -= PAGE_LINES;
+        }
+        return Math.max(1, Math.min(line, spool.lines));
+    }
+    """.replace('PAGE_LINES', str(SPOOL_PAGE_LINES)),
+    Output('spool-start', 'value'),
+    Input('spool-prev', 'n_clicks'),
+    Input('spool-next', 'n_clicks'),
+    Input('spool-store', 'data'),
+    State('spool-start', 'value'),
+    prevent_initial_call=True
+)
+
+# 현재 위치 이후에서 검색 (/.../ 로 감싸면 정규식)
+app.clientside_callback(
+    """
+    function(clicks, submit, query, spool, start) {
+        if (!spool || !query) {
+            return '';
+        }
+        var regex = query.length > 2 && query[0] === '/' && query[query.length - 1] === '/';
+        var params = 'q=' + encodeURIComponent(regex ? query.slice(1, -1) : query) + '&regex=' + (regex ? 1 : 0) +
+                     '&start=' + Math.max(0, (parseInt(start || 1, 10) || 1) - 1);
+        return fetch('/spool/' + spool.id + '/search?' + params)
+            .then(function(response) { return response.json(); })
+            .then(function(result) {
+                if (result.error) {
+                    return result.error;
+                }
+                if (!result.matches.length) {
+                    return '일치하는 줄이 없습니다.';
+                }
+                return result.matches.map(function(match) {
+                    return (match.line + 1) + ': ' + match.text;
+                }).join('\\n');
+            })
+            .catch(function() {
+                return '보관 기간이 지난 출력입니다. 다시 실행해주세요.';
+            });
+    }
+    """,
+    Output('spool-search-result', 'children'),
+    Input('spool-search-button', 'n_clicks'),
+    Input('spool-search', 'n_submit'),
+    State('spool-search', 'value'),
+    State('spool-store', 'data'),
+    State('spool-start', 'value'),
+    prevent_initial_call=True
+)
+
+
+# 자동 새로고침 변경분을 브라우저의 표에 반영하고 바뀐 셀을 강조
+app.clientside_callback(
+    """
+    function(delta, rows) {
+        var no = window.dash_clientside.no_update;
+        var hidden = {'display': 'none'};
+        if (!delta) {
+            return [no, no, no, no, no, no, no];
+        }
+        if (delta.hide) {
+            return [[], [], [], hidden, '', hidden, ''];
+        }
+        if (delta.error) {
+            return [no, no, no, no, no, no, (delta.at ? delta.at + ' 실행 실패: ' : '') + delta.error];
+        }
+        var status = delta.at + ' 갱신';
+        if (delta.unchanged) {
+            return [no, no, no, no, no, no, status + ' (변경 없음)'];
+        }
+        if (delta.text !== undefined) {
+            return [[], [], [], hidden, delta.text,
+                    {'display': 'block', 'white-space': 'pre-wrap', 'background-color': 'black',
+                     'color': 'white', 'padding': '10px'}, status + ' (내용 변경)'];
+        }
+        if (delta.reset) {
+            var columns = delta.columns.concat(['_key', '_state', '_changed']).map(function(column) {
+                return {'name': column, 'id': column};
+            });
+            var styles = [
+                {'if': {'filter_query': '{_state} = "added"'}, 'backgroundColor': '#d4edda'},
+                {'if': {'filter_query': '{_state} = "removed"'}, 'color': '#a94442',
+                 'textDecoration': 'line-through'}
+            ].concat(delta.columns.map(function(column) {
+                return {'if': {'filter_query': '{_changed} contains "|' + column + '|"', 'column_id': column},
+                        'backgroundColor': '#fff3cd', 'fontWeight': 'bold'};
+            }));
+            return [delta.rows, columns, styles, {'display': 'block'}, '', hidden,
+                    status + ' (전체 ' + delta.rows.length + '개 행)'];
+        }
+        // 지난번 표시는 지우고 (삭제 표시한 행은 제거) 이번 변경분을 반영
+        var marked = false, next = [], index = {};
+        (rows || []).forEach(function(row) {
+            marked = marked || row._state || row._changed;
+            if (row._state === 'removed') {
+                return;
+            }
+            index[row._key] = next.length;
+            next.push(Object.assign({}, row, {'_state': '', '_changed': ''}));
+        });
+        delta.removed.forEach(function(key) {
+            if (key in index) {
+                next[index[key]]._state = 'removed';
+            }
+        });
+        delta.changed.forEach(function(change) {
+            if (change._key in index) {
+                Object.assign(next[index[change._key]], change);
+            }
+        });
+        var summary = ' (추가 ' + delta.added.length + ', 삭제 ' + delta.removed.length +
+                      ', 변경 ' + delta.changed.length + ')';
+        if (!marked && !delta.added.length && !delta.removed.length && !delta.changed.length) {
+            return [no, no, no, no, no, no, status + summary];
+        }
+        return [next.concat(delta.added), no, no, {'display': 'block'}, no, no, status + summary];
+    }
+    """,
+    [Output('refresh-table', 'data'),
+     Output('refresh-table', 'columns'),
+     Output('refresh-table', 'style_data_conditional'),
+     Output('refresh-table-container', 'style'),
+     Output('refresh-output', 'children'),
+     Output('refresh-output', 'style'),
+     Output('refresh-status', 'children')],
+    Input('refresh-delta-store', 'data'),
+    State('refresh-table', 'data'),
+)
+
+
+# 스트리밍 청크를 브라우저에서 이어 붙이기 (화면에는 최근 200,000자만 유지)
+app.clientside_callback(
+    """
+    function(chunk, current) {
+        if (!chunk) {
+            return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+        }
+        if (chunk.hide) {
+            return ['', {'display': 'none'}];
+        }
+        var text = chunk.reset ? '' : (current || '');
+        if (chunk.skipped) {
+            text += '\\n... (서버 버퍼 상한으로 일부 출력 생략) ...\\n';
+        }
+        text += chunk.text;
+        if (text.length > 200000) {
+            text = text.slice(text.length - 200000);
+        }
+        return [text, {'display': 'block', 'white-space': 'pre-wrap', 'background-color': 'black',
+                       'color': 'white', 'padding': '10px', 'maxHeight': '60vh', 'overflowY': 'auto'}];
+    }
+    """,
+    [Output('stream-output', 'children'),
+     Output('stream-output', 'style')],
+    Input('stream-chunk-store', 'data'),
+    State('stream-output', 'children'),
+)
+
+
+# 입력이 150ms 동안 바뀌지 않을 때만 자동 완성 요청
+app.clientside_callback(
+    """
+    function(value) {
+        window.k8shelperCompletionValue = value;
+        return new Promise(function(resolve) {
+            setTimeout(function() {
+                resolve(window.k8shelperCompletionValue === value ? value : window.dash_clientside.no_update);
+            }, 150);
+        });
+    }
+    """,
+    Output('completion-query', 'data'),
+    Input('user-command-input', 'value'),
+    prevent_initial_call=True
+)
+
+
+@app.callback(
+    Output('command-suggestions', 'children'),
+    Input('completion-query', 'data'),
+    prevent_initial_call=True
+)
+@timed_callback('complete_command')
+def complete_command(text):
+    return [html.Option(value=suggestion) for suggestion in completion_index.complete(text or '')]
+
+
+# 명령어 목록과 설명 조회는 서버 왕복 없이 브라우저에서 처리
+app.clientside_callback(
+    """
+    function(group, query, catalog) {
+        if (!catalog) {
+            return [];
+        }
+        query = (query || '').trim().toLowerCase().replace(/^kubectl\\s+/, '');
+        if (!query) {
+            return Object.keys(catalog[group] || {}).map(function(cmd) {
+                return {'label': cmd, 'value': cmd};
+            });
+        }
+        // 명령어 이름은 글자가 순서대로 나오면 일치 (연속 글자와 단어 시작에 가산점)
+        function fuzzy(text, q) {
+            var pos = 0, total = 0;
+            for (var i = 0; i < q.length; i++) {
+                var found = text.indexOf(q[i], pos);
+                if (found < 0) {
+                    return 0;
+                }
+                total += 1;
+                if (i > 0 && found === pos) {
+                    total += 2;
+                }
+                if (found === 0 || text[found - 1] === '-') {
+                    total += 3;
+                }
+                pos = found + 1;
+            }
+            return total * 2 - (text.length - q.length) * 0.1;
+        }
+        // 설명은 모든 검색어가 들어 있을 때만 일치
+        function words(text, terms) {
+            for (var i = 0; i < terms.length; i++) {
+                if (text.indexOf(terms[i]) < 0) {
+                    return 0;
+                }
+            }
+            return terms.join('').length;
+        }
+        var terms = query.split(/\\s+/);
+        var matches = [];
+        Object.keys(catalog).forEach(function(groupName) {
+            Object.keys(catalog[groupName]).forEach(function(cmd) {
+                var description = catalog[groupName][cmd];
+                var score = Math.max(fuzzy(cmd, query.replace(/\\s+/g, '')), words(description.toLowerCase(), terms));
+                if (score > 0) {
+                    matches.push({'score': score, 'cmd': cmd, 'description': description});
+                }
+            });
+        });
+        matches.sort(function(a, b) {
+            return b.score - a.score || (a.cmd < b.cmd ? -1 : 1);
+        });
+        return matches.slice(0, 30).map(function(match) {
+            return {'label': match.cmd + ' - ' + match.description, 'value': match.cmd};
+        });
+    }
+    """,
+    Output('command-dropdown', 'options'),
+    Input('command-group-dropdown', 'value'),
+    Input('command-search', 'value'),
+    State('command-catalog', 'data'),
+)
+
+app.clientside_callback(
+    """
+    function(cmd, catalog) {
+        if (!cmd || !catalog) {
+            return '';
+        }
+        for (var group in catalog) {
+            if (catalog[group][cmd] !== undefined) {
+                return catalog[group][cmd];
+            }
+        }
+        return '';
+    }
+    """,
     Output('command-description', 'children'),
     Input('command-dropdown', 'value'),
-    State('command-group-dropdown', 'value')
+    State('command-catalog', 'data'),
 )
-def update_command_description(selected_command, selected_group):
-    if selected_command:
-        description = commands[selected_group][selected_command]
-        return html.P(description)
 
 @app.callback(
     Output('help-result', 'children'),
     Input('command-dropdown', 'value'),
     prevent_initial_call=True  # 초기 호출 방지
 )
+@timed_callback('execute_help_command')
 def execute_help_command(selected_command):
     if selected_command:
-        output = run_kubectl_command(f'kubectl {selected_command} --help')
+        output = help_cache.get(selected_command)  # kubectl 버전별로 캐시된 도움말
         # Use Markdown code block to preserve formatting
-        return dcc.Markdown(f'```\n{output}\n```', style={'white-space': 'pre'})
+        return timed_render('execute_help_command', lambda: dcc.Markdown(f'```\n{output}\n```',
+                                                                          style={'white-space': 'pre'}))
+
+
+# 캐시 적중률은 각 캐시가 세는 값을 조회 시점에 옮겨 옴
+def collect_cache_metrics():
+    cache_requests.set('result', 'hit', value=result_cache.hits)
+    cache_requests.set('result', 'miss', value=result_cache.misses)
+    cache_requests.set('help', 'hit', value=help_cache.hits)
+    cache_requests.set('help', 'miss', value=help_cache.misses)
+    cache_requests.set('informer', 'hit', value=informers.hits)
+    live_processes.set(value=len(processes))
+
+
+registry.add_collector(collect_cache_metrics)
+
+
+# 파일로 보관한 큰 출력의 범위 읽기 (전체 파일은 Range 요청 지원)
+@app.server.route('/spool/<spool_id>')
+def spool_download(spool_id):
+    spool = spools.get(spool_id) or abort(404)
+    return send_file(spool.path, mimetype='text/plain', conditional=True)
+
+
+@app.server.route('/spool/<spool_id>/lines')
+def spool_lines(spool_id):
+    spool = spools.get(spool_id) or abort(404)
+    start = request.args.get('start', 0, type=int)
+    lines = spool.read_lines(start, request.args.get('count', SPOOL_PAGE_LINES, type=int))
+    return jsonify({'start': start, 'lines': lines, 'total': spool.lines})
+
+
+@app.server.route('/spool/<spool_id>/search')
+def spool_search(spool_id):
+    spool = spools.get(spool_id) or abort(404)
+    try:
+        matches = spool.search(request.args.get('q', ''), request.args.get('start', 0, type=int),
+                               regex=request.args.get('regex') == '1')
+    except re.error as e:
+        return jsonify({'error': f'정규식 오류: {e}'}), 400
+    return jsonify({'matches': [{'line': line, 'text': text} for line, text in matches]})
+
+
+# Prometheus 텍스트 형식 메트릭
+@app.server.route('/metrics')
+def metrics_endpoint():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+_background_pid = None
+
+
+def warm_caches():
+    help_cache.warm([cmd for group_commands in commands.values() for cmd in group_commands])
+    completion_index.load_or_build()
+
+
+# 도움말 캐시 채우기와 watch 는 스레드라서 fork 후 워커 프로세스마다 한 번씩 시작
+def start_background_tasks():
+    global _background_pid
+    if _background_pid == os.getpid():
+        return
+    _background_pid = os.getpid()
+    # 모든 명령어의 도움말 캐시를 미리 채운 뒤 그 도움말로 자동 완성 인덱스를 만듦
+    threading.Thread(target=warm_caches, name='help-cache-warm', daemon=True).start()
+    # 자주 조회하는 리소스를 watch 로 메모리에 유지
+    informers.start()
+    # 노드/파드 사용량을 주기적으로 수집해서 추이 차트에 사용
+    top_sampler.start()
+    # 이벤트 watch 를 요약해서 경고/네임스페이스/실패 객체 순위를 바로 보여줌
+    event_aggregator.start()
+    # 모든 리소스 종류를 watch 해서 클러스터 검색 색인을 바뀐 객체만 고쳐 가며 유지
+    search_index.start()
 
 
 if __name__ == '__main__':
-    app.run_server(debug=True, host='0.0.0.0', port='8050')
+    # 개발용 서버, 운영에서는 wsgi.py 를 gunicorn 으로 실행
+    start_background_tasks()
+    app.run(debug=os.environ.get('K8SHELPER_DEBUG') == '1', host='0.0.0.0',
+            port=int(os.environ.get('K8SHELPER_PORT', '8050')))
@@ -0,0 +1,263 @@
+import heapq
+import os
+import shlex
+import subprocess
+import threading
+import time
+from collections import deque
+
+from executor import ProcessCancelled, ProcessLimitReached, process_owner, processes, run_command
+from streaming import ChunkBuffer
+
+# 여러 파드 로그 합치기 설정 (환경 변수로 조정)
+MAX_LOG_SOURCES = int(os.environ.get('K8SHELPER_MAX_LOG_SOURCES', '20'))  # 동시에 따라갈 파드/컨테이너 수
+SOURCE_BUFFER_LINES = int(os.environ.get('K8SHELPER_LOG_SOURCE_BUFFER_LINES', '1000'))  # 소스별로 합치기 전에 보관할 줄 수
+POD_RESYNC_SECONDS = float(os.environ.get('K8SHELPER_LOG_RESYNC_SECONDS', '5'))  # 새로 생기거나 사라진 파드 확인 주기
+MERGE_DELAY_SECONDS = 2  # 조용한 소스를 이 시간까지만 기다린 뒤 내보냄
+SOURCE_START_SECONDS = 10  # follow 중 새 소스의 첫 줄(--tail 이전 기록)을 기다리는 시간, 로그가 없는 컨테이너는 이후 무시
+MERGE_INTERVAL_SECONDS = 0.25
+DEFAULT_TAIL_LINES = 20
+
+SELECTOR_FLAGS = ('-l', '--selector')
+# 파드 이름, 상태, 컨테이너 이름 목록 (JSON 전체보다 훨씬 작게 받음)
+POD_JSONPATH = '{range .items[*]}{.metadata.name}{"\\t"}{.status.phase}{"\\t"}' \
+               '{range .spec.containers[*]}{.name}{","}{end}{"\\n"}{end}'
+
+
+def is_merged_logs_command(command):
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return False
+    return 'logs' in tokens and any(token in SELECTOR_FLAGS or token.startswith('--selector=') for token in tokens)
+
+
+def parse_logs_command(command):
+    # kubectl logs -l <selector> [-n ns] [-c container] [-f] [--tail N] [--since 1h] [--context ctx]
+    options = {'namespace': None, 'selector': None, 'container': None, 'follow': False, 'tail': None,
+               'since': None, 'context': None}
+    names = {'-n': 'namespace', '--namespace': 'namespace', '-l': 'selector', '--selector': 'selector',
+             '-c': 'container', '--container': 'container', '--tail': 'tail', '--since': 'since',
+             '--context': 'context'}
+    tokens = shlex.split(command)
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        flag, _, value = token.partition('=')
+        if flag in names:
+            if not value and i + 1 < len(tokens):
+                i += 1
+                value = tokens[i]
+            options[names[flag]] = value
+        elif token in ('-f', '--follow', '--follow=true'):
+            options['follow'] = True
+        i += 1
+    if options['tail'] is None:
+        options['tail'] = str(DEFAULT_TAIL_LINES)
+    return options
+
+
+def split_timestamp(line, fallback):
+    # "2024-05-01T10:00:00.123456789Z 메시지" -> (정렬 키, 메시지)
+    # 소수점 자릿수가 줄마다 달라도 문자열 비교로 정렬되도록 9자리로 맞춤
+    stamp, _, text = line.partition(' ')
+    if len(stamp) < 20 or stamp[4] != '-' or stamp[10] != 'T' or not stamp.endswith('Z'):
+        return fallback, line
+    seconds, _, fraction = stamp[:-1].partition('.')
+    return f'{seconds}.{fraction[:9].ljust(9, "0")}Z', text
+
+
+def utc_key(seconds):
+    return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(seconds)) + f'.{int(seconds % 1 * 1e9):09d}Z'
+
+
+class LogSource:
+    # 파드 컨테이너 하나의 kubectl logs 프로세스와 아직 합치지 않은 줄
+    def __init__(self, name, command, lock):
+        self.name = name
+        self.lines = deque()  # (정렬 키, 메시지)
+        self.latest = ''  # 마지막으로 받은 줄의 정렬 키
+        self.dropped = 0
+        self.done = False
+        self.started_at = time.monotonic()
+        self._lock = lock
+        self._process = processes.spawn(command, wait=0, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        threading.Thread(target=self._read_loop, name=f'logs-{name}', daemon=True).start()
+
+    def _read_loop(self):
+        for raw in self._process.stdout:
+            key, text = split_timestamp(raw.decode('utf-8', errors='replace').rstrip('\r\n'), self.latest)
+            with self._lock:
+                # 합치기가 밀리면 소스별로 오래된 줄부터 버려서 메모리 사용량을 제한
+                if len(self.lines) >= SOURCE_BUFFER_LINES:
+                    self.lines.popleft()
+                    self.dropped += 1
+                self.lines.append((key, text))
+                self.latest = key
+        self._process.stdout.close()
+        self._process.wait()
+        processes.release(self._process)
+        with self._lock:
+            self.done = True
+
+
+class MergedLogSession(ChunkBuffer):
+    # 레이블 셀렉터에 맞는 모든 파드/컨테이너의 로그를 따라가면서 시각 순으로 합쳐서 출력
+    def __init__(self, user, command):
+        super().__init__(user, command)
+        self.options = parse_logs_command(command)
+        self._sources = {}  # (파드, 컨테이너) -> LogSource
+        self._resumed = {}  # (파드, 컨테이너) -> 끝난 소스의 마지막 정렬 키
+        self._skipped = set()  # 상한 때문에 건너뛴 (파드, 컨테이너), 안내는 한 번만
+        self._source_lock = threading.Lock()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._run, name=f'logmerge-{self.id[:8]}', daemon=True).start()
+
+    def _kubectl(self, *args):
+        options = self.options
+        parts = ['kubectl'] + list(args)
+        if options['namespace']:
+            parts += ['-n', options['namespace']]
+        if options['context']:
+            parts += ['--context', options['context']]
+        return ' '.join(shlex.quote(part) for part in parts)
+
+    def _list_pods(self):
+        result = run_command(self._kubectl('get', 'pods', '-l', self.options['selector'], '-o',
+                                           f'jsonpath={POD_JSONPATH}'), timeout=30)
+        if result.returncode != 0:
+            return None, result.output
+        pods = {}
+        for line in result.full_output().splitlines():
+            name, phase, containers = (line.split('\t') + ['', ''])[:3]
+            # follow 중에는 실행 중인 파드만, 아니면 끝난 파드의 로그도 받음
+            if name and (phase == 'Running' or not self.options['follow'] and phase in ('Succeeded', 'Failed')):
+                pods[name] = [c for c in containers.split(',') if c]
+        return pods, None
+
+    def _start_source(self, pod, container):
+        options = self.options
+        args = ['logs', pod, '-c', container, '--timestamps']
+        since = self._resumed.get((pod, container))
+        if since:
+            # 재시작 등으로 끊겼던 컨테이너는 마지막으로 받은 시각 이후만 다시 받음
+            args += ['--since-time', since[:-1].rstrip('0').rstrip('.') + 'Z']
+        else:
+            args += ['--tail', options['tail']]
+            if options['since']:
+                args += ['--since', options['since']]
+        if options['follow']:
+            args.append('-f')
+        with process_owner(self.id):
+            return LogSource(f'{pod}/{container}', self._kubectl(*args), self._source_lock)
+
+    def _sync(self):
+        # 셀렉터에 새로 걸린 파드는 추가하고, 사라진 파드는 남은 줄만 내보내고 정리
+        pods, error = self._list_pods()
+        if pods is None:
+            self._append(f'[파드 목록 조회 실패] {error.strip()}\n')
+            return False
+        wanted = [(pod, container) for pod, containers in sorted(pods.items()) for container in containers
+                  if self.options['container'] in (None, container)]
+        notices = []
+        for key in wanted:
+            source = self._sources.get(key)
+            if source is not None and not source.done:
+                continue
+            if source is not None:
+                if not self.options['follow'] or source.lines:
+                    continue  # follow 가 아니면 한 번만 받고, 남은 줄을 다 내보낸 뒤에 다시 연결
+                self._resumed[key] = source.latest or self._resumed.get(key)
+            if sum(not s.done for s in self._sources.values()) >= MAX_LOG_SOURCES:
+                if key not in self._skipped:
+                    self._skipped.add(key)
+                    notices.append(f'[{key[0]}/{key[1]}: 동시에 따라갈 수 있는 컨테이너 {MAX_LOG_SOURCES}개 초과]')
+                continue
+            try:
+                new_source = self._start_source(*key)
+            except ProcessCancelled:
+                return False
+            except ProcessLimitReached as e:
+                if key not in self._skipped:
+                    self._skipped.add(key)
+                    notices.append(f'[{key[0]}/{key[1]}: {e}]')
+                continue
+            self._skipped.discard(key)
+            if source is None:
+                notices.append(f'[+ {key[0]}/{key[1]}]')
+            with self._source_lock:
+                self._sources[key] = new_source
+        for key in set(self._sources) - set(wanted):
+            if self._sources[key].done and not self._sources[key].lines:
+                notices.append(f'[- {key[0]}/{key[1]}]')
+                del self._sources[key]
+                self._resumed.pop(key, None)
+        if not self._sources and not wanted:
+            notices.append(f"[셀렉터 {self.options['selector']} 에 맞는 파드가 없습니다]")
+        if notices:
+            self._append('\n'.join(notices) + '\n')
+        return True
+
+    def _merge(self, final=False):
+        # 각 소스는 이미 시각 순이므로 k-way 병합으로 watermark 이전의 줄만 꺼냄
+        with self._source_lock:
+            sources = list(self._sources.values())
+            watermark = '\uffff' if final else self._watermark(sources)
+            heap = [(source.lines[0][0], i) for i, source in enumerate(sources) if source.lines]
+            heapq.heapify(heap)
+            out, dropped = [], 0
+            while heap and watermark is not None and heap[0][0] <= watermark:
+                _, i = heapq.heappop(heap)
+                source = sources[i]
+                key, text = source.lines.popleft()
+                out.append(f'{source.name} | {key[11:23]} {text}\n')
+                if source.lines:
+                    heapq.heappush(heap, (source.lines[0][0], i))
+            for source in sources:
+                dropped += source.dropped
+                source.dropped = 0
+        if dropped:
+            out.insert(0, f'[출력이 밀려서 {dropped}줄 건너뜀]\n')
+        if out:
+            self._append(''.join(out))
+
+    def _watermark(self, sources):
+        # 아직 줄을 보낼 수 있는 소스보다 앞선 줄은 더 이상 순서가 바뀌지 않음 (None 이면 아직 내보내지 않음)
+        # 첫 줄을 받기 전의 소스는 오래된 --tail 기록을 보낼 수 있으므로 그 소스가 따라잡을 때까지 기다림
+        live = [source for source in sources if not source.done]
+        now = time.monotonic()
+        if not self.options['follow']:
+            if any(not source.latest for source in live):
+                return None
+            return min(source.latest for source in live) if live else '\uffff'
+        if any(not source.latest and now - source.started_at < SOURCE_START_SECONDS for source in live):
+            return None
+        pending = [source.latest for source in live if source.latest]
+        if not pending:
+            return '\uffff'
+        # follow 중에는 조용한 소스를 MERGE_DELAY_SECONDS 까지만 기다림
+        return max(min(pending), utc_key(time.time() - MERGE_DELAY_SECONDS))
+
+    def _finished_sources(self):
+        with self._source_lock:
+            return all(source.done for source in self._sources.values())
+
+    def _run(self):
+        if not self._sync():
+            self.returncode = 1
+            return
+        next_sync = time.monotonic() + POD_RESYNC_SECONDS
+        while not self._stopped.wait(MERGE_INTERVAL_SECONDS):
+            self._merge()
+            if not self.options['follow']:
+                if self._finished_sources():
+                    break
+            elif time.monotonic() >= next_sync:
+                self._sync()
+                next_sync = time.monotonic() + POD_RESYNC_SECONDS
+        self._merge(final=True)
+        self.returncode = 0
+
+    def stop(self):
+        self._stopped.set()
+        processes.kill_owner(self.id)
@@ -0,0 +1,207 @@
+import functools
+import logging
+import os
+import threading
+import time
+
+# 느린 명령어 로그 기준 (초, 0 이면 사용 안 함)
+SLOW_COMMAND_SECONDS = float(os.environ.get('K8SHELPER_SLOW_COMMAND_SECONDS', '0'))
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 레이블 수가 늘어나지 않도록 알려진 kubectl 명령어만 그대로 쓰고 나머지는 other
+KUBECTL_VERBS = frozenset([
+    'create', 'expose', 'run', 'set', 'explain', 'get', 'edit', 'delete', 'rollout', 'scale', 'autoscale',
+    'certificate', 'cluster-info', 'top', 'cordon', 'uncordon', 'drain', 'taint', 'describe', 'logs', 'attach',
+    'exec', 'port-forward', 'proxy', 'cp', 'auth', 'debug', 'events', 'diff', 'apply', 'patch', 'replace', 'wait',
+    'kustomize', 'label', 'annotate', 'completion', 'api-resources', 'api-versions', 'config', 'plugin',
+    'version', 'alpha',
+])
+
+slow_logger = logging.getLogger('k8shelper.slow')
+
+
+def command_verb(command):
+    tokens = command.split()
+    if not tokens or tokens[0] != 'kubectl':
+        return 'other'
+    for token in tokens[1:]:
+        if not token.startswith('-'):
+            return token if token in KUBECTL_VERBS else 'other'
+    return 'other'
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join('{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                     for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, *labels, value):
+        # 다른 모듈이 세는 값을 조회 시점에 옮겨 올 때 사용
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}')
+        return lines
+
+
+class Gauge(Counter):
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels -> [버킷별 개수..., 합계, 전체 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, *labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        names = self.label_names + ('le',)
+        with self._lock:
+            for labels, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{_format_labels(names, labels + (bound,))} {count}')
+                lines.append(f'{self.name}_bucket{_format_labels(names, labels + ("+Inf",))} {series[-1]}')
+                lines.append(f'{self.name}_sum{_format_labels(self.label_names, labels)} {series[-2]!r}')
+                lines.append(f'{self.name}_count{_format_labels(self.label_names, labels)} {series[-1]}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []  # 조회 시점에 값을 갱신하는 함수
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, fn):
+        self._collectors.append(fn)
+
+    def render(self):
+        for collect in self._collectors:
+            collect()
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+command_spawn_seconds = registry.register(Histogram(
+    'k8shelper_kubectl_spawn_seconds', 'Time to start the kubectl process.', ('verb',)))
+command_run_seconds = registry.register(Histogram(
+    'k8shelper_kubectl_run_seconds', 'Time from process start until kubectl exits.', ('verb', 'backend')))
+command_exit_total = registry.register(Counter(
+    'k8shelper_kubectl_exit_total', 'Finished kubectl commands by exit code.', ('verb', 'backend', 'code')))
+command_stdout_bytes = registry.register(Counter(
+    'k8shelper_kubectl_stdout_bytes_total', 'Bytes read from kubectl stdout.', ('verb', 'backend')))
+command_stderr_bytes = registry.register(Counter(
+    'k8shelper_kubectl_stderr_bytes_total', 'Bytes read from kubectl stderr.', ('verb', 'backend')))
+commands_in_flight = registry.register(Gauge(
+    'k8shelper_kubectl_in_flight', 'kubectl commands currently running.', ('backend',)))
+render_seconds = registry.register(Histogram(
+    'k8shelper_render_seconds', 'Time to turn command output into Dash components.', ('callback',)))
+callback_seconds = registry.register(Histogram(
+    'k8shelper_callback_seconds', 'Total Dash callback latency.', ('callback',)))
+live_processes = registry.register(Gauge(
+    'k8shelper_kubectl_processes', 'Live kubectl child processes, including streams.'))
+cache_requests = registry.register(Counter(
+    'k8shelper_cache_requests_total', 'Cache lookups by cache and result.', ('cache', 'result')))
+
+
+class CommandTimer:
+    # with CommandTimer(command) as timer: ... timer.spawned() ... timer.finish(code, stdout, stderr)
+    def __init__(self, command, backend='kubectl'):
+        self.command = command
+        self.backend = backend
+        self.verb = command_verb(command)
+
+    def __enter__(self):
+        self.started = time.monotonic()
+        commands_in_flight.inc(self.backend)
+        return self
+
+    def spawned(self):
+        command_spawn_seconds.observe(self.verb, value=time.monotonic() - self.started)
+
+    def finish(self, returncode, stdout_bytes, stderr_bytes=0):
+        duration = time.monotonic() - self.started
+        command_run_seconds.observe(self.verb, self.backend, value=duration)
+        command_exit_total.inc(self.verb, self.backend, str(returncode))
+        command_stdout_bytes.inc(self.verb, self.backend, amount=stdout_bytes)
+        command_stderr_bytes.inc(self.verb, self.backend, amount=stderr_bytes)
+        if SLOW_COMMAND_SECONDS and duration >= SLOW_COMMAND_SECONDS:
+            slow_logger.warning('slow command (%.2fs, exit %s, %s): %s', duration, returncode, self.backend,
+                                self.command)
+
+    def __exit__(self, *exc_info):
+        commands_in_flight.dec(self.backend)
+        return False
+
+
+def timed_callback(name):
+    # Dash 콜백 전체 소요 시간 기록
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.monotonic()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                callback_seconds.observe(name, value=time.monotonic() - started)
+        return wrapper
+    return decorator
+
+
+def timed_render(name, fn, *args):
+    started = time.monotonic()
+    try:
+        return fn(*args)
+    finally:
+        render_seconds.observe(name, value=time.monotonic() - started)
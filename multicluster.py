@@ -0,0 +1,173 @@
+import os
+import shlex
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from executor import CommandResult, process_owner, processes, run_command
+from k8s_api import format_columns
+from result_cache import is_cacheable_command, result_cache
+from table_view import parse_columns
+
+# 여러 클러스터 동시 실행 설정 (환경 변수로 조정)
+FANOUT_WORKERS = int(os.environ.get('K8SHELPER_FANOUT_WORKERS', '8'))  # 전체 동시 실행 수
+FANOUT_TIMEOUT_SECONDS = float(os.environ.get('K8SHELPER_FANOUT_TIMEOUT', '20'))  # 클러스터별 제한 시간
+FANOUT_RETENTION_SECONDS = 600
+CONTEXTS_TTL_SECONDS = 60
+
+_pool = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix='fanout')
+
+
+_contexts = (0.0, [])  # (조회 시각, 컨텍스트 목록)
+
+
+def list_contexts(refresh=False):
+    # 페이지를 열 때마다 kubectl 을 실행하지 않도록 잠시 보관
+    global _contexts
+    fetched_at, contexts = _contexts
+    if refresh or time.time() - fetched_at > CONTEXTS_TTL_SECONDS:
+        result = run_command('kubectl config get-contexts -o name', timeout=10)
+        contexts = [line.strip() for line in result.output.splitlines() if line.strip()] \
+            if result.returncode == 0 else []
+        _contexts = (time.time(), contexts)
+    return contexts
+
+
+_current_context = (0.0, '')  # (조회 시각, 현재 컨텍스트)
+
+
+def current_context():
+    global _current_context
+    fetched_at, context = _current_context
+    if time.time() - fetched_at > CONTEXTS_TTL_SECONDS:
+        result = run_command('kubectl config current-context', timeout=10)
+        context = result.output.strip() if result.returncode == 0 else ''
+        _current_context = (time.time(), context)
+    return context
+
+
+def with_context(command, context):
+    # kubectl 바로 뒤에 --context 를 넣어 해당 클러스터로 실행
+    return f'kubectl --context={shlex.quote(context)} {command[len("kubectl "):]}'
+
+
+def is_fanout_command(command):
+    return command.startswith('kubectl ') and '--context' not in command
+
+
+def _run_in_context(command):
+    return run_command(command, timeout=FANOUT_TIMEOUT_SECONDS)
+
+
+class FanOut:
+    def __init__(self, user, command, contexts, on_result=None):
+        self.id = uuid.uuid4().hex
+        self.user = user
+        self.command = command
+        self.contexts = list(contexts)
+        self.results = {}  # context -> CommandResult (완료된 클러스터만)
+        self._parsed = {}  # context -> parse_columns 결과, 폴링마다 큰 출력을 다시 파싱하지 않도록 워커에서 한 번만
+        self.started_at = time.time()
+        self.finished_at = None
+        self._on_result = on_result  # 클러스터별 결과를 받을 함수 (명령어, 결과), 명령어 기록용
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return len(self.results) == len(self.contexts)
+
+    def start(self):
+        for context in self.contexts:
+            _pool.submit(self._run, context)
+
+    def _run(self, context):
+        command = with_context(self.command, context)
+        try:
+            with process_owner(self.id):
+                if is_cacheable_command(command):
+                    result = result_cache.run(command, _run_in_context)
+                else:
+                    result = _run_in_context(command)
+        except Exception as e:  # 한 클러스터의 오류가 나머지 결과를 막지 않도록 결과로 기록
+            result = CommandResult(str(e), 1, time.time() - self.started_at)
+        if self._on_result is not None:
+            self._on_result(command, result)
+        parsed = None
+        if result.returncode == 0 and not result.output.startswith('No resources found'):
+            parsed = parse_columns(result.full_output())
+        with self._lock:
+            self._parsed[context] = parsed
+            self.results[context] = result
+            if self.finished:
+                self.finished_at = time.time()
+
+    def merged(self):
+        # 표 형식 결과는 CLUSTER 열을 앞에 붙여 하나로 합치고, 아니면 None
+        with self._lock:
+            results, tables = dict(self.results), dict(self._parsed)
+        columns, rows = ['CLUSTER'], []
+        for context in self.contexts:
+            result = results.get(context)
+            if result is None or result.returncode != 0:
+                continue
+            if result.output.startswith('No resources found'):
+                continue
+            parsed = tables[context]
+            if parsed is None:
+                return None
+            for column in parsed[0]:
+                if column not in columns:
+                    columns.append(column)
+            rows += [dict(row, CLUSTER=context) for row in parsed[1]]
+        return columns, rows
+
+    def failures(self):
+        with self._lock:
+            return {context: result for context, result in self.results.items() if result.returncode != 0}
+
+    def pending(self):
+        with self._lock:
+            return [context for context in self.contexts if context not in self.results]
+
+    def sections(self):
+        # 표로 합칠 수 없는 출력은 클러스터별로 나눠서 표시
+        with self._lock:
+            results = dict(self.results)
+        return [(context, results[context]) for context in self.contexts
+                if context in results and results[context].returncode == 0]
+
+
+def format_merged(columns, rows):
+    return format_columns(columns, [[row.get(column, '') for column in columns] for row in rows])
+
+
+class FanOutRegistry:
+    def __init__(self):
+        self._fanouts = {}
+        self._lock = threading.Lock()
+
+    def start(self, user, command, contexts, on_result=None):
+        fanout = FanOut(user, command, contexts, on_result)
+        with self._lock:
+            deadline = time.time() - FANOUT_RETENTION_SECONDS
+            for fanout_id in [f.id for f in self._fanouts.values() if f.finished_at and f.finished_at < deadline]:
+                del self._fanouts[fanout_id]
+            self._fanouts[fanout.id] = fanout
+        fanout.start()
+        return fanout.id
+
+    def get(self, fanout_id):
+        with self._lock:
+            return self._fanouts.get(fanout_id)
+
+    def cancel_user(self, user):
+        # 아직 끝나지 않은 클러스터의 kubectl 을 종료 (결과는 취소로 기록됨)
+        with self._lock:
+            running = [fanout for fanout in self._fanouts.values() if fanout.user == user and not fanout.finished]
+        for fanout in running:
+            processes.kill_owner(fanout.id)
+        return len(running)
+
+
+fanouts = FanOutRegistry()
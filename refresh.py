@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+import uuid
+
+from executor import JobRejected, job_queue, process_owner, processes, run_command
+from table_view import parse_columns
+
+# 자동 새로고침 설정 (환경 변수로 조정)
+REFRESH_SECONDS = float(os.environ.get('K8SHELPER_REFRESH_SECONDS', '5'))
+MAX_REFRESH_SESSIONS = int(os.environ.get('K8SHELPER_MAX_REFRESH_SESSIONS', '32'))
+REFRESH_IDLE_SECONDS = 60  # 이 시간 동안 아무도 조회하지 않으면 세션 종료
+REFRESH_POLL_SECONDS = min(1.0, REFRESH_SECONDS)  # 끝난 실행의 변경분을 가져가는 간격
+
+# 시간이 지나면 저절로 바뀌는 열은 값만 갱신하고 변경으로 표시하지 않음
+VOLATILE_COLUMNS = frozenset(['AGE', 'LAST SEEN', 'DURATION'])
+
+
+def snapshot(output):
+    # 표 형식 출력을 (열 목록, 키 -> 셀 튜플) 로 압축, 표가 아니면 None
+    parsed = parse_columns(output)
+    if parsed is None:
+        return None
+    columns, rows = parsed
+    name_column = 'NAME' if 'NAME' in columns else columns[0]
+    cells, seen = {}, {}
+    for row in rows:
+        key = f"{row.get('NAMESPACE', '')}/{row[name_column]}"
+        # events 처럼 이름이 겹치는 행은 순번을 붙여 구분
+        seen[key] = seen.get(key, 0) + 1
+        if seen[key] > 1:
+            key = f'{key}#{seen[key]}'
+        cells[key] = tuple(row[column] for column in columns)
+    return columns, cells
+
+
+def diff(previous, current):
+    # 행 단위 비교: 추가된 행, 삭제된 키, 바뀐 셀만 담은 행
+    columns, cells = current
+    old_cells = previous[1]
+    added = [key for key in cells if key not in old_cells]
+    removed = [key for key in old_cells if key not in cells]
+    changed = []
+    for key, values in cells.items():
+        old_values = old_cells.get(key)
+        if old_values is None or old_values == values:
+            continue
+        row = {'_key': key}
+        marked = []
+        for column, old, new in zip(columns, old_values, values):
+            if old != new:
+                row[column] = new
+                if column not in VOLATILE_COLUMNS:
+                    marked.append(column)
+        row['_changed'] = '|' + '|'.join(marked) + '|' if marked else ''
+        changed.append(row)
+    return added, removed, changed
+
+
+def table_rows(columns, cells, keys, state=''):
+    return [dict(zip(columns, cells[key]), _key=key, _state=state, _changed='') for key in keys]
+
+
+class RefreshSession:
+    def __init__(self, user, command, runner=run_command, client=None):
+        self.id = uuid.uuid4().hex
+        self.user = user
+        self.client = client or user  # 작업 큐의 접속 주소별 동시 실행 상한 단위
+        self.command = command
+        self.runner = runner
+        self.last_read = time.monotonic()
+        self._snapshot = None  # (열 목록, 키 -> 셀 튜플)
+        self._text = None  # 표가 아닌 출력의 마지막 내용
+        self._job_id = None  # 실행 중이거나 결과를 아직 가져가지 않은 작업
+        self._last_run = None
+        self._reset = True
+        self._lock = threading.Lock()
+
+    def _run(self):
+        # 결과 캐시의 TTL 이 새로고침 간격과 겹치면 이전 결과를 다시 받을 수 있어 항상 새로 실행
+        with process_owner(self.id):
+            return self.runner(self.command)
+
+    def refresh(self, reset=False):
+        # 실행은 작업 큐의 워커에서 하고, 폴링은 끝난 결과의 변경분만 가져감 (새 결과가 없으면 None)
+        # Dash 요청 스레드는 kubectl 을 기다리지 않음
+        self.last_read = time.monotonic()
+        with self._lock:
+            self._reset = self._reset or reset
+            job = job_queue.get(self._job_id) if self._job_id else None
+            if job is not None and not job.finished:
+                return None
+            delta = None
+            if job is not None:
+                job_queue.pop(job.id)
+                self._job_id = None
+                delta = self._delta(job)
+            if self._last_run is None or time.monotonic() - self._last_run >= REFRESH_SECONDS:
+                self._last_run = time.monotonic()
+                try:
+                    self._job_id = job_queue.submit(self.client, self.command, self._run)
+                except JobRejected as e:
+                    delta = delta or {'error': str(e), 'at': time.strftime('%H:%M:%S')}
+            return delta
+
+    def _delta(self, job):
+        if job.status == 'cancelled':
+            return None
+        if job.status == 'error':
+            return {'error': job.error, 'at': time.strftime('%H:%M:%S', time.localtime(job.finished_at))}
+        reset, self._reset = self._reset, False
+        result = job.result
+        at = time.strftime('%H:%M:%S', time.localtime(result.fetched_at))
+        if result.returncode != 0:
+            return {'error': result.output, 'at': at}
+
+        # 큰 출력도 앞부분이 아니라 전체 행을 비교
+        output = result.full_output()
+        current = snapshot(output)
+        if current is None:
+            changed = output != self._text
+            self._text, self._snapshot = output, None
+            if not changed and not reset:
+                return {'unchanged': True, 'at': at}
+            return {'text': output, 'at': at}
+
+        previous, self._snapshot, self._text = self._snapshot, current, None
+        columns, cells = current
+        if reset or previous is None or previous[0] != columns:
+            return {'reset': True, 'columns': columns, 'rows': table_rows(columns, cells, cells), 'at': at}
+        added, removed, changed = diff(previous, current)
+        return {'added': table_rows(columns, cells, added, 'added'), 'removed': removed, 'changed': changed,
+                'at': at}
+
+    def stop(self):
+        processes.kill_owner(self.id)
+
+
+class RefreshRegistry:
+    def __init__(self, max_sessions=MAX_REFRESH_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def start(self, user, command, runner=run_command, client=None):
+        with self._lock:
+            now = time.monotonic()
+            for session in list(self._sessions.values()):
+                # 탭(브라우저 세션)당 자동 새로고침은 하나만 유지하고, 오래 조회하지 않은 세션은 정리
+                if session.user == user or now - session.last_read > REFRESH_IDLE_SECONDS:
+                    session.stop()
+                    del self._sessions[session.id]
+            if len(self._sessions) >= self.max_sessions:
+                return None
+            session = RefreshSession(user, command, runner, client)
+            self._sessions[session.id] = session
+            return session.id
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def stop_user(self, user):
+        with self._lock:
+            sessions = [session for session in self._sessions.values() if session.user == user]
+            for session in sessions:
+                del self._sessions[session.id]
+        for session in sessions:
+            session.stop()
+
+
+refreshes = RefreshRegistry()
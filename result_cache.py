@@ -0,0 +1,97 @@
+import os
+import shlex
+import threading
+import time
+from collections import OrderedDict
+
+from executor import process_owner, run_command
+
+# 조회 결과 캐시 설정 (환경 변수로 조정)
+RESULT_TTL_SECONDS = float(os.environ.get('K8SHELPER_RESULT_TTL', '5'))
+MAX_CACHED_RESULTS = int(os.environ.get('K8SHELPER_MAX_CACHED_RESULTS', '256'))
+
+# 클러스터 상태를 바꾸지 않는 조회용 명령어
+READ_ONLY_VERBS = {'get', 'describe', 'top', 'events', 'explain', 'api-resources', 'api-versions',
+                   'cluster-info', 'version'}
+SHELL_METACHARACTERS = set(';|&<>$`\\\n')
+WATCH_FLAGS = {'-w', '--watch', '--watch-only'}
+
+
+def is_cacheable_command(command):
+    # 파이프, 리다이렉션 등 셸 구문이 섞인 명령어는 캐시하지 않음
+    if SHELL_METACHARACTERS & set(command):
+        return False
+    try:
+        tokens = shlex.split(command)
+    except ValueError:
+        return False
+    if len(tokens) < 2 or tokens[0] != 'kubectl' or tokens[1] not in READ_ONLY_VERBS:
+        return False
+    return not any(token in WATCH_FLAGS or token.startswith('--watch') for token in tokens)
+
+
+def normalize_command(command):
+    return ' '.join(shlex.split(command))
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResultCache:
+    def __init__(self, ttl=RESULT_TTL_SECONDS, max_entries=MAX_CACHED_RESULTS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()  # (backend, command) -> CommandResult
+        self._in_flight = {}  # (backend, command) -> _Flight
+        self._lock = threading.Lock()
+
+    def run(self, command, runner=run_command, backend='kubectl'):
+        # TTL 안의 결과는 바로 반환하고, 같은 명령어가 실행 중이면 그 결과를 함께 기다림
+        # 백엔드마다 출력 형식이 조금씩 다르므로 백엔드별로 따로 보관
+        key = (backend, normalize_command(command))
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None and time.time() - result.fetched_at < self.ttl:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return result
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            # 여러 요청이 함께 기다리는 실행이므로 한 사용자의 취소로 종료되지 않게 작업에서 분리
+            with process_owner(None):
+                flight.result = runner(command)
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if flight.result is not None and flight.result.returncode == 0:
+                    self._results[key] = flight.result
+                    self._results.move_to_end(key)
+                    while len(self._results) > self.max_entries:
+                        self._results.popitem(last=False)
+            flight.done.set()
+        return flight.result
+
+
+result_cache = ResultCache()
@@ -0,0 +1,233 @@
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+from executor import CommandResult, JobRejected, job_queue, process_owner, processes, run_command
+from result_cache import is_cacheable_command, result_cache
+
+# 런북 일괄 실행 설정 (환경 변수로 조정)
+MAX_RUNBOOK_STEPS = int(os.environ.get('K8SHELPER_MAX_RUNBOOK_STEPS', '50'))
+RUNBOOK_RETENTION_SECONDS = 600
+RETRY_SECONDS = 1  # 작업 큐 상한에 걸린 단계를 다시 넣어 보는 간격
+
+logger = logging.getLogger(__name__)
+
+# "이름 (after a, b): 명령어" 또는 "이름: 명령어", 이름이 없으면 명령어만
+STEP_PATTERN = re.compile(r'^(?:(?P<name>[\w.-]+)\s*(?:\(\s*after\s+(?P<after>[^)]*)\))?\s*:\s+)?(?P<command>.+)$')
+
+
+class RunbookError(Exception):
+    pass
+
+
+class Step:
+    def __init__(self, name, command, after):
+        self.name = name
+        self.command = command
+        self.after = after  # 먼저 성공해야 하는 단계 이름 목록
+        self.status = 'pending'  # pending -> running -> done / failed, 또는 skipped / cancelled
+        self.result = None
+        self.cached = False
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed', 'skipped', 'cancelled')
+
+
+def parse_runbook(text):
+    # 한 줄에 한 단계, # 으로 시작하는 줄과 빈 줄은 무시
+    steps = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        match = STEP_PATTERN.match(line)
+        name = match.group('name') or f'step-{len(steps) + 1}'
+        after = [dep.strip() for dep in (match.group('after') or '').split(',') if dep.strip()]
+        steps.append(Step(name, match.group('command').strip(), after))
+    if not steps:
+        raise RunbookError('실행할 명령어가 없습니다.')
+    if len(steps) > MAX_RUNBOOK_STEPS:
+        raise RunbookError(f'런북은 최대 {MAX_RUNBOOK_STEPS}단계까지 실행할 수 있습니다.')
+
+    names = {}
+    for step in steps:
+        if step.name in names:
+            raise RunbookError(f'단계 이름이 중복되었습니다: {step.name}')
+        names[step.name] = step
+    for step in steps:
+        unknown = [dep for dep in step.after if dep not in names]
+        if unknown:
+            raise RunbookError(f"{step.name}: 없는 단계를 기다립니다: {', '.join(unknown)}")
+
+    # 순환 의존은 실행 전에 거부 (위상 정렬이 끝까지 안 되면 순환)
+    remaining = {step.name: set(step.after) for step in steps}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps & remaining.keys()]
+        if not ready:
+            raise RunbookError(f"순환 의존이 있습니다: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+    return steps
+
+
+class Runbook:
+    # 의존하는 단계가 모두 성공한 단계부터 작업 큐에서 동시에 실행하고, 끝나는 대로 보고서에 반영
+    # 단일 명령어와 같은 워커 풀과 접속 주소별 동시 실행 상한을 함께 씀
+    def __init__(self, user, steps, runner=run_command, cache=True, on_result=None, backend='kubectl', client=None):
+        self.id = uuid.uuid4().hex
+        self.user = user
+        self.client = client or user  # 작업 큐의 동시 실행 상한 단위 (접속 주소)
+        self.steps = steps
+        self.started_at = time.time()
+        self.finished_at = None
+        self.cancelled = False
+        self._runner = runner
+        self._cache = cache
+        self._backend = backend  # 결과 캐시 키 (백엔드별로 따로 보관)
+        self._on_result = on_result  # 단계별 결과를 받을 함수 (명령어, 결과), 명령어 기록용
+        self._retry_pending = False
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def start(self):
+        self._schedule()
+
+    def _schedule(self):
+        # 실패/취소된 단계에 걸린 단계는 건너뛰고, 준비된 단계는 실행 중으로 바꿔서 작업 큐에 넣음
+        with self._lock:
+            statuses = {step.name: step.status for step in self.steps}
+            changed = True
+            while changed:
+                changed = False
+                for step in self.steps:
+                    if step.status != 'pending':
+                        continue
+                    if self.cancelled:
+                        step.status = 'cancelled'
+                    elif any(statuses[dep] in ('failed', 'skipped', 'cancelled') for dep in step.after):
+                        step.status = 'skipped'
+                    else:
+                        continue
+                    step.finished_at = time.time()
+                    statuses[step.name] = step.status
+                    changed = True
+            ready = [step for step in self.steps
+                     if step.status == 'pending' and all(statuses[dep] == 'done' for dep in step.after)]
+            # 동시에 실행하는 단계는 접속 주소별 상한까지만, 나머지는 앞 단계가 끝나면 다시 스케줄
+            running = sum(1 for step in self.steps if step.status == 'running')
+            ready = ready[:max(0, job_queue.max_jobs_per_user - running)]
+            for step in ready:
+                step.status = 'running'
+                step.started_at = time.time()
+            if all(step.finished for step in self.steps) and self.finished_at is None:
+                self.finished_at = time.time()
+        for i, step in enumerate(ready):
+            # 다음 단계는 작업이 끝나서 상한에서 빠진 뒤에 스케줄
+            try:
+                job_queue.submit(self.client, step.command, self._run, step,
+                                 on_done=lambda job, step=step: self._finish(step, job.result))
+            except JobRejected:  # 같은 주소의 다른 탭이 상한을 쓰는 중이거나 서버가 혼잡함
+                self._defer(ready[i:])
+                break
+
+    def _defer(self, steps):
+        # 상한에 걸린 단계는 실패가 아니라 대기로 되돌리고 자리가 나면 다시 넣음
+        # 이 런북의 다른 단계가 실행 중이면 그 단계가 끝날 때, 아니면 잠시 후 다시 스케줄
+        with self._lock:
+            for step in steps:
+                step.status = 'pending'
+                step.started_at = None
+            if self._retry_pending or any(step.status == 'running' for step in self.steps):
+                return
+            self._retry_pending = True
+        timer = threading.Timer(RETRY_SECONDS, self._retry)
+        timer.daemon = True
+        timer.start()
+
+    def _retry(self):
+        with self._lock:
+            self._retry_pending = False
+        self._schedule()
+
+    def _run(self, step):
+        if self.cancelled:
+            return None
+        try:
+            with process_owner(self.id):
+                # 조회 명령어는 다른 런북/사용자와 같은 실행을 공유 (TTL 캐시, 동시 실행 합치기)
+                if self._cache and is_cacheable_command(step.command):
+                    result = result_cache.run(step.command, self._runner, self._backend)
+                    step.cached = result.fetched_at < step.started_at
+                else:
+                    result = self._runner(step.command)
+        except Exception as e:  # 한 단계의 오류가 나머지 단계를 막지 않도록 결과로 기록
+            result = CommandResult(str(e), 1, time.time() - step.started_at)
+        return result
+
+    def _finish(self, step, result):
+        with self._lock:
+            step.result = result
+            step.finished_at = time.time()
+            if self.cancelled or result is None:
+                step.status = 'cancelled'
+            else:
+                step.status = 'done' if result.returncode == 0 else 'failed'
+        try:
+            if self._on_result is not None and result is not None:
+                self._on_result(step.command, result)
+        except Exception:  # 기록 실패로 단계가 실행 중에 멈추지 않도록
+            logger.exception('런북 단계 결과 기록 실패: %s', step.command)
+        finally:
+            self._schedule()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+        processes.kill_owner(self.id)
+        self._schedule()
+
+    def counts(self):
+        with self._lock:
+            counts = {}
+            for step in self.steps:
+                counts[step.status] = counts.get(step.status, 0) + 1
+            return counts
+
+
+class RunbookRegistry:
+    def __init__(self):
+        self._runbooks = {}
+        self._lock = threading.Lock()
+
+    def start(self, user, steps, runner=run_command, cache=True, on_result=None, backend='kubectl', client=None):
+        runbook = Runbook(user, steps, runner, cache, on_result, backend, client)
+        with self._lock:
+            deadline = time.time() - RUNBOOK_RETENTION_SECONDS
+            for runbook_id in [r.id for r in self._runbooks.values() if r.finished_at and r.finished_at < deadline]:
+                del self._runbooks[runbook_id]
+            self._runbooks[runbook.id] = runbook
+        runbook.start()
+        return runbook.id
+
+    def get(self, runbook_id):
+        with self._lock:
+            return self._runbooks.get(runbook_id)
+
+    def cancel_user(self, user):
+        with self._lock:
+            running = [runbook for runbook in self._runbooks.values() if runbook.user == user and not runbook.finished]
+        for runbook in running:
+            runbook.cancel()
+        return len(running)
+
+
+runbooks = RunbookRegistry()
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import re
+import shlex
+import tempfile
+import threading
+from urllib.parse import parse_qs, urlsplit
+
+from executor import run_command
+from help_cache import CACHE_DIR, kubectl_client_version
+from k8s_api import ApiError, ApiUnsupported, api_backend
+
+MAX_SEARCH_RESULTS = 50
+MAX_DEPTH = 15  # CRD 의 JSONSchemaProps 처럼 자기 자신을 참조하는 스키마가 끝없이 펼쳐지지 않게 제한
+
+# kubectl explain --recursive 의 "  containers	<[]Container> -required-" 형태 줄
+EXPLAIN_FIELD = re.compile(r'^(\s+)([\w$@.-]+)\s+<([^>]*)>(\s+-required-)?')
+
+
+class SchemaUnavailable(Exception):
+    pass
+
+
+def fetch_raw(path):
+    try:
+        return api_backend.get_raw(path)
+    except (ApiError, OSError) as e:
+        raise SchemaUnavailable(e.message if isinstance(e, ApiError) else str(e))
+
+
+def resolve_ref(schemas, schema):
+    # $ref 또는 allOf: [{$ref}] 를 따라가서 (스키마, 참조 이름) 반환
+    ref = None
+    while True:
+        if '$ref' in schema:
+            ref = schema['$ref'].rsplit('/', 1)[-1]
+            schema = schemas.get(ref, {})
+        elif len(schema.get('allOf') or []) == 1 and not schema.get('properties'):
+            schema = schema['allOf'][0]
+        else:
+            return schema, ref
+
+
+def type_name(schemas, schema):
+    # kubectl explain 과 같은 표기: string, []Container, map[string]string, ObjectMeta
+    resolved, ref = resolve_ref(schemas, schema)
+    if resolved.get('type') == 'array':
+        return '[]' + type_name(schemas, resolved.get('items') or {})
+    if resolved.get('type') == 'object' and isinstance(resolved.get('additionalProperties'), dict):
+        return 'map[string]' + type_name(schemas, resolved['additionalProperties'])
+    if ref is not None and (resolved.get('properties') or resolved.get('type') in (None, 'object')):
+        return ref.rsplit('.', 1)[-1]
+    return resolved.get('type') or 'Object'
+
+
+def openapi_fields(schemas, root):
+    fields = []
+
+    def walk(schema, prefix, stack):
+        schema, _ = resolve_ref(schemas, schema)
+        required = set(schema.get('required') or [])
+        for name, prop in (schema.get('properties') or {}).items():
+            resolved, ref = resolve_ref(schemas, prop)
+            fields.append({'path': prefix + name, 'type': type_name(schemas, prop),
+                           'description': prop.get('description') or resolved.get('description') or '',
+                           'required': name in required})
+            # 배열/맵이면 원소 스키마를 펼침
+            while resolved.get('type') == 'array' or isinstance(resolved.get('additionalProperties'), dict):
+                inner = resolved.get('items') if resolved.get('type') == 'array' else resolved['additionalProperties']
+                resolved, ref = resolve_ref(schemas, inner or {})
+            if resolved.get('properties') and ref not in stack and prefix.count('.') < MAX_DEPTH:
+                walk(resolved, f'{prefix}{name}.', stack | {ref})
+
+    walk(root, '', frozenset())
+    return fields
+
+
+def explain_fields(output):
+    # kubectl explain --recursive 출력은 들여쓰기로 단계를 구분 (설명은 없음)
+    fields, stack, in_fields = [], [], False
+    for line in output.splitlines():
+        if line.startswith('FIELDS:'):
+            in_fields = True
+            continue
+        match = EXPLAIN_FIELD.match(line) if in_fields else None
+        if not match:
+            continue
+        indent = len(match.group(1))
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        path = '.'.join([name for _, name in stack] + [match.group(2)])
+        stack.append((indent, match.group(2)))
+        fields.append({'path': path, 'type': match.group(3), 'description': '', 'required': bool(match.group(4))})
+    return fields
+
+
+class SchemaTree:
+    # 필드 경로 -> 필드, 부모 경로 -> 자식 경로 목록, 검색용 소문자 문자열
+    def __init__(self, data):
+        self.group = data['group']
+        self.version = data['version']
+        self.kind = data['kind']
+        self.source = data['source']
+        self.fields = {field['path']: field for field in data['fields']}
+        self.children = {}
+        for path in self.fields:
+            parent = path.rpartition('.')[0]
+            self.children.setdefault(parent, []).append(path)
+        self._haystack = [(path, f"{path}\n{field['description']}".lower()) for path, field in self.fields.items()]
+
+    def list(self, path=''):
+        return [dict(self.fields[child], expandable=child in self.children) for child in self.children.get(path, [])]
+
+    def search(self, query, limit=MAX_SEARCH_RESULTS):
+        # 모든 단어가 경로나 설명에 들어 있는 필드, 경로에서 찾은 것을 먼저
+        words = query.lower().split()
+        if not words:
+            return []
+        in_path, in_description = [], []
+        for path, text in self._haystack:
+            if all(word in text for word in words):
+                (in_path if all(word in path.lower() for word in words) else in_description).append(path)
+                if len(in_path) >= limit:
+                    break
+        return [dict(self.fields[path], expandable=path in self.children)
+                for path in (in_path + in_description)[:limit]]
+
+
+class SchemaStore:
+    # 리소스 종류/API 버전마다 스키마를 한 번만 받아서 디스크와 메모리에 보관
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._trees = {}  # 리소스 이름(입력한 그대로) -> SchemaTree
+        self._loading = {}  # 리소스 이름 -> 받는 중인 동안의 잠금
+        self._lock = threading.Lock()
+
+    def get(self, resource):
+        resource = resource.strip().lower()
+        tree = self._trees.get(resource)
+        if tree is not None:
+            return tree
+        # 같은 리소스는 한 번만 받고, 다른 리소스 조회는 OpenAPI 문서를 받는 동안에도 막지 않음
+        with self._lock:
+            lock = self._loading.setdefault(resource, threading.Lock())
+        with lock:
+            if resource not in self._trees:
+                self._trees[resource] = self._load(resource)
+            with self._lock:
+                self._loading.pop(resource, None)
+            return self._trees[resource]
+
+    def _resolve(self, resource):
+        # (group, version, kind): API 백엔드의 discovery 또는 kubectl explain 의 머리글
+        try:
+            found = api_backend.client.resolve(resource)
+            return found.group, found.version, found.kind
+        except (ApiError, ApiUnsupported, OSError):
+            pass
+        result = run_command(f'kubectl explain {shlex.quote(resource)}', timeout=30)
+        if result.returncode != 0:
+            raise SchemaUnavailable(result.output.strip())
+        header = dict(re.findall(r'^(GROUP|KIND|VERSION):\s*(\S+)', result.output, re.MULTILINE))
+        group, _, version = header.get('VERSION', '').rpartition('/')  # 예전 kubectl 은 VERSION: apps/v1
+        return header.get('GROUP', group), version, header.get('KIND', resource)
+
+    def _load(self, resource):
+        group, version, kind = self._resolve(resource)
+        gv_path = f'apis/{group}/{version}' if group else f'api/{version}'
+        try:
+            index = json.loads(fetch_raw('/openapi/v3'))['paths']
+            url = index[gv_path]['serverRelativeURL']
+            # 문서 해시가 URL 에 들어 있어 CRD 나 클러스터가 바뀌면 다른 캐시 파일을 씀
+            digest = parse_qs(urlsplit(url).query).get('hash', [''])[0] or hashlib.sha1(url.encode()).hexdigest()
+        except (SchemaUnavailable, ValueError, KeyError):
+            url, digest = None, f'explain-{kubectl_client_version()}'
+        path = os.path.join(self.cache_dir, 'schema-' + re.sub(r'[^\w.-]', '_', f'{gv_path}-{kind}-{digest[:16]}.json'))
+        try:
+            with open(path, encoding='utf-8') as f:
+                return SchemaTree(json.load(f))
+        except (OSError, ValueError, KeyError):
+            pass
+
+        if url is not None:
+            try:
+                schemas = json.loads(fetch_raw(url))['components']['schemas']
+            except (ValueError, KeyError, TypeError) as e:
+                raise SchemaUnavailable(f'{gv_path} OpenAPI 문서를 해석하지 못했습니다: {e}')
+            root = next((schema for schema in schemas.values()
+                         if {'group': group, 'version': version, 'kind': kind}
+                         in schema.get('x-kubernetes-group-version-kind', [])), None)
+            if root is None:
+                raise SchemaUnavailable(f'{gv_path} 문서에 {kind} 스키마가 없습니다.')
+            data = {'fields': openapi_fields(schemas, root), 'source': 'openapi'}
+        else:
+            # OpenAPI v3 를 제공하지 않는 클러스터는 explain --recursive (필드 설명 없음)
+            api_version = f'{group}/{version}' if group else version
+            result = run_command(f'kubectl explain {shlex.quote(resource)} --recursive '
+                                 f'--api-version={shlex.quote(api_version)}', timeout=60)
+            if result.returncode != 0:
+                raise SchemaUnavailable(result.output.strip())
+            data = {'fields': explain_fields(result.full_output()), 'source': 'explain'}
+        data.update(group=group, version=version, kind=kind)
+        self._save(path, data)
+        return SchemaTree(data)
+
+    def _save(self, path, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+schemas = SchemaStore()
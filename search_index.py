@@ -0,0 +1,315 @@
+import bisect
+import heapq
+import json
+import logging
+import os
+import re
+import shlex
+import sys
+import threading
+import time
+
+from executor import run_command
+from informer import Informer
+from k8s_api import ApiError, ApiUnsupported, api_backend
+from snapshot import SnapshotError, discover_resources
+
+# 클러스터 전체 검색 색인 설정 (환경 변수로 조정, 0 이면 색인 안 함)
+MAX_SEARCH_OBJECTS = int(os.environ.get('K8SHELPER_MAX_SEARCH_OBJECTS', '200000'))  # 색인할 객체 수 상한
+# 색인에서 빼는 리소스 (자주 바뀌기만 하고 찾을 일이 적은 종류, 시크릿)
+SEARCH_EXCLUDE = frozenset(name.strip() for name in
+                           os.environ.get('K8SHELPER_SEARCH_EXCLUDE', 'events,leases,secrets').split(',')
+                           if name.strip())
+# API 서버에 직접 연결할 수 없을 때 kubectl 로 목록을 다시 받는 주기
+SEARCH_RESYNC_SECONDS = float(os.environ.get('K8SHELPER_SEARCH_RESYNC_SECONDS', '300'))
+MAX_SEARCH_RESULTS = 200
+MAX_INDEXED_VALUE = 256  # 이보다 긴 어노테이션 값(last-applied-configuration 등)은 키만 색인
+MAX_BACKOFF_SECONDS = 60
+
+# 이름, 이미지 등을 단어로 나누는 구분자
+WORD_SEPARATORS = re.compile(r'[-_.:/@]+')
+FIELD_PREFIXES = {'kind': 'kind:', 'ns': 'ns:', 'namespace': 'ns:', 'name': 'name:', 'image': 'image:',
+                  'has': 'has:'}
+
+logger = logging.getLogger(__name__)
+
+
+def words(value):
+    return [word for word in WORD_SEPARATORS.split(value.lower()) if word]
+
+
+def pod_spec(obj):
+    # 파드, 워크로드(template), 크론잡(jobTemplate) 의 파드 스펙
+    spec = obj.get('spec') or {}
+    if 'containers' in spec:
+        return spec
+    template = spec.get('template') or ((spec.get('jobTemplate') or {}).get('spec') or {}).get('template') or {}
+    return template.get('spec') if isinstance(template, dict) else None
+
+
+def images(obj):
+    spec = pod_spec(obj) or {}
+    found = []
+    for container in (spec.get('initContainers') or []) + (spec.get('containers') or []):
+        image = container.get('image') if isinstance(container, dict) else None
+        if image and image not in found:
+            found.append(image)
+    return found
+
+
+def image_terms(image):
+    # "registry.io/team/payments:1.2" -> 전체, 태그 없는 저장소, 마지막 이름 (image:payments 로도 찾도록)
+    image = image.lower()
+    repository = image.split('@', 1)[0]
+    if ':' in repository.rsplit('/', 1)[-1]:
+        repository = repository.rsplit(':', 1)[0]
+    return {'image:' + image, 'image:' + repository, 'image:' + repository.rsplit('/', 1)[-1]}
+
+
+def object_terms(resource_name, obj):
+    # 검색어와 같은 형태의 단어 집합: kind:pods, ns:prod, name:api-1, app=payments, has:app, image:nginx, 맨 단어
+    metadata = obj.get('metadata') or {}
+    name, namespace = metadata.get('name', ''), metadata.get('namespace', '')
+    terms = {'kind:' + resource_name, 'name:' + name.lower()}
+    terms.update(words(name))
+    if namespace:
+        terms.add('ns:' + namespace.lower())
+        terms.update(words(namespace))
+    for key, value in (metadata.get('labels') or {}).items():
+        terms.update(('has:' + key.lower(), f'{key}={value}'.lower()))
+        terms.update(words(value))
+    for key, value in (metadata.get('annotations') or {}).items():
+        terms.add('has:' + key.lower())
+        if value is not None and len(value) <= MAX_INDEXED_VALUE:
+            terms.add(f'{key}={value}'.lower())
+    for image in images(obj):
+        terms.update(image_terms(image))
+        terms.update(words(image.split('@', 1)[0]))
+    return frozenset(sys.intern(term) for term in terms)
+
+
+class SearchIndex:
+    # 단어 -> 객체 번호 집합 (역색인), 객체는 watch 이벤트마다 바뀐 단어만 고침
+    def __init__(self, max_objects=MAX_SEARCH_OBJECTS):
+        self.max_objects = max_objects
+        self.source = None  # 'api' 또는 'kubectl'
+        self.last_error = None
+        self.dropped = 0  # 상한 때문에 색인하지 못한 객체 수
+        self._ids = {}  # (리소스, 네임스페이스, 이름) -> 객체 번호
+        self._docs = {}  # 객체 번호 -> (리소스, 네임스페이스, 이름, 단어 집합, 레이블, 이미지)
+        self._postings = {}  # 단어 -> 객체 번호 집합
+        self._vocabulary = []  # 접두어 검색용으로 정렬한 단어 목록, 새 단어가 생기면 검색할 때 다시 만듦
+        self._vocabulary_stale = False
+        self._next_id = 0
+        self._aliases = {}  # kind:po, kind:pod -> kind:pods
+        self._lock = threading.Lock()
+        self._started = False
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add_resource(self, resource):
+        with self._lock:
+            for alias in [resource.name, resource.kind.lower()] + resource.short_names:
+                self._aliases.setdefault(f'kind:{alias.lower()}', f'kind:{resource.name}')
+
+    @staticmethod
+    def _prepare(resource_name, obj):
+        # 잠금 밖에서 단어와 화면에 보일 레이블/이미지를 미리 만듦
+        metadata = obj.get('metadata') or {}
+        labels = ','.join(f'{k}={v}' for k, v in (metadata.get('labels') or {}).items())
+        return ((resource_name, metadata.get('namespace', ''), metadata.get('name', '')),
+                object_terms(resource_name, obj), labels, ', '.join(images(obj)))
+
+    def update(self, resource_name, obj):
+        item = self._prepare(resource_name, obj)
+        with self._lock:
+            self._update(*item)
+
+    def _update(self, key, terms, labels, image_list):
+        doc_id = self._ids.get(key)
+        old_terms = frozenset()
+        if doc_id is None:
+            if len(self._docs) >= self.max_objects:
+                self.dropped += 1
+                return
+            doc_id = self._ids[key] = self._next_id
+            self._next_id += 1
+        else:
+            old_terms = self._docs[doc_id][3]
+        self._docs[doc_id] = key + (terms, labels, image_list)
+        # 상태만 바뀐 MODIFIED 이벤트는 단어가 그대로라 색인을 건드리지 않음
+        for term in old_terms - terms:
+            postings = self._postings[term]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[term]
+        for term in terms - old_terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = set()
+                self._vocabulary_stale = True
+            postings.add(doc_id)
+
+    def remove(self, resource_name, obj):
+        metadata = obj.get('metadata') or {}
+        with self._lock:
+            self._remove((resource_name, metadata.get('namespace', ''), metadata.get('name', '')))
+
+    def _remove(self, key):
+        doc_id = self._ids.pop(key, None)
+        if doc_id is None:
+            return
+        for term in self._docs.pop(doc_id)[3]:
+            postings = self._postings[term]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[term]
+
+    def replace(self, resource_name, objects):
+        # 목록을 다시 받으면 그 종류에서 사라진 객체만 빼고 나머지는 update 와 같이 비교해서 반영
+        prepared = [self._prepare(resource_name, obj) for obj in objects]
+        keys = {item[0] for item in prepared}
+        with self._lock:
+            for key in [key for key in self._ids if key[0] == resource_name and key not in keys]:
+                self._remove(key)
+            for item in prepared:
+                self._update(*item)
+
+    def _expand(self, term, prefix):
+        # 맨 단어와 name: 은 접두어로도 찾음 (pay -> payments, payments-api)
+        if not prefix:
+            return self._postings.get(term, set())
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_stale = False
+        if ':' in term:
+            return self._prefix(term)
+        # 맨 검색어는 단어 또는 이름 앞부분 (app-3 처럼 구분자가 들어 있어도 찾도록)
+        return self._prefix(term, bare=True) | self._prefix('name:' + term)
+
+    def _prefix(self, term, bare=False):
+        matched = set()
+        for index in range(bisect.bisect_left(self._vocabulary, term), len(self._vocabulary)):
+            vocabulary_term = self._vocabulary[index]
+            if not vocabulary_term.startswith(term):
+                break
+            if bare and ('=' in vocabulary_term or ':' in vocabulary_term):
+                continue  # 맨 단어가 app=payments 같은 필드 단어에 걸리지 않게
+            matched |= self._postings.get(vocabulary_term, set())
+        return matched
+
+    def _parse_term(self, token):
+        # 검색어 하나 -> (색인 단어, 접두어 검색 여부)
+        token = token.lower()
+        field, sep, value = token.partition(':')
+        if sep and field in FIELD_PREFIXES and value:
+            term = FIELD_PREFIXES[field] + value
+            if field == 'kind':
+                term = self._aliases.get(term, term)
+            return term, field == 'name'
+        if '=' in token:
+            return token, False
+        return token, True
+
+    def search(self, query, limit=MAX_SEARCH_RESULTS):
+        # 모든 검색어에 맞는 객체 (AND), "-검색어" 는 제외, 결과는 (전체 개수, 종류/네임스페이스/이름 순 목록)
+        try:
+            tokens = shlex.split(query)
+        except ValueError:
+            tokens = query.split()
+        include = [self._parse_term(token) for token in tokens if not token.startswith('-') or len(token) == 1]
+        exclude = [self._parse_term(token[1:]) for token in tokens if token.startswith('-') and len(token) > 1]
+        if not include:
+            return 0, []
+        with self._lock:
+            sets = sorted((self._expand(*term) for term in include), key=len)
+            matched = set(sets[0])
+            for other in sets[1:]:
+                if not matched:
+                    break
+                matched &= other
+            for term in exclude:
+                matched -= self._expand(*term)
+            docs = heapq.nsmallest(limit, (self._docs[doc_id] for doc_id in matched), key=lambda doc: doc[:3])
+        return len(matched), docs
+
+    def rows(self, query, limit=MAX_SEARCH_RESULTS):
+        total, docs = self.search(query, limit)
+        return total, [{'KIND': resource_name, 'NAMESPACE': namespace, 'NAME': name, 'LABELS': labels,
+                        'IMAGES': image_list} for resource_name, namespace, name, _, labels, image_list in docs]
+
+    def start(self):
+        if self.max_objects <= 0 or self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._start, name='search-index', daemon=True).start()
+
+    def _resources(self):
+        # 같은 이름이 여러 그룹에 있으면 (events, events.k8s.io) 먼저 나온 core 그룹만
+        seen, resources = set(), []
+        for resource in discover_resources():
+            if resource.name in seen or resource.name in SEARCH_EXCLUDE or not resource.supports('list'):
+                continue
+            seen.add(resource.name)
+            resources.append(resource)
+            self.add_resource(resource)
+        return resources
+
+    def _start(self):
+        # API 서버에 직접 연결할 수 있으면 종류마다 watch, 아니면 주기적으로 kubectl get -o json
+        backoff = 1
+        while True:
+            try:
+                api_backend.client.resource_list()  # exec 인증 등 API 백엔드를 못 쓰면 ApiUnsupported
+                for resource in self._resources():
+                    if resource.supports('watch'):
+                        SearchInformer(resource, self).start()
+                self.source = 'api'
+                return
+            except ApiUnsupported:
+                break
+            except (ApiError, OSError, ValueError, SnapshotError) as e:
+                self.last_error = str(e)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+        self.source = 'kubectl'
+        while True:
+            try:
+                resources = self._resources()
+            except SnapshotError as e:
+                self.last_error = str(e)
+                resources = []
+            for resource in resources:
+                self._list_kubectl(resource)
+            time.sleep(SEARCH_RESYNC_SECONDS)
+
+    def _list_kubectl(self, resource):
+        name = f'{resource.name}.{resource.group}' if resource.group else resource.name
+        result = run_command(f'kubectl get {shlex.quote(name)} -A -o json', timeout=120)
+        if result.returncode != 0:
+            logger.debug('search index: %s 목록 조회 실패: %s', name, result.output)
+            return
+        try:
+            self.replace(resource.name, json.loads(result.full_output()).get('items', []))
+        except (OSError, ValueError) as e:
+            self.last_error = f'{name}: {e}'
+
+
+class SearchInformer(Informer):
+    # 객체는 저장하지 않고 받는 대로 색인에만 반영
+    def __init__(self, resource, index):
+        super().__init__(resource)
+        self.index = index
+
+    def _replace(self, objects):
+        self.index.replace(self.resource.name, objects)
+
+    def _apply(self, event_type, obj):
+        if event_type in ('ADDED', 'MODIFIED'):
+            self.index.update(self.resource.name, obj)
+        elif event_type == 'DELETED':
+            self.index.remove(self.resource.name, obj)
+
+
+search_index = SearchIndex()
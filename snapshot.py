@@ -0,0 +1,518 @@
+import json
+import os
+import re
+import shlex
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from executor import CommandResult, run_command
+from help_cache import CACHE_DIR
+from informer import PRINTERS, generic_row, human_duration, kubectl_resources
+from k8s_api import ApiError, ApiUnsupported, ResourceType, api_backend, format_columns, parse_args
+
+# 스냅샷 설정 (환경 변수로 조정)
+SNAPSHOT_DIR = os.environ.get('K8SHELPER_SNAPSHOT_DIR') or os.path.join(CACHE_DIR, 'snapshots')
+# 기본으로 빼는 리소스 (시크릿 값이 디스크에 남지 않도록)
+SNAPSHOT_EXCLUDE = frozenset(name.strip() for name in
+                             os.environ.get('K8SHELPER_SNAPSHOT_EXCLUDE', 'secrets').split(',') if name.strip())
+SNAPSHOT_LOG_LINES = int(os.environ.get('K8SHELPER_SNAPSHOT_LOG_LINES', '200'))  # 컨테이너마다 남길 로그 줄 수
+SNAPSHOT_MAX_LOG_PODS = int(os.environ.get('K8SHELPER_SNAPSHOT_MAX_LOG_PODS', '500'))
+MAX_SNAPSHOTS = int(os.environ.get('K8SHELPER_MAX_SNAPSHOTS', '10'))  # 오래된 스냅샷부터 삭제
+SNAPSHOT_WORKERS = 4
+PAGE_SIZE = 500
+
+# 스냅샷에서 실행할 수 있는 읽기 전용 명령어
+SNAPSHOT_VERBS = ('get', 'describe', 'events', 'logs')
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE kinds (name TEXT PRIMARY KEY, grp TEXT, version TEXT, kind TEXT, namespaced INTEGER,
+                    short_names TEXT, headers TEXT);
+CREATE TABLE objects (kind TEXT, namespace TEXT, name TEXT, created REAL, labels TEXT, cells TEXT, data BLOB,
+                      PRIMARY KEY (kind, namespace, name)) WITHOUT ROWID;
+CREATE TABLE logs (namespace TEXT, pod TEXT, container TEXT, data BLOB,
+                   PRIMARY KEY (namespace, pod, container)) WITHOUT ROWID;
+"""
+EVENT_HEADERS = ['LAST SEEN', 'TYPE', 'REASON', 'OBJECT', 'MESSAGE']
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def parse_time(value):
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def event_seen(obj):
+    return parse_time(obj.get('lastTimestamp') or obj.get('eventTime')
+                      or (obj.get('metadata') or {}).get('creationTimestamp'))
+
+
+def event_row(obj, now):
+    involved = obj.get('involvedObject') or obj.get('regarding') or {}
+    return [human_duration(now - event_seen(obj)), obj.get('type', ''), obj.get('reason', ''),
+            f"{involved.get('kind', '').lower()}/{involved.get('name', '')}",
+            ' '.join((obj.get('message') or obj.get('note') or '').split())]
+
+
+def printer(resource_name):
+    if resource_name == 'events':
+        return EVENT_HEADERS, event_row
+    return PRINTERS.get(resource_name, (['NAME', 'AGE'], generic_row))
+
+
+def match_selector(labels, selector):
+    # 등호 기반 셀렉터만 지원: a=b, a==b, a!=b, a, !a
+    for term in filter(None, (term.strip() for term in selector.split(','))):
+        if '!=' in term:
+            key, value = term.split('!=', 1)
+            if labels.get(key.strip()) == value.strip():
+                return False
+        elif '=' in term:
+            key, value = term.replace('==', '=').split('=', 1)
+            if labels.get(key.strip()) != value.strip():
+                return False
+        elif term.startswith('!'):
+            if term[1:] in labels:
+                return False
+        elif ' ' in term:
+            raise SnapshotError(f'스냅샷에서는 등호 기반 셀렉터만 지원합니다: {term}')
+        elif term not in labels:
+            return False
+    return True
+
+
+def describe_value(value, indent):
+    # kubectl describe 와 비슷하게 중첩 구조를 "Key:  값" 형태로 펼침
+    pad = '  ' * indent
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            label = key[:1].upper() + key[1:]
+            if isinstance(item, (dict, list)) and item:
+                lines.append(f'{pad}{label}:')
+                lines += describe_value(item, indent + 1)
+            else:
+                lines.append(f"{pad}{label}:  {'<none>' if item in (None, '', [], {}) else item}")
+        return lines
+    lines = []
+    for item in value:
+        if isinstance(item, (dict, list)):
+            nested = describe_value(item, indent + 1)
+            lines.append(f'{pad}- ' + nested[0].lstrip() if nested else f'{pad}-')
+            lines += nested[1:]
+        else:
+            lines.append(f'{pad}- {item}')
+    return lines
+
+
+def describe_object(obj, events):
+    metadata = obj.get('metadata') or {}
+    lines = [f"Name:         {metadata.get('name', '')}"]
+    if metadata.get('namespace'):
+        lines.append(f"Namespace:    {metadata['namespace']}")
+    for title, values in (('Labels', metadata.get('labels')), ('Annotations', metadata.get('annotations'))):
+        pairs = [f'{key}={value}' for key, value in sorted((values or {}).items())] or ['<none>']
+        lines.append(f'{title + ":":<14}{pairs[0]}')
+        lines += [' ' * 14 + pair for pair in pairs[1:]]
+    if metadata.get('creationTimestamp'):
+        lines.append(f"Created:      {metadata['creationTimestamp']}")
+    owners = metadata.get('ownerReferences') or []
+    if owners:
+        lines.append('Controlled By:  ' + ', '.join(f"{owner['kind']}/{owner['name']}" for owner in owners))
+    for key in obj:
+        if key not in ('apiVersion', 'kind', 'metadata') and obj[key]:
+            lines += describe_value({key: obj[key]}, 0)
+    if events:
+        lines.append('Events:')
+        lines.append(format_columns(['  TYPE', 'REASON', 'AGE', 'MESSAGE'],
+                                    [['  ' + cells[1], cells[2], cells[0], cells[4]] for cells in events]))
+    else:
+        lines.append('Events:       <none>')
+    return '\n'.join(lines)
+
+
+def discover_resources():
+    # 목록 조회가 되는 모든 리소스 종류: API 백엔드의 discovery 또는 kubectl api-resources -o wide
+    try:
+        return api_backend.client.resource_list()
+    except ApiUnsupported:
+        pass
+    try:
+        return kubectl_resources()
+    except ValueError as e:
+        raise SnapshotError(str(e))
+
+
+class SnapshotWriter:
+    # 리소스 종류별로 페이지 단위로 받아서 바로 SQLite 파일에 압축해서 기록
+    def __init__(self, path):
+        self.path = path
+        self.captured_at = time.time()
+        self.objects = 0
+        self.done_kinds = 0
+        self.total_kinds = 0
+        self.phase = '리소스 종류 확인'
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def capture(self):
+        resources = [resource for resource in discover_resources()
+                     if resource.name not in SNAPSHOT_EXCLUDE and '/' not in resource.name and resource.supports('list')]
+        # 같은 리소스가 여러 그룹에 있으면 (events, events.k8s.io) 먼저 나온 것만
+        seen, unique = set(), []
+        for resource in resources:
+            if resource.name not in seen:
+                seen.add(resource.name)
+                unique.append(resource)
+        self.total_kinds = len(unique)
+        self.phase = '리소스 수집'
+        with self._lock:
+            self._db.executemany('INSERT INTO kinds VALUES (?, ?, ?, ?, ?, ?, ?)', [
+                (r.name, r.group, r.version, r.kind, int(r.namespaced), ','.join(r.short_names),
+                 json.dumps(printer(r.name)[0])) for r in unique])
+        with ThreadPoolExecutor(SNAPSHOT_WORKERS) as pool:
+            list(pool.map(self._capture_kind, unique))
+        self.phase = '로그 수집'
+        self._capture_logs()
+        self._write_meta()
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def _capture_kind(self, resource):
+        headers, row = printer(resource.name)
+        params = {'limit': str(PAGE_SIZE)}
+        while True:
+            try:
+                payload = json.loads(api_backend.get_raw(resource.path(), params))
+            except (ApiError, OSError, ValueError):
+                break  # 권한이 없거나 조회할 수 없는 종류는 건너뜀
+            rows = []
+            for obj in payload.get('items', []):
+                metadata = obj.get('metadata') or {}
+                if resource.name == 'events':
+                    created = event_seen(obj)
+                else:
+                    created = parse_time(metadata.get('creationTimestamp'))
+                rows.append((resource.name, metadata.get('namespace', ''), metadata.get('name', ''), created,
+                             json.dumps(metadata.get('labels') or {}), json.dumps(row(obj, self.captured_at)),
+                             zlib.compress(json.dumps(obj, separators=(',', ':')).encode('utf-8'))))
+            with self._lock:
+                self._db.executemany('INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+                self.objects += len(rows)
+            params['continue'] = (payload.get('metadata') or {}).get('continue')
+            if not params['continue']:
+                break
+        self.done_kinds += 1
+
+    def _capture_logs(self):
+        # 실행 중인 파드의 최근 로그 (파드 수 상한까지)
+        with self._lock:
+            pods = self._db.execute("SELECT namespace, name, data FROM objects WHERE kind = 'pods' LIMIT ?",
+                                    (SNAPSHOT_MAX_LOG_PODS,)).fetchall()
+        targets = []
+        for namespace, name, data in pods:
+            obj = json.loads(zlib.decompress(data))
+            if (obj.get('status') or {}).get('phase') != 'Running':
+                continue
+            containers = (obj.get('spec') or {}).get('containers', [])
+            targets += [(namespace, name, container['name']) for container in containers]
+
+        def fetch(target):
+            namespace, pod, container = target
+            command = f'kubectl logs {shlex.quote(pod)} -c {shlex.quote(container)} -n {shlex.quote(namespace)} ' \
+                      f'--tail={SNAPSHOT_LOG_LINES}'
+            result = api_backend.run(command)
+            if result.returncode == 0:
+                with self._lock:
+                    self._db.execute('INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?)',
+                                     (namespace, pod, container, zlib.compress(result.full_output().encode('utf-8'))))
+
+        with ThreadPoolExecutor(SNAPSHOT_WORKERS) as pool:
+            list(pool.map(fetch, targets))
+
+    def _write_meta(self):
+        context = run_command('kubectl config current-context', timeout=10)
+        try:
+            namespace = api_backend.client.config.namespace
+        except ApiUnsupported:
+            namespace = run_command("kubectl config view --minify -o 'jsonpath={..namespace}'", timeout=10).output
+        meta = {'captured_at': str(self.captured_at), 'objects': str(self.objects),
+                'context': context.output.strip() if context.returncode == 0 else '',
+                'namespace': namespace.strip() or 'default'}
+        with self._lock:
+            self._db.executemany('INSERT INTO meta VALUES (?, ?)', meta.items())
+
+
+class Snapshot:
+    # 읽기 전용으로 열어서 필요한 행만 조회 (전체를 메모리에 올리지 않음)
+    def __init__(self, path):
+        self.path = path
+        db = self._connect()
+        try:
+            self.meta = dict(db.execute('SELECT key, value FROM meta'))
+            self._kinds = {}
+            for name, group, version, kind, namespaced, short_names, headers in db.execute('SELECT * FROM kinds'):
+                resource = ResourceType(group, version, name, kind, bool(namespaced),
+                                        short_names.split(',') if short_names else [])
+                resource.headers = json.loads(headers)
+                for alias in [name, kind.lower(), f'{name}.{group}'] + resource.short_names:
+                    self._kinds.setdefault(alias, resource)
+        finally:
+            db.close()
+        self.captured_at = float(self.meta.get('captured_at', 0))
+
+    def _connect(self):
+        return sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+
+    def resolve(self, name):
+        resource = self._kinds.get(name.lower())
+        if resource is None:
+            raise SnapshotError(f'error: the server doesn\'t have a resource type "{name}"')
+        return resource
+
+    def run(self, command):
+        started = time.monotonic()
+        try:
+            output, returncode = self._execute(command), 0
+        except (SnapshotError, ApiUnsupported) as e:
+            output, returncode = str(e), 1
+        return CommandResult(output, returncode, time.monotonic() - started)
+
+    def _execute(self, command):
+        tokens = shlex.split(command)
+        verb = tokens[1] if len(tokens) > 1 and tokens[0] == 'kubectl' else None
+        if verb not in SNAPSHOT_VERBS:
+            raise SnapshotError(f"스냅샷에서는 {', '.join(SNAPSHOT_VERBS)} 명령어만 실행할 수 있습니다.")
+        args = tokens[2:]
+        for_object = None
+        if verb == 'events' and '--for' in args:
+            index = args.index('--for')
+            for_object = args[index + 1] if index + 1 < len(args) else ''
+            del args[index:index + 2]
+        positional, flags = parse_args(args)
+        namespace = None if flags.get('all-namespaces') else flags.get('namespace') or self.meta.get('namespace')
+        db = self._connect()
+        try:
+            if verb == 'logs':
+                return self._logs(db, positional, flags, namespace)
+            if verb == 'events':
+                return self._events(db, namespace, for_object)
+            targets = self._targets(positional)
+            if verb == 'describe':
+                return self._describe(db, targets, namespace, flags)
+            return self._get(db, targets, namespace, flags)
+        finally:
+            db.close()
+
+    def _targets(self, positional):
+        if not positional:
+            raise SnapshotError('리소스 타입이 필요합니다.')
+        if '/' in positional[0]:
+            return [(self.resolve(arg.partition('/')[0]), arg.partition('/')[2]) for arg in positional]
+        targets = []
+        for kind in positional[0].split(','):
+            resource = self.resolve(kind)
+            targets += [(resource, name) for name in positional[1:]] or [(resource, None)]
+        return targets
+
+    def _rows(self, db, resource, namespace, name, selector, columns='name, namespace, labels, cells'):
+        sql, params = f'SELECT {columns} FROM objects WHERE kind = ?', [resource.name]
+        if resource.namespaced and namespace is not None:
+            sql += ' AND namespace = ?'
+            params.append(namespace)
+        if name:
+            sql += ' AND name = ?'
+            params.append(name)
+        sql += ' ORDER BY namespace, name'
+        for row in db.execute(sql, params):
+            if selector and not match_selector(json.loads(row[2]), selector):
+                continue
+            yield row
+
+    def _get(self, db, targets, namespace, flags):
+        output, selector = flags.get('output', ''), flags.get('selector')
+        if output not in ('', 'wide', 'json', 'name'):
+            raise SnapshotError(f'스냅샷에서는 -o json / name / wide 만 지원합니다: {output}')
+        if output == 'json':
+            items = [json.loads(zlib.decompress(row[4])) for resource, name in targets
+                     for row in self._rows(db, resource, namespace, name, selector,
+                                           'name, namespace, labels, cells, data')]
+            if len(items) == 1 and targets[0][1]:
+                return json.dumps(items[0], indent=4, ensure_ascii=False)
+            return json.dumps({'apiVersion': 'v1', 'items': items, 'kind': 'List'}, indent=4, ensure_ascii=False)
+        sections = []
+        for resource, name in targets:
+            rows = list(self._rows(db, resource, namespace, name, selector))
+            if name and not rows:
+                sections.append(f'Error from server (NotFound): {resource.name} "{name}" not found')
+                continue
+            if output == 'name':
+                sections.append('\n'.join(f'{resource.qualified_kind}/{row[0]}' for row in rows))
+                continue
+            if not rows:
+                sections.append(f'No resources found in {namespace} namespace.' if resource.namespaced and namespace
+                                else 'No resources found')
+                continue
+            headers, lines = list(resource.headers), [json.loads(row[3]) for row in rows]
+            if resource.namespaced and namespace is None:
+                headers.insert(0, 'NAMESPACE')
+                for line, row in zip(lines, rows):
+                    line.insert(0, row[1])
+            sections.append(format_columns(headers, lines, flags.get('no-headers')))
+        return '\n\n'.join(section for section in sections if section)
+
+    def _object_events(self, db, namespace, object_ref):
+        # 클러스터 범위 객체(노드 등)의 이벤트는 네임스페이스가 정해져 있지 않아 전체에서 찾음
+        sql, params = "SELECT cells FROM objects WHERE kind = 'events'", []
+        if namespace:
+            sql += ' AND namespace = ?'
+            params.append(namespace)
+        rows = db.execute(sql + ' ORDER BY created', params)
+        return [cells for cells in (json.loads(row[0]) for row in rows) if cells[3] == object_ref]
+
+    def _describe(self, db, targets, namespace, flags):
+        sections = []
+        for resource, name in targets:
+            rows = list(self._rows(db, resource, namespace, name, flags.get('selector'),
+                                   'name, namespace, labels, cells, data'))
+            if name and not rows:
+                sections.append(f'Error from server (NotFound): {resource.name} "{name}" not found')
+            for row in rows:
+                obj = json.loads(zlib.decompress(row[4]))
+                events = self._object_events(db, row[1], f'{resource.kind.lower()}/{row[0]}')
+                sections.append(describe_object(obj, events))
+        return '\n\n\n'.join(sections) or 'No resources found'
+
+    def _events(self, db, namespace, for_object):
+        sql, params = "SELECT namespace, cells FROM objects WHERE kind = 'events'", []
+        if namespace is not None:
+            sql += ' AND namespace = ?'
+            params.append(namespace)
+        rows = [(row[0], json.loads(row[1])) for row in db.execute(sql + ' ORDER BY created', params)]
+        if for_object:
+            kind, _, name = for_object.partition('/')
+            object_ref = f'{self.resolve(kind).kind.lower()}/{name}'
+            rows = [(ns, cells) for ns, cells in rows if cells[3] == object_ref]
+        if not rows:
+            return f'No events found in {namespace} namespace.' if namespace else 'No events found.'
+        headers = (['NAMESPACE'] if namespace is None else []) + EVENT_HEADERS
+        return format_columns(headers, [([ns] if namespace is None else []) + cells for ns, cells in rows])
+
+    def _logs(self, db, positional, flags, namespace):
+        if len(positional) != 1:
+            raise SnapshotError('파드 이름 하나가 필요합니다.')
+        pod = positional[0].split('/', 1)[-1]
+        sql, params = 'SELECT container, data FROM logs WHERE namespace = ? AND pod = ?', [namespace or '', pod]
+        if flags.get('container'):
+            sql += ' AND container = ?'
+            params.append(flags['container'])
+        rows = db.execute(sql, params).fetchall()
+        if not rows:
+            raise SnapshotError(f'스냅샷에 {namespace}/{pod} 로그가 없습니다.')
+        if len(rows) > 1 and not flags.get('container'):
+            raise SnapshotError(f"컨테이너를 -c 로 지정해주세요: {', '.join(row[0] for row in rows)}")
+        return zlib.decompress(rows[0][1]).decode('utf-8')
+
+
+class SnapshotStore:
+    # 스냅샷 파일 목록과 백그라운드 수집 상태
+    def __init__(self, directory=SNAPSHOT_DIR):
+        self.directory = directory
+        self.writer = None
+        self.error = None
+        self._opened = {}  # 파일 이름 -> Snapshot
+        self._lock = threading.Lock()
+
+    def list(self):
+        try:
+            names = sorted((name for name in os.listdir(self.directory) if name.endswith('.db')), reverse=True)
+        except OSError:
+            return []
+        return names
+
+    def get(self, name):
+        # 파일 이름만 받아서 스냅샷 디렉터리 밖은 열 수 없게 함
+        if not re.fullmatch(r'snapshot-[\w.-]+\.db', name or '') or name not in self.list():
+            raise SnapshotError(f'스냅샷을 찾을 수 없습니다: {name}')
+        with self._lock:
+            if name not in self._opened:
+                self._opened[name] = Snapshot(os.path.join(self.directory, name))
+            return self._opened[name]
+
+    def run(self, name, command):
+        try:
+            snapshot = self.get(name)
+        except (SnapshotError, sqlite3.Error) as e:
+            return CommandResult(str(e), 1, 0)
+        return snapshot.run(command)
+
+    @property
+    def capturing(self):
+        return self.writer is not None
+
+    def capture(self):
+        with self._lock:
+            if self.writer is not None:
+                return False
+            os.makedirs(self.directory, exist_ok=True)
+            name = time.strftime('snapshot-%Y%m%d-%H%M%S.db')
+            self.error = None
+            self.writer = SnapshotWriter(os.path.join(self.directory, name + '.tmp'))
+        threading.Thread(target=self._capture, args=(name,), name='snapshot-capture', daemon=True).start()
+        return True
+
+    def _capture(self, name):
+        writer = self.writer
+        try:
+            writer.capture()
+            os.replace(writer.path, os.path.join(self.directory, name))
+        except (SnapshotError, ApiError, OSError, sqlite3.Error) as e:
+            self.error = str(e)
+            try:
+                os.unlink(writer.path)
+            except OSError:
+                pass
+        finally:
+            self.writer = None
+        # 개수 상한을 넘으면 오래된 스냅샷부터 삭제
+        for old in self.list()[MAX_SNAPSHOTS:]:
+            with self._lock:
+                self._opened.pop(old, None)
+            try:
+                os.unlink(os.path.join(self.directory, old))
+            except OSError:
+                pass
+
+    def status(self):
+        writer = self.writer
+        if writer is not None:
+            return f'스냅샷 수집 중: {writer.phase} ({writer.done_kinds}/{writer.total_kinds} 종류, {writer.objects}개 객체)'
+        if self.error:
+            return f'스냅샷 수집 실패: {self.error}'
+        return ''
+
+    def options(self):
+        options = []
+        for name in self.list():
+            try:
+                snapshot = self.get(name)
+            except (SnapshotError, sqlite3.Error):
+                continue
+            captured = time.strftime('%Y-%m-%d %H:%M', time.localtime(snapshot.captured_at))
+            label = f"{captured} {snapshot.meta.get('context', '')} ({snapshot.meta.get('objects', '?')}개 객체)"
+            options.append({'label': label, 'value': name})
+        return options
+
+
+snapshots = SnapshotStore()
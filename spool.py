@@ -0,0 +1,192 @@
+import bisect
+import mmap
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+
+# 큰 출력 임시 파일 설정 (환경 변수로 조정)
+SPOOL_DIR = os.environ.get('K8SHELPER_SPOOL_DIR') or tempfile.gettempdir()
+SPOOL_THRESHOLD_BYTES = int(os.environ.get('K8SHELPER_SPOOL_THRESHOLD_BYTES', str(1024 * 1024)))  # 이보다 크면 파일로 보관
+MAX_SPOOL_BYTES = int(os.environ.get('K8SHELPER_MAX_SPOOL_BYTES', str(2 * 1024 ** 3)))  # 보관하는 파일 전체 크기 상한
+SPOOL_RETENTION_SECONDS = 600
+INDEX_STRIDE = 64  # 줄 시작 위치는 64줄마다 하나만 기록
+PREVIEW_LINES = 200
+MAX_READ_LINES = 2000
+MAX_READ_BYTES = 1024 * 1024
+MAX_SEARCH_MATCHES = 100
+MAX_LINE_CHARS = 2000  # 검색 결과에 보여줄 한 줄 길이
+READ_BLOCK_BYTES = 4 * 1024 * 1024
+SEARCH_WINDOW_BYTES = 16 * 1024 * 1024
+
+
+def open_spool_file():
+    return tempfile.NamedTemporaryFile(dir=SPOOL_DIR, prefix='k8shelper-spool-', delete=False)
+
+
+class Spool:
+    # 임시 파일에 받은 출력을 mmap 으로 열고 줄 위치 색인만 메모리에 유지
+    def __init__(self, path, file):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.size = os.fstat(file.fileno()).st_size
+        self.created_at = time.time()
+        self._file = file
+        self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index = array('Q', [0])  # INDEX_STRIDE 줄마다의 시작 위치
+        self.lines = self._build_index()
+
+    def _build_index(self):
+        # mmap 대신 블록 단위로 읽어서 색인을 만들어 매핑된 페이지가 메모리에 남지 않게 함
+        fd, count, base, pending = self._file.fileno(), 0, 0, b''
+        while True:
+            block = os.pread(fd, READ_BLOCK_BYTES, base + len(pending))
+            if not block:
+                break
+            data, start, pos = pending + block, base, 0
+            while True:
+                end = data.find(b'\n', pos)
+                if end < 0:
+                    break
+                count += 1
+                pos = end + 1
+                if count % INDEX_STRIDE == 0 and start + pos < self.size:
+                    self._index.append(start + pos)
+            base, pending = start + pos, data[pos:]
+        return count + (1 if pending else 0)
+
+    def _line_offset(self, line):
+        # 색인된 가장 가까운 줄에서 시작해 남은 줄만 건너뜀
+        pos = self._index[line // INDEX_STRIDE]
+        for _ in range(line % INDEX_STRIDE):
+            pos = self._mm.find(b'\n', pos) + 1
+        return pos
+
+    def line_number(self, offset):
+        block = bisect.bisect_right(self._index, offset) - 1
+        start = self._index[block]
+        return block * INDEX_STRIDE + self._mm[start:offset].count(b'\n')
+
+    def read_lines(self, start, count):
+        start = max(0, min(start, self.lines))
+        count = max(0, min(count, MAX_READ_LINES, self.lines - start))
+        if count == 0:
+            return []
+        begin = self._line_offset(start)
+        end, pos = begin, begin
+        for _ in range(count):
+            newline = self._mm.find(b'\n', pos)
+            end = self.size if newline < 0 else newline + 1
+            if end - begin > MAX_READ_BYTES:
+                end = begin + MAX_READ_BYTES
+                break
+            pos = end
+        return self._mm[begin:end].decode('utf-8', errors='replace').splitlines()
+
+    def read_bytes(self, offset, length):
+        offset = max(0, min(offset, self.size))
+        return self._mm[offset:offset + max(0, min(length, MAX_READ_BYTES))]
+
+    def read_all(self, limit=None):
+        # 출력 전체가 필요한 경우 (JSON 문서 등), 파일에서 다시 읽음
+        return os.pread(self._file.fileno(), self.size if limit is None else min(limit, self.size), 0)
+
+    def search(self, pattern, start_line=0, regex=False, limit=MAX_SEARCH_MATCHES):
+        # 매핑된 파일에서 바로 검색하고 (줄 번호, 줄 내용) 목록 반환
+        if start_line >= self.lines:
+            return []
+        if not regex:
+            pattern = re.escape(pattern)
+        compiled = re.compile(pattern.encode('utf-8'), re.MULTILINE)
+        matches, pos = [], self._line_offset(max(0, start_line))
+        # 줄 경계에서 끊은 구간 단위로 검색하고, 읽은 페이지는 파일에서 다시 읽을 수 있으므로 바로 반환
+        while pos < self.size and len(matches) < limit:
+            window_end = self._mm.find(b'\n', min(pos + SEARCH_WINDOW_BYTES, self.size - 1)) + 1 or self.size
+            for match in compiled.finditer(self._mm, pos, window_end):
+                begin = self._mm.rfind(b'\n', 0, match.start()) + 1
+                if matches and matches[-1][0] == self.line_number(begin):
+                    continue  # 같은 줄의 두 번째 일치
+                end = self._mm.find(b'\n', match.end(), window_end)
+                end = window_end if end < 0 else end
+                text = self._mm[begin:min(end, begin + MAX_LINE_CHARS)].decode('utf-8', errors='replace')
+                matches.append((self.line_number(begin), text))
+                if len(matches) >= limit:
+                    break
+            window_start = pos - pos % mmap.PAGESIZE
+            self._mm.madvise(mmap.MADV_DONTNEED, window_start, window_end - window_start)
+            pos = window_end
+        return matches
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class SpoolStore:
+    def __init__(self, max_bytes=MAX_SPOOL_BYTES):
+        self.max_bytes = max_bytes
+        self._spools = OrderedDict()  # 만든 순서, 오래된 파일이 앞
+        self._lock = threading.Lock()
+        self._reaper_started = False
+
+    def _start_reaper(self):
+        # 새 출력이 없어도 보관 기간이 지난 파일은 주기적으로 삭제
+        if self._reaper_started:
+            return
+        self._reaper_started = True
+        threading.Thread(target=self._reap_loop, name='spool-reaper', daemon=True).start()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(SPOOL_RETENTION_SECONDS / 10)
+            self._close(self._prune())
+
+    def _prune(self):
+        # 보관 기간이 지났거나 전체 크기 상한을 넘으면 오래된 파일부터 삭제 (가장 최근 파일은 크기와 상관없이 유지)
+        # 잠금 안에서 호출하고, 닫을 목록을 반환
+        deadline = time.time() - SPOOL_RETENTION_SECONDS
+        total = sum(s.size for s in self._spools.values())
+        newest = next(reversed(self._spools), None)
+        evicted = []
+        for old in list(self._spools.values()):
+            if old.created_at >= deadline and (total <= self.max_bytes or old.id == newest):
+                break
+            total -= old.size
+            evicted.append(self._spools.pop(old.id))
+        return evicted
+
+    @staticmethod
+    def _close(evicted):
+        for old in evicted:
+            old.close()
+
+    def add(self, path, file):
+        spool = Spool(path, file)
+        with self._lock:
+            self._start_reaper()
+            self._spools[spool.id] = spool
+            evicted = self._prune()
+        self._close(evicted)
+        return spool
+
+    def get(self, spool_id):
+        with self._lock:
+            evicted = self._prune()
+            spool = self._spools.get(spool_id)
+        self._close(evicted)
+        return spool
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(spool.size for spool in self._spools.values())
+
+
+spools = SpoolStore()
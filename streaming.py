@@ -0,0 +1,165 @@
+import abc
+import codecs
+import os
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+
+from executor import ProcessLimitReached, kill_process_group, processes
+
+# 스트리밍 버퍼 설정 (환경 변수로 조정)
+MAX_STREAM_BUFFER_BYTES = int(os.environ.get('K8SHELPER_MAX_STREAM_BUFFER_BYTES', str(1024 * 1024)))  # 스트림당 서버 버퍼 상한
+MAX_STREAMS = int(os.environ.get('K8SHELPER_MAX_STREAMS', '16'))  # 동시에 열 수 있는 스트림 수
+STREAM_IDLE_SECONDS = 30  # 이 시간 동안 아무도 읽지 않으면 스트림 종료
+READ_CHUNK_BYTES = 4096
+
+# 끝나지 않고 계속 출력하는 명령어 패턴 (-f 는 logs 에서만 follow 의미)
+WATCH_FLAGS = ('-w', '--watch', '--watch-only')
+FOLLOW_FLAGS = ('-f', '--follow')
+
+
+def is_streaming_command(command):
+    tokens = command.split()
+    if any(token in WATCH_FLAGS or token.startswith('--watch=') for token in tokens):
+        return True
+    if 'logs' in tokens and any(token in FOLLOW_FLAGS or token.startswith('--follow=') for token in tokens):
+        return True
+    return 'rollout' in tokens and 'status' in tokens
+
+
+class ChunkBuffer(abc.ABC):
+    # 출력 청크를 순번과 함께 보관하는 링 버퍼 (바이트 상한을 넘으면 오래된 청크부터 버림)
+    # 출력을 만드는 쪽(kubectl 프로세스, 여러 로그 합치기)은 하위 클래스에서 stop 으로 종료
+    def __init__(self, user, command):
+        self.id = uuid.uuid4().hex
+        self.user = user
+        self.command = command
+        self.returncode = None
+        self.last_read = time.monotonic()
+        self._chunks = deque()  # (seq, text)
+        self._buffered_bytes = 0
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self):
+        return self.returncode is not None
+
+    def _append(self, text):
+        with self._lock:
+            self._seq += 1
+            self._chunks.append((self._seq, text))
+            self._buffered_bytes += len(text)
+            # 오래된 청크부터 버려서 메모리 사용량을 제한
+            while self._buffered_bytes > MAX_STREAM_BUFFER_BYTES and len(self._chunks) > 1:
+                _, dropped = self._chunks.popleft()
+                self._buffered_bytes -= len(dropped)
+
+    def read(self, cursor):
+        # cursor 이후의 새 청크만 반환 (버퍼 상한으로 건너뛴 청크가 있으면 skipped)
+        self.last_read = time.monotonic()
+        with self._lock:
+            skipped = bool(self._chunks) and self._chunks[0][0] > cursor + 1
+            text = ''.join(chunk for seq, chunk in self._chunks if seq > cursor)
+            return text, self._seq, skipped
+
+    @abc.abstractmethod
+    def stop(self):
+        pass
+
+
+class StreamSession(ChunkBuffer):
+    def __init__(self, user, command):
+        super().__init__(user, command)
+        # 스트림도 전체 kubectl 프로세스 상한에 포함 (자리가 없으면 바로 실패)
+        self._process = processes.spawn(command, wait=0, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        self._reader = threading.Thread(target=self._read_loop, name=f'stream-{self.id[:8]}', daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        fd = self._process.stdout.fileno()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')  # 청크 경계에서 잘린 멀티바이트 문자 처리
+        while True:
+            data = os.read(fd, READ_CHUNK_BYTES)
+            if not data:
+                break
+            text = decoder.decode(data)
+            if text:
+                self._append(text)
+        self._process.stdout.close()
+        self.returncode = self._process.wait()
+        processes.release(self._process)
+
+    def stop(self):
+        if self._process.poll() is None:
+            kill_process_group(self._process)
+
+
+class StreamRegistry:
+    def __init__(self, max_streams=MAX_STREAMS):
+        self.max_streams = max_streams
+        self._streams = {}
+        self._lock = threading.Lock()
+        self._reaper_started = False
+
+    def _start_reaper(self):
+        # 아무도 읽지 않는 스트림(탭을 닫은 logs -f 등)은 새 스트림이 없어도 주기적으로 종료
+        if self._reaper_started:
+            return
+        self._reaper_started = True
+        threading.Thread(target=self._reap_loop, name='stream-reaper', daemon=True).start()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(STREAM_IDLE_SECONDS / 2)
+            with self._lock:
+                self._reap()
+
+    def _reap(self):
+        now = time.monotonic()
+        for stream_id, session in list(self._streams.items()):
+            if now - session.last_read > STREAM_IDLE_SECONDS:
+                session.stop()
+                del self._streams[stream_id]
+
+    def start(self, user, command, session_class=StreamSession):
+        with self._lock:
+            self._start_reaper()
+            self._reap()
+            # 세션(탭)당 스트림은 하나만 유지
+            for stream_id, session in list(self._streams.items()):
+                if session.user == user:
+                    session.stop()
+                    del self._streams[stream_id]
+            if len(self._streams) >= self.max_streams:
+                return None
+            try:
+                session = session_class(user, command)
+            except ProcessLimitReached:
+                return None
+            self._streams[session.id] = session
+            return session.id
+
+    def get(self, stream_id):
+        with self._lock:
+            self._reap()
+            return self._streams.get(stream_id)
+
+    def stop(self, stream_id):
+        with self._lock:
+            session = self._streams.pop(stream_id, None)
+        if session:
+            session.stop()
+
+    def stop_user(self, user):
+        with self._lock:
+            sessions = [session for session in self._streams.values() if session.user == user]
+            for session in sessions:
+                del self._streams[session.id]
+        for session in sessions:
+            session.stop()
+
+
+streams = StreamRegistry()
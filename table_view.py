@@ -0,0 +1,177 @@
+import json
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+
+# 서버에 보관하는 표 개수 (환경 변수로 조정)
+MAX_TABLES = int(os.environ.get('K8SHELPER_MAX_TABLES', '32'))
+MAX_VIEWS = 64  # 필터/정렬 결과 캐시 개수
+
+# kubectl 은 열 사이를 공백 3칸 이상으로 맞추므로 2칸 이상의 공백을 열 경계로 봄
+HEADER_PATTERN = re.compile(r'\S+(?: \S+)*')
+FILTER_OPERATORS = [('contains', 'contains'), ('scontains', 'contains'), ('datestartswith', 'startswith'),
+                    ('ge', 'ge'), ('le', 'le'), ('lt', 'lt'), ('gt', 'gt'), ('ne', 'ne'), ('eq', 'eq'),
+                    ('>=', 'ge'), ('<=', 'le'), ('!=', 'ne'), ('<', 'lt'), ('>', 'gt'), ('=', 'eq')]
+
+
+def parse_columns(output):
+    # kubectl get 의 표 형식 출력을 열 이름과 행 목록으로 변환
+    lines = output.splitlines()
+    if len(lines) < 2 or any(not line.strip() for line in lines):
+        return None  # 여러 리소스 타입이 섞인 출력 등은 변환하지 않음
+    # 헤더 이름 안의 공백 1칸(LAST SEEN 등)은 유지하고, 2칸 이상이면 새 열로 봄
+    matches = list(HEADER_PATTERN.finditer(lines[0]))
+    if len(matches) < 2 or not matches[0].group().isupper():
+        return None
+    starts = [match.start() for match in matches]
+    columns = [match.group() for match in matches]
+    rows = []
+    for line in lines[1:]:
+        cells = [line[start:end].strip() for start, end in zip(starts, starts[1:] + [None])]
+        rows.append(dict(zip(columns, cells)))
+    return columns, rows
+
+
+def parse_json(output):
+    # -o json 출력은 주요 필드만 열로 펼침
+    try:
+        payload = json.loads(output)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    items = payload.get('items') if 'items' in payload else [payload]
+    columns = ['NAMESPACE', 'NAME', 'KIND', 'STATUS', 'CREATED', 'LABELS']
+    rows = []
+    for item in items:
+        metadata = item.get('metadata') or {}
+        status = item.get('status') if isinstance(item.get('status'), dict) else {}
+        rows.append({
+            'NAMESPACE': metadata.get('namespace', ''),
+            'NAME': metadata.get('name', ''),
+            'KIND': item.get('kind', ''),
+            'STATUS': status.get('phase', ''),
+            'CREATED': metadata.get('creationTimestamp', ''),
+            'LABELS': ','.join(f'{k}={v}' for k, v in sorted((metadata.get('labels') or {}).items())),
+        })
+    return columns, rows
+
+
+def parse_output(output):
+    if output.lstrip().startswith('{'):
+        return parse_json(output)
+    return parse_columns(output)
+
+
+def is_table_command(command):
+    tokens = command.split()
+    return len(tokens) >= 2 and tokens[0] == 'kubectl' and tokens[1] in ('get', 'events', 'top')
+
+
+def split_filter_part(filter_part):
+    # DataTable 의 filter_query 한 조각을 (열, 연산자, 값) 으로 분리
+    for operator, name in FILTER_OPERATORS:
+        token = f' {operator} ' if operator.isalpha() else operator
+        if token in filter_part:
+            column_part, value_part = filter_part.split(token, 1)
+            column = column_part[column_part.find('{') + 1: column_part.rfind('}')]
+            value = value_part.strip()
+            if value[:1] == value[-1:] and value[:1] in ('"', "'", '`'):
+                value = value[1:-1].replace('\\' + value[0], value[0])
+            return column, name, value
+    return None, None, None
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compare(cell, operator, value):
+    if operator == 'contains':
+        return value.lower() in cell.lower()
+    if operator == 'startswith':
+        return cell.startswith(value)
+    left, right = _number(cell), _number(value)
+    if left is None or right is None:
+        left, right = cell, value
+    if operator == 'eq':
+        return left == right
+    if operator == 'ne':
+        return left != right
+    if operator == 'lt':
+        return left < right
+    if operator == 'le':
+        return left <= right
+    if operator == 'gt':
+        return left > right
+    return left >= right
+
+
+def _sort_key(value):
+    # 숫자는 숫자 크기로, 나머지는 문자열로 정렬
+    number = _number(value)
+    return (0, number, '') if number is not None else (1, 0, value)
+
+
+class TableStore:
+    def __init__(self, max_tables=MAX_TABLES):
+        self.max_tables = max_tables
+        self._tables = OrderedDict()  # table_id -> (columns, rows)
+        self._views = OrderedDict()  # (table_id, filter, sort) -> 필터/정렬된 행 목록
+        self._lock = threading.Lock()
+
+    def put(self, columns, rows):
+        table_id = uuid.uuid4().hex
+        with self._lock:
+            self._tables[table_id] = (columns, rows)
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+        return table_id
+
+    def columns(self, table_id):
+        with self._lock:
+            table = self._tables.get(table_id)
+        return table[0] if table else None
+
+    def _view(self, table_id, filter_query, sort_by):
+        key = (table_id, filter_query or '', json.dumps(sort_by or []))
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+                return view
+            table = self._tables.get(table_id)
+        if table is None:
+            return None
+
+        rows = table[1]
+        for filter_part in (filter_query or '').split(' && '):
+            column, operator, value = split_filter_part(filter_part)
+            if column is not None:
+                rows = [row for row in rows if _compare(row.get(column, ''), operator, value)]
+        # 여러 열 정렬은 마지막 기준부터 안정 정렬
+        for sort in reversed(sort_by or []):
+            rows = sorted(rows, key=lambda row: _sort_key(row.get(sort['column_id'], '')),
+                          reverse=sort['direction'] == 'desc')
+
+        with self._lock:
+            self._views[key] = rows
+            while len(self._views) > MAX_VIEWS:
+                self._views.popitem(last=False)
+        return rows
+
+    def page(self, table_id, page_current, page_size, sort_by=None, filter_query=None):
+        # 요청한 페이지의 행과 전체 행 수만 반환
+        rows = self._view(table_id, filter_query, sort_by)
+        if rows is None:
+            return None, 0
+        start = (page_current or 0) * page_size
+        return rows[start:start + page_size], len(rows)
+
+
+table_store = TableStore()
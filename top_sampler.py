@@ -0,0 +1,199 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from array import array
+
+from executor import run_command
+
+# kubectl top 수집 설정 (환경 변수로 조정, 간격이 0 이면 수집 안 함)
+TOP_SAMPLE_SECONDS = float(os.environ.get('K8SHELPER_TOP_SAMPLE_SECONDS', '30'))
+TOP_RETENTION_SECONDS = float(os.environ.get('K8SHELPER_TOP_RETENTION_HOURS', '24')) * 3600
+# 시계열 수 상한, 메모리는 최대 MAX_TOP_SERIES x (보관 시간 / 간격) x 8 바이트로 고정
+MAX_TOP_SERIES = int(os.environ.get('K8SHELPER_MAX_TOP_SERIES', '1000'))
+MISSING = -1.0  # 수집되지 않은 칸 (사용량은 음수가 될 수 없음)
+METRICS = ('cpu', 'memory')
+
+logger = logging.getLogger(__name__)
+
+MEMORY_UNITS = {'Ki': 1 / 1024, 'Mi': 1, 'Gi': 1024, 'Ti': 1024 ** 2, 'K': 1000 / 1024 ** 2, 'M': 1000 ** 2 / 1024 ** 2,
+                'G': 1000 ** 3 / 1024 ** 2}
+
+
+def parse_cpu(value):
+    # "250m" -> 250, "2" -> 2000 (밀리코어)
+    if value.endswith('n'):
+        return float(value[:-1]) / 1e6
+    if value.endswith('u'):
+        return float(value[:-1]) / 1e3
+    if value.endswith('m'):
+        return float(value[:-1])
+    return float(value) * 1000
+
+
+def parse_memory(value):
+    # "512Mi" -> 512, "2Gi" -> 2048 (MiB)
+    for unit, scale in MEMORY_UNITS.items():
+        if value.endswith(unit):
+            return float(value[:-len(unit)]) * scale
+    return float(value) / 1024 ** 2
+
+
+def parse_top(output, name_columns):
+    # kubectl top ... --no-headers 출력 -> 이름 -> (cpu, memory)
+    samples = {}
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) < name_columns + 2:
+            continue
+        name = '/'.join(fields[:name_columns])
+        cpu = fields[name_columns]
+        # 노드는 CPU(cores) CPU% MEMORY(bytes) MEMORY% 순서
+        memory = fields[name_columns + 2] if len(fields) >= name_columns + 4 else fields[name_columns + 1]
+        try:
+            samples[name] = (parse_cpu(cpu), parse_memory(memory))
+        except ValueError:
+            continue  # <unknown> 등
+    return samples
+
+
+def lttb(times, values, threshold):
+    # Largest-Triangle-Three-Buckets: 모양을 유지하면서 threshold 개의 점만 남김
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(times), list(values)
+    every = (n - 2) / (threshold - 2)
+    out_times, out_values = [times[0]], [values[0]]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int((i + 1) * every) + 1, min(int((i + 2) * every) + 1, n)
+        avg_t = sum(times[start:end]) / (end - start)
+        avg_v = sum(values[start:end]) / (end - start)
+        at, av = times[a], values[a]
+        best, best_area = start - 1, -1.0
+        for j in range(int(i * every) + 1, start):
+            area = abs((at - avg_t) * (values[j] - av) - (at - times[j]) * (avg_v - av))
+            if area > best_area:
+                best, best_area = j, area
+        out_times.append(times[best])
+        out_values.append(values[best])
+        a = best
+    out_times.append(times[-1])
+    out_values.append(values[-1])
+    return out_times, out_values
+
+
+class TopSampler:
+    # 모든 시계열이 같은 시각 칸을 공유하는 고정 크기 링 버퍼
+    def __init__(self, interval=TOP_SAMPLE_SECONDS, retention=TOP_RETENTION_SECONDS, max_series=MAX_TOP_SERIES):
+        self.interval = interval
+        self.capacity = max(2, int(retention // interval)) if interval > 0 else 2
+        self.max_series = max_series
+        self.last_error = None
+        self._times = array('d', [0.0]) * self.capacity
+        self._head = 0  # 다음에 쓸 칸
+        self._count = 0
+        self._tick = 0
+        self._series = {}  # (종류, 이름) -> {'cpu': array, 'memory': array}
+        self._last_seen = {}  # (종류, 이름) -> 마지막으로 수집된 tick
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        if self.interval <= 0 or self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._run, name='top-sampler', daemon=True).start()
+
+    def _run(self):
+        while True:
+            started = time.monotonic()
+            self.sample()
+            time.sleep(max(1.0, self.interval - (time.monotonic() - started)))
+
+    def sample(self):
+        samples = {}
+        errors = []
+        for kind, command, name_columns in (('nodes', 'kubectl top nodes --no-headers', 1),
+                                            ('pods', 'kubectl top pods -A --no-headers', 2)):
+            result = run_command(command, timeout=max(10, self.interval))
+            if result.returncode != 0:
+                errors.append(result.output.strip())
+                continue
+            samples.update(((kind, name), values) for name, values in parse_top(result.full_output(), name_columns).items())
+        if errors:
+            if self.last_error is None:
+                logger.warning('kubectl top 수집 실패: %s', errors[0])
+            self.last_error = errors[0]
+        else:
+            self.last_error = None
+        self.record(time.time(), samples)
+
+    def record(self, at, samples):
+        with self._lock:
+            slot = self._head
+            self._times[slot] = at
+            for arrays in self._series.values():
+                for values in arrays.values():
+                    values[slot] = MISSING
+            for key, (cpu, memory) in samples.items():
+                arrays = self._series.get(key)
+                if arrays is None:
+                    if len(self._series) >= self.max_series:
+                        continue
+                    # 처음 보는 시계열은 보관 기간 전체 크기로 미리 할당
+                    arrays = self._series[key] = {metric: array('f', [MISSING]) * self.capacity
+                                                  for metric in METRICS}
+                arrays['cpu'][slot] = cpu
+                arrays['memory'][slot] = memory
+                self._last_seen[key] = self._tick
+            self._head = (slot + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+            self._tick += 1
+            # 보관 기간 동안 한 번도 수집되지 않은 시계열(삭제된 파드)은 정리
+            for key in [key for key, seen in self._last_seen.items() if self._tick - seen > self.capacity]:
+                del self._series[key], self._last_seen[key]
+
+    def _window(self, since):
+        # 시간 순서의 칸 범위 (링 버퍼를 최대 두 구간으로 나눔)
+        start = (self._head - self._count) % self.capacity
+        slots = [(start, min(start + self._count, self.capacity))]
+        if start + self._count > self.capacity:
+            slots.append((0, self._head))
+        result = []
+        for begin, end in slots:
+            begin = bisect.bisect_left(self._times, since, begin, end)
+            if begin < end:
+                result.append((begin, end))
+        return result
+
+    def series(self, kind, metric, window_seconds, limit=10, points=300):
+        # 구간 안의 최댓값이 큰 순서로 limit 개 시계열을 골라 LTTB 로 줄여서 반환
+        with self._lock:
+            ranges = self._window(time.time() - window_seconds)
+            times = [t for begin, end in ranges for t in self._times[begin:end]]
+            peaks = []
+            for key, arrays in self._series.items():
+                if key[0] != kind:
+                    continue
+                values = arrays[metric]
+                peak = max((max(values[begin:end]) for begin, end in ranges), default=MISSING)
+                if peak > MISSING:
+                    peaks.append((peak, key))
+            peaks.sort(reverse=True)
+            selected = [(key, [v for begin, end in ranges for v in self._series[key][metric][begin:end]])
+                        for _, key in peaks[:limit]]
+        result = []
+        for key, values in selected:
+            present = [(t, v) for t, v in zip(times, values) if v != MISSING]
+            sampled_times, sampled_values = lttb([t for t, _ in present], [v for _, v in present], points)
+            result.append({'name': key[1], 'times': sampled_times, 'values': sampled_values})
+        return result
+
+    def series_count(self):
+        with self._lock:
+            return len(self._series)
+
+
+top_sampler = TopSampler()
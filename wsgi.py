@@ -0,0 +1,17 @@
+# 운영용 WSGI 진입점
+# gunicorn -c gunicorn.conf.py wsgi:application
+import k8shelper
+
+
+def create_app():
+    server = k8shelper.app.server
+
+    # gunicorn 이 아닌 WSGI 서버에서도 첫 요청을 받은 프로세스에서 백그라운드 작업을 시작
+    @server.before_request
+    def ensure_background_tasks():
+        k8shelper.start_background_tasks()
+
+    return server
+
+
+application = create_app()